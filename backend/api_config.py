@@ -0,0 +1,92 @@
+"""
+Runtime configuration for the Unified Skills API.
+
+Every setting can be overridden through an environment variable of the same
+name prefixed with ``SKILLS_API_``.
+"""
+
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Append-only log holding users added through /api/add-user
+USER_LOG_PATH = os.environ.get('SKILLS_API_USER_LOG', os.path.join(BASE_DIR, 'data', 'users.jsonl'))
+
+# Seconds clients and proxies may reuse a catalog response (categories, roles, ...)
+CATALOG_CACHE_MAX_AGE = int(os.environ.get('SKILLS_API_CATALOG_CACHE_MAX_AGE', '300'))
+
+# Shared secret for the /api/admin endpoints; they are disabled when unset
+ADMIN_TOKEN = os.environ.get('SKILLS_API_ADMIN_TOKEN', '')
+
+# Memoized gap analyses / recommendations: entry count, approximate bytes, seconds to live
+MEMO_MAX_ENTRIES = int(os.environ.get('SKILLS_API_MEMO_MAX_ENTRIES', '4096'))
+MEMO_MAX_BYTES = int(os.environ.get('SKILLS_API_MEMO_MAX_BYTES', str(64 * 1024 * 1024)))
+MEMO_TTL = float(os.environ.get('SKILLS_API_MEMO_TTL', '600'))
+
+# Pool used to fan out per-role analyses: 'serial', 'thread' or 'process'.
+# Analyses run in 'process' workers would fill the workers' copies of the memo
+# cache, never the server's, so 'process' requires SKILLS_API_MEMO_MAX_ENTRIES=0
+EXECUTOR_MODE = os.environ.get('SKILLS_API_EXECUTOR_MODE', 'thread')
+EXECUTOR_WORKERS = int(os.environ.get('SKILLS_API_EXECUTOR_WORKERS', '0')) or None
+
+# Seconds a single role analysis may take in /api/compare-roles
+ROLE_TIMEOUT = float(os.environ.get('SKILLS_API_ROLE_TIMEOUT', '5'))
+
+# Default overall deadline in seconds for /api/comprehensive-analysis
+ANALYSIS_DEADLINE = float(os.environ.get('SKILLS_API_ANALYSIS_DEADLINE', '10'))
+
+# Profiles per chunk (and the per-request maximum) for /api/batch
+BATCH_CHUNK_SIZE = int(os.environ.get('SKILLS_API_BATCH_CHUNK_SIZE', '100'))
+# Workers of the separate pool /api/batch runs on (0 = the EXECUTOR_MODE default),
+# so large batches cannot hold up /api/compare-roles or /api/comprehensive-analysis
+BATCH_WORKERS = int(os.environ.get('SKILLS_API_BATCH_WORKERS', '0')) or None
+
+# serve.py: listen address, worker processes (0 = one per CPU) and listen backlog
+SERVER_HOST = os.environ.get('SKILLS_API_HOST', '0.0.0.0')
+SERVER_PORT = int(os.environ.get('SKILLS_API_PORT', '5013'))
+SERVER_WORKERS = int(os.environ.get('SKILLS_API_WORKERS', '0')) or os.cpu_count() or 1
+SERVER_BACKLOG = int(os.environ.get('SKILLS_API_BACKLOG', '128'))
+
+# Requests a worker serves before it is replaced (0 = never), plus random jitter
+# so workers do not all restart at once
+WORKER_MAX_REQUESTS = int(os.environ.get('SKILLS_API_WORKER_MAX_REQUESTS', '0'))
+WORKER_MAX_REQUESTS_JITTER = int(os.environ.get('SKILLS_API_WORKER_MAX_REQUESTS_JITTER', '0'))
+
+# Seconds a stopping worker may spend finishing its current request
+GRACEFUL_TIMEOUT = float(os.environ.get('SKILLS_API_GRACEFUL_TIMEOUT', '30'))
+
+# Directory serve.py workers share their metrics through, so /metrics reports the
+# whole server (empty = a fresh temporary directory per run)
+METRICS_DIR = os.environ.get('SKILLS_API_METRICS_DIR', '')
+
+# Pickled user store, vocabulary and indexes loaded at startup instead of rebuilding
+# them; rebuilt and rewritten when the code or datasets changed. Empty (the
+# default) disables snapshots
+SNAPSHOT_PATH = os.environ.get('SKILLS_API_SNAPSHOT', '')
+
+# JSON-lines file recording served requests for benchmarks/replay.py (empty = off),
+# and the fraction of requests recorded
+TRAFFIC_LOG_PATH = os.environ.get('SKILLS_API_TRAFFIC_LOG', '')
+TRAFFIC_SAMPLE_RATE = float(os.environ.get('SKILLS_API_TRAFFIC_SAMPLE_RATE', '1'))
+
+# match_mode=fuzzy: known skills each search keyword may resolve to, and the
+# character n-gram cosine similarity a resolution needs
+FUZZY_TOP_K = int(os.environ.get('SKILLS_API_FUZZY_TOP_K', '3'))
+FUZZY_MIN_SIMILARITY = float(os.environ.get('SKILLS_API_FUZZY_MIN_SIMILARITY', '0.4'))
+
+# Dynamic responses at least this many bytes are compressed for clients that
+# accept gzip or brotli (0 = never)
+COMPRESS_MIN_BYTES = int(os.environ.get('SKILLS_API_COMPRESS_MIN_BYTES', '1024'))
+
+# JSON-lines change log of user upserts/deletes from the Node backend, applied
+# to the user store as it grows (empty = off); see change_log.py. The applied
+# offset is kept in the state file when users are persisted (SKILLS_API_USER_LOG),
+# and the log is checked at most every INGEST_INTERVAL seconds. A request applies
+# at most INGEST_BATCH_EVENTS events; a backlog is applied on the following requests
+CHANGE_LOG_PATH = os.environ.get('SKILLS_API_CHANGE_LOG', '')
+INGEST_STATE_PATH = os.environ.get('SKILLS_API_INGEST_STATE', os.path.join(BASE_DIR, 'data', 'ingest.state'))
+INGEST_INTERVAL = float(os.environ.get('SKILLS_API_INGEST_INTERVAL', '1'))
+INGEST_BATCH_EVENTS = int(os.environ.get('SKILLS_API_INGEST_BATCH_EVENTS', '1000'))
+
+# Unix socket the change log spooler (python change_log.py spool) listens on
+CHANGE_LOG_SOCKET = os.environ.get('SKILLS_API_CHANGE_LOG_SOCKET', '')
@@ -0,0 +1,318 @@
+"""
+Typeahead completions for skills and user names.
+
+PrefixIndex is a compressed (radix) trie: every edge carries a run of
+characters and every node holds the best ``top_k`` entries below it, so a
+completion is a walk of at most ``len(prefix)`` characters and a slice of a
+precomputed list, whatever the number of keys. Changing an entry updates
+the lists along that key's path only, and stops at the first node whose list
+it does not affect: a gain is spliced into each list, while a loss
+recomputes the lists that held the entry from the children's lists.
+
+Autocomplete keeps two of them, kept current as users are added or removed:
+
+- skills: every canonical vocabulary skill under its normalized name and its
+  SKILL_ALIASES shorthands, weighted by the number of users offering or
+  wanting it (plus one, so catalog-only skills still complete), doubled for
+  TRENDING_SKILLS members;
+- users: every user under their case-folded name, weighted by the number of
+  skills they list.
+"""
+
+import bisect
+import threading
+
+from skill_vocabulary import SKILL_ALIASES, normalize_skill, trending_skill_names
+
+# Completions precomputed per node, and so the most a query can return
+MAX_COMPLETIONS = 10
+TRENDING_MULTIPLIER = 2
+
+
+# normalized skill -> its SKILL_ALIASES shorthands
+_ALIASES_BY_TARGET = {}
+for _alias, _target in SKILL_ALIASES.items():
+    _ALIASES_BY_TARGET.setdefault(_target, []).append(_alias)
+
+
+def _prefix_key(text):
+    """
+    Case-folded, whitespace-collapsed form of a typed prefix or user name.
+
+    Unlike normalize_skill it does not resolve aliases: "ai" must still
+    complete to "airflow", and the shorthands are keys of their own.
+    """
+    return ' '.join(text.casefold().split())
+
+
+class _Node:
+    __slots__ = ('label', 'children', 'entries', 'top')
+
+    def __init__(self, label=''):
+        self.label = label
+        # first character of a child's label -> child
+        self.children = {}
+        # payload -> (weight, key) of the entries ending here
+        self.entries = {}
+        # best (-weight, key, payload) in this subtree, one per payload
+        self.top = []
+
+
+class PrefixIndex:
+    """Compressed trie of string keys with precomputed top-k completions per node"""
+
+    def __init__(self, top_k=MAX_COMPLETIONS):
+        self.top_k = top_k
+        self._root = _Node()
+
+    def set(self, key, payload, weight):
+        """Add ``payload`` under ``key`` or change its weight"""
+        path = self._path(key, create=True)
+        entries = path[-1].entries
+        previous = entries.get(payload)
+        entries[payload] = (weight, key)
+        if previous is None or weight >= previous[0]:
+            self._promote(path, (-weight, key, payload))
+        else:
+            self._demote(path, (-previous[0], key, payload))
+
+    def discard(self, key, payload):
+        """Remove ``payload`` from ``key``, if it is there"""
+        path = self._path(key)
+        if path is None or payload not in path[-1].entries:
+            return
+        weight, _ = path[-1].entries.pop(payload)
+        # Prune the nodes left without entries or children
+        while len(path) > 1 and not path[-1].entries and not path[-1].children:
+            del path[-2].children[path[-1].label[0]]
+            path.pop()
+        self._demote(path, (-weight, key, payload))
+
+    def complete(self, prefix, limit=None):
+        """``(payload, weight)`` of the best entries whose key starts with ``prefix``"""
+        node = self._root
+        remaining = prefix
+        while remaining:
+            child = node.children.get(remaining[0])
+            if child is None:
+                return []
+            label = child.label
+            if remaining.startswith(label):
+                remaining = remaining[len(label):]
+            elif label.startswith(remaining):
+                remaining = ''
+            else:
+                return []
+            node = child
+        top = node.top if limit is None else node.top[:limit]
+        return [(payload, -negated) for negated, _, payload in top]
+
+    def rebuild(self):
+        """Recompute every node's completions (after bulk ``load()`` calls)"""
+        stack = [(self._root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                self._recompute(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def load(self, key, payload, weight):
+        """set() without refreshing completions; call rebuild() when done"""
+        self._path(key, create=True)[-1].entries[payload] = (weight, key)
+
+    def _path(self, key, create=False):
+        """Nodes from the root to the one for ``key``; None if absent and not ``create``"""
+        node = self._root
+        path = [node]
+        remaining = key
+        while remaining:
+            child = node.children.get(remaining[0])
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[remaining[0]] = _Node(remaining)
+                path.append(child)
+                return path
+
+            label = child.label
+            if remaining.startswith(label):
+                common = len(label)
+            else:
+                if not create:
+                    return None
+                common = 1
+                while common < len(remaining) and label[common] == remaining[common]:
+                    common += 1
+                # Split the edge: a new node takes the shared part
+                middle = _Node(label[:common])
+                node.children[remaining[0]] = middle
+                child.label = label[common:]
+                middle.children[child.label[0]] = child
+                middle.top = list(child.top)
+                child = middle
+            node = child
+            path.append(node)
+            remaining = remaining[common:]
+        return path
+
+    def _demote(self, path, item):
+        """
+        Recompute the completions along a path after ``item`` lost weight or
+        was removed. Nodes that did not list it are unchanged, and so are
+        their ancestors.
+        """
+        for node in reversed(path):
+            if item not in node.top:
+                return
+            self._recompute(node)
+
+    def _promote(self, path, item):
+        """
+        Splice an entry whose weight went up into the completions along its
+        path; nothing else under those nodes changed, so no merge is needed
+        """
+        payload = item[2]
+        for node in reversed(path):
+            top = node.top
+            position = next((index for index, other in enumerate(top) if other[2] == payload), None)
+            if position is not None:
+                if top[position] <= item:
+                    # Already listed at least this high, here and so above
+                    return
+                promoted = top[:position] + top[position + 1:]
+            elif len(top) == self.top_k and item >= top[-1]:
+                return
+            else:
+                promoted = list(top)
+            bisect.insort(promoted, item)
+            node.top = promoted[:self.top_k]
+
+    def _recompute(self, node):
+        candidates = [(-weight, key, payload) for payload, (weight, key) in node.entries.items()]
+        for child in node.children.values():
+            candidates.extend(child.top)
+        candidates.sort()
+        top = []
+        seen = set()
+        for item in candidates:
+            if item[2] not in seen:
+                seen.add(item[2])
+                top.append(item)
+                if len(top) == self.top_k:
+                    break
+        node.top = top
+
+
+class Autocomplete:
+    """Skill and user-name completions, maintained from the user store"""
+
+    def __init__(self, vocabulary, trending_skills, users=(), top_k=MAX_COMPLETIONS):
+        self._vocabulary = vocabulary
+        self._lock = threading.RLock()
+        self.skills = PrefixIndex(top_k)
+        self.users = PrefixIndex(top_k)
+        # skill id -> users offering or wanting it
+        self._popularity = {}
+        # user id -> (case-folded name, skill ids offered or wanted)
+        self._rows = {}
+        self._trending = frozenset()
+        # skill ids present in the skills trie
+        self._indexed = set()
+
+        for user in users:
+            user_id, name, skill_ids = self._row(user)
+            self._rows[user_id] = (name, skill_ids)
+            for skill_id in skill_ids:
+                self._popularity[skill_id] = self._popularity.get(skill_id, 0) + 1
+            self.users.load(name, user_id, len(user['skills']) + len(user['skillsWanted']))
+        self.users.rebuild()
+        self._set_trending(trending_skills)
+        for skill_id in range(len(vocabulary)):
+            for key in self._keys(skill_id):
+                self.skills.load(key, skill_id, self._weight(skill_id))
+            self._indexed.add(skill_id)
+        self.skills.rebuild()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def set_catalog(self, trending_skills):
+        """Pick up a reloaded TRENDING_SKILLS and any skills the catalogs added"""
+        with self._lock:
+            previous = self._trending
+            self._set_trending(trending_skills)
+            changed = (previous ^ self._trending) | (set(range(len(self._vocabulary))) - self._indexed)
+            for skill_id in changed:
+                self._reweigh(skill_id)
+
+    def add_user(self, user):
+        """Index a user's name and count their skills, replacing any previous entry"""
+        with self._lock:
+            user_id, name, skill_ids = self._row(user)
+            # An update only touches the skills it added or dropped
+            previous_name, previous_ids = self._rows.get(user_id, (None, frozenset()))
+            self._rows[user_id] = (name, skill_ids)
+            if previous_name is not None and previous_name != name:
+                self.users.discard(previous_name, user_id)
+            self.users.set(name, user_id, len(user['skills']) + len(user['skillsWanted']))
+            for skill_id in previous_ids - skill_ids:
+                self._popularity[skill_id] -= 1
+                self._reweigh(skill_id)
+            for skill_id in skill_ids - previous_ids:
+                self._popularity[skill_id] = self._popularity.get(skill_id, 0) + 1
+                self._reweigh(skill_id)
+
+    def remove_user(self, user_id):
+        with self._lock:
+            row = self._rows.pop(user_id, None)
+            if row is None:
+                return
+            name, skill_ids = row
+            self.users.discard(name, user_id)
+            for skill_id in skill_ids:
+                self._popularity[skill_id] -= 1
+                self._reweigh(skill_id)
+
+    def complete_skills(self, prefix, limit=None):
+        """``(skill name, users offering or wanting it, trending?)`` for the best skills starting with ``prefix``"""
+        with self._lock:
+            return [
+                (self._vocabulary.name_of(skill_id), self._popularity.get(skill_id, 0), skill_id in self._trending)
+                for skill_id, _ in self.skills.complete(_prefix_key(prefix), limit)
+            ]
+
+    def complete_users(self, prefix, limit=None):
+        """Ids of the best users whose name starts with ``prefix``"""
+        with self._lock:
+            return [user_id for user_id, _ in self.users.complete(_prefix_key(prefix), limit)]
+
+    def _row(self, user):
+        skill_ids = frozenset(self._vocabulary.add(skill) for skill in user['skills'] + user['skillsWanted'])
+        return user['id'], _prefix_key(user['name']), skill_ids
+
+    def _set_trending(self, trending_skills):
+        self._trending = frozenset(self._vocabulary.add(skill) for skill in trending_skill_names(trending_skills))
+
+    def _keys(self, skill_id):
+        """Normalized name and alias shorthands a skill completes from"""
+        name = normalize_skill(self._vocabulary.name_of(skill_id))
+        return [name] + _ALIASES_BY_TARGET.get(name, [])
+
+    def _weight(self, skill_id):
+        weight = self._popularity.get(skill_id, 0) + 1
+        return weight * TRENDING_MULTIPLIER if skill_id in self._trending else weight
+
+    def _reweigh(self, skill_id):
+        weight = self._weight(skill_id)
+        for key in self._keys(skill_id):
+            self.skills.set(key, skill_id, weight)
+        self._indexed.add(skill_id)
+
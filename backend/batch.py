@@ -0,0 +1,108 @@
+"""
+Batch profile analysis over newline-delimited JSON.
+
+Each input line is one profile, as accepted by /api/comprehensive-analysis.
+Lines are read lazily and processed in fixed-size chunks on the analysis
+runner, so memory stays bounded by the chunk size. Output is one JSON line per
+input line, in input order, carrying either the results or that line's error.
+
+Served by POST /api/batch, and usable offline:
+
+    python batch.py profiles.jsonl -o results.jsonl
+"""
+
+import argparse
+import json
+import sys
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def _parse_line(line):
+    profile = json.loads(line)
+    if not isinstance(profile, dict):
+        raise ValueError("Each line must be a JSON object")
+    return profile
+
+
+def run_batch(lines, process, runner, chunk_size=DEFAULT_CHUNK_SIZE, timeout=None):
+    """
+    Yield one output record per non-blank input line, in input order.
+
+    ``process(profile)`` returns the results for one parsed profile and is
+    fanned out on ``runner`` a chunk at a time.
+    """
+    chunk = []
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            chunk.append((line_number, _parse_line(line), None))
+        except json.JSONDecodeError as e:
+            chunk.append((line_number, None, f"Invalid JSON: {e}"))
+        except ValueError as e:
+            chunk.append((line_number, None, str(e)))
+        if len(chunk) >= chunk_size:
+            yield from _run_chunk(chunk, process, runner, timeout)
+            chunk = []
+    if chunk:
+        yield from _run_chunk(chunk, process, runner, timeout)
+
+
+def _run_chunk(chunk, process, runner, timeout):
+    valid = [(line_number, profile) for line_number, profile, error in chunk if error is None]
+    results = iter(runner.map(process, [(profile,) for _, profile in valid], timeout=timeout))
+
+    for line_number, profile, error in chunk:
+        record = {"line": line_number}
+        if profile is not None and "id" in profile:
+            record["id"] = profile["id"]
+        if error is None:
+            result = next(results)
+            if result.status == 'ok':
+                record.update({"success": True, "result": result.value})
+                yield record
+                continue
+            error = result.error
+        record.update({"success": False, "error": error})
+        yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a JSON-lines file of skill profiles")
+    parser.add_argument('input', help="JSON-lines file of profiles, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="Where to write results (default: stdout)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Profiles processed per chunk")
+    args = parser.parse_args(argv)
+
+    # Loading the API builds the datasets and indexes the pipeline needs
+    import api_config
+    from unified_skills_api import analyze_profile, batch_runner
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    total = failures = 0
+    try:
+        records = run_batch(source, analyze_profile, batch_runner, args.chunk_size,
+                            timeout=api_config.ANALYSIS_DEADLINE)
+        for record in records:
+            total += 1
+            if not record["success"]:
+                failures += 1
+            target.write(json.dumps(record, separators=(',', ':')) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+        batch_runner.shutdown()
+
+    print(f"{total} profiles analyzed, {failures} failed", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Replay recorded traffic against the API and report latency per route.
+
+Input is a JSON-lines log of ``{"method", "path", "body"}`` records (plus an
+optional ``"route"`` used for grouping), as written by the API when
+SKILLS_API_TRAFFIC_LOG is set. Requests go to a running instance over HTTP,
+or in-process to ``unified_skills_api.app`` through its test client. The
+in-process app keeps its user log, snapshot and change log in a temporary
+directory.
+
+Requests that change the server's data (WRITE_ROUTES, e.g. POST
+/api/add-user) are skipped unless ``--include-writes`` is given, so a replay
+against a live instance does not add users to it.
+
+Closed loop (default): ``--concurrency`` workers each send their next request
+as soon as the previous one answers. Open loop (``--rate``): requests are
+started on a fixed schedule (or Poisson arrivals with ``--poisson``) whatever
+the response times. Latency is then measured from the scheduled start, so
+queueing behind a slow server is counted rather than hidden.
+
+    python benchmarks/replay.py traffic.jsonl --url http://localhost:5013 -c 16
+    python benchmarks/replay.py traffic.jsonl --in-process --rate 200 --duration 30
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+# Routes (as grouped by route_of) whose requests change the server's data
+WRITE_ROUTES = frozenset(('POST /api/add-user', 'POST /api/admin/reload-datasets'))
+
+
+def load_log(path):
+    """Replayable records from a traffic log, skipping malformed lines"""
+    records = []
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("method") and record.get("path"):
+                records.append(record)
+    return records
+
+
+def route_of(record):
+    """Grouping key: the recorded route, else the path without ids or query"""
+    if record.get("route"):
+        return f"{record['method']} {record['route']}"
+    path = record["path"].split('?', 1)[0]
+    return f"{record['method']} {_NUMERIC_SEGMENT.sub('/<id>', path)}"
+
+
+def split_writes(records):
+    """``(reads, writes)``: the records left after setting WRITE_ROUTES aside, and those set aside"""
+    reads, writes = [], []
+    for record in records:
+        (writes if route_of(record) in WRITE_ROUTES else reads).append(record)
+    return reads, writes
+
+
+class HttpTarget:
+    """Sends requests to a running instance"""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, record):
+        body = record.get("body")
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(self.base_url + record["path"], data=data, method=record["method"])
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def close(self):
+        pass
+
+
+class InProcessTarget:
+    """Sends requests to the app through one Flask test client per thread"""
+
+    def __init__(self):
+        # Settings are read at import: keep the app's files away from the real ones
+        self.data_dir = tempfile.mkdtemp(prefix='replay-')
+        os.environ.update({
+            'SKILLS_API_USER_LOG': os.path.join(self.data_dir, 'users.jsonl'),
+            'SKILLS_API_SNAPSHOT': os.path.join(self.data_dir, 'index.snapshot'),
+            'SKILLS_API_CHANGE_LOG': os.path.join(self.data_dir, 'changes.jsonl'),
+            'SKILLS_API_INGEST_STATE': os.path.join(self.data_dir, 'ingest.state'),
+            # Replayed requests are not recorded again
+            'SKILLS_API_TRAFFIC_LOG': '',
+        })
+        sys.path.insert(0, BACKEND_DIR)
+        from unified_skills_api import app
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, record):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(record["path"], method=record["method"], json=record.get("body"))
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+class Results:
+    """Thread-safe latency and outcome samples per route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # route -> [latencies, error count, status counts]
+        self._routes = {}
+
+    def add(self, route, latency, status):
+        with self._lock:
+            entry = self._routes.setdefault(route, [[], 0, {}])
+            entry[0].append(latency)
+            if status is None or status >= 400:
+                entry[1] += 1
+            key = str(status) if status is not None else 'exception'
+            entry[2][key] = entry[2].get(key, 0) + 1
+
+    def report(self, elapsed):
+        routes = {}
+        all_latencies = []
+        total_errors = 0
+        for route, (latencies, errors, statuses) in sorted(self._routes.items()):
+            all_latencies.extend(latencies)
+            total_errors += errors
+            routes[route] = _summarize(latencies, errors, elapsed, statuses)
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "total": _summarize(all_latencies, total_errors, elapsed),
+            "routes": routes
+        }
+
+
+def _summarize(latencies, errors, elapsed, statuses=None):
+    latencies = sorted(latencies)
+
+    def percentile(fraction):
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))
+        return round(latencies[index] * 1000, 3)
+
+    summary = {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": percentile(1.0)
+    }
+    if statuses is not None:
+        summary["statuses"] = statuses
+    return summary
+
+
+def _timed_send(target, record, results, started):
+    try:
+        status = target.send(record)
+    except Exception:
+        status = None
+    results.add(route_of(record), time.perf_counter() - started, status)
+
+
+def _request_stream(records, total, duration, started):
+    """Records to send, cycling through the log, until the count or time runs out"""
+    for sent, record in enumerate(itertools.cycle(records)):
+        if total is not None and sent >= total:
+            return
+        if duration is not None and time.perf_counter() - started >= duration:
+            return
+        yield record
+
+
+def run_closed_loop(target, records, concurrency, total, duration):
+    results = Results()
+    started = time.perf_counter()
+    stream = _request_stream(records, total, duration, started)
+    stream_lock = threading.Lock()
+
+    def worker():
+        while True:
+            with stream_lock:
+                record = next(stream, None)
+            if record is None:
+                return
+            _timed_send(target, record, results, time.perf_counter())
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results.report(time.perf_counter() - started)
+
+
+def run_open_loop(target, records, concurrency, rate, total, duration, poisson, seed):
+    results = Results()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    scheduled = started
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record in _request_stream(records, total, duration, started):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # Latency counts from the scheduled start, including time queued for a worker
+            executor.submit(_timed_send, target, record, results, scheduled)
+            scheduled += rng.expovariate(rate) if poisson else 1 / rate
+    return results.report(time.perf_counter() - started)
+
+
+def print_report(report, output=sys.stdout):
+    header = f"{'route':<48} {'reqs':>7} {'rps':>9} {'err%':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+    print(header, file=output)
+    print('-' * len(header), file=output)
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, stats in rows:
+        print(f"{route[:48]:<48} {stats['requests']:>7} {stats['throughput_rps']:>9} "
+              f"{stats['error_rate'] * 100:>6.2f} {stats['p50_ms']!s:>9} {stats['p90_ms']!s:>9} "
+              f"{stats['p99_ms']!s:>9} {stats['max_ms']!s:>9}", file=output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic and report latency per route")
+    parser.add_argument('log', help="JSON-lines traffic log")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument('--url', help="Base URL of a running instance")
+    target_group.add_argument('--in-process', action='store_true', help="Call the app through its test client")
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help="Concurrent workers")
+    parser.add_argument('--rate', type=float, help="Open loop: requests started per second")
+    parser.add_argument('--poisson', action='store_true', help="Open loop with exponential inter-arrival times")
+    parser.add_argument('-n', '--requests', type=int, help="Requests to send (default: the log once)")
+    parser.add_argument('--duration', type=float, help="Stop after this many seconds")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout for --url")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--include-writes', action='store_true',
+                        help="Also replay requests that change data (POST /api/add-user, ...)")
+    parser.add_argument('-o', '--output', help="Also write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    records = load_log(args.log)
+    if not args.include_writes:
+        records, writes = split_writes(records)
+        if writes:
+            print(f"Skipping {len(writes)} write requests (replay them with --include-writes)", file=sys.stderr)
+    if not records:
+        parser.error(f"no replayable records in {args.log}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    total = args.requests
+    if total is None and args.duration is None:
+        total = len(records)
+
+    target = InProcessTarget() if args.in_process else HttpTarget(args.url, args.timeout)
+    try:
+        if args.rate is None:
+            report = run_closed_loop(target, records, args.concurrency, total, args.duration)
+        else:
+            report = run_open_loop(target, records, args.concurrency, args.rate, total, args.duration,
+                                   args.poisson, args.seed)
+    finally:
+        target.close()
+    report["mode"] = "closed" if args.rate is None else ("poisson" if args.poisson else "open")
+    report["concurrency"] = args.concurrency
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target_file:
+            json.dump(report, target_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Benchmark every API endpoint against synthetic datasets of increasing size.
+
+Each size runs in a fresh interpreter. The synthetic users, roles and career
+paths are swapped into the dataset modules before the API is imported, so
+every index is built from them. Each endpoint is driven through the Flask
+test client with a rotating set of request bodies, so the analysis caches
+see realistic hit rates. Reported per endpoint:
+- ops/sec, and p50/p99 latency
+- peak traced allocation during one extra call
+- the error count
+
+Reported per size:
+- build time, and the process's peak RSS
+
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 -o results.json
+    python benchmarks/run_benchmarks.py --sizes 1000 --compare results.json
+
+With ``--compare``, endpoints that got slower by more than ``--tolerance``
+(ops/sec or p99) than in the earlier results are listed. The exit status is
+then 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from urllib.parse import quote
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+DEFAULT_SIZES = (1000, 10000)
+# Distinct request bodies cycled through per endpoint
+REQUEST_VARIANTS = 50
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def build_requests(dataset, seed):
+    """Endpoint name -> list of (method, url, JSON body) variants"""
+    rng = random.Random(seed)
+    skills = dataset["skills"]
+    roles = list(dataset["job_requirements"])
+    careers = list(dataset["career_paths"])
+    user_ids = [user["id"] for user in dataset["users"]]
+
+    def profile():
+        return rng.sample(skills, min(len(skills), rng.randint(2, 6)))
+
+    def variants(make):
+        return [make() for _ in range(REQUEST_VARIANTS)]
+
+    return {
+        'health': [('GET', '/health', None)],
+        'status': [('GET', '/api/status', None)],
+        'data-summary': [('GET', '/api/data-summary', None)],
+        'categories': [('GET', '/api/categories', None)],
+        'career-paths': [('GET', '/api/career-paths', None)],
+        'roles': [('GET', '/api/roles', None)],
+        'role': variants(lambda: ('GET', f'/api/role/{rng.choice(roles)}', None)),
+        'users': [('GET', '/api/users', None)],
+        'users-stream': [('GET', '/api/users?stream=1', None)],
+        'user': variants(lambda: ('GET', f'/api/user/{rng.choice(user_ids)}', None)),
+        'matches': variants(lambda: ('POST', '/api/matches', {
+            'user_skills': profile(), 'desired_skills': profile()})),
+        'search-users': variants(lambda: ('POST', '/api/search-users', {
+            'keywords': [skill.lower() for skill in rng.sample(skills, 2)],
+            'search_type': rng.choice(['skills', 'wanted', 'both'])})),
+        'search-users-fuzzy': variants(lambda: ('POST', '/api/search-users', {
+            'keywords': [skill.lower()[:-1] for skill in rng.sample(skills, 2)], 'match_mode': 'fuzzy'})),
+        'browse-users': variants(lambda: ('GET', '/api/browse-users?sort_by={}&search={}'.format(
+            rng.choice(['name', 'skills_count', 'match_score']), rng.choice(['', 'python', 'skill 0'])), None)),
+        'autocomplete': variants(lambda: ('GET', '/api/autocomplete?q={}&type={}'.format(
+            quote(rng.choice(skills + [user["name"] for user in rng.sample(dataset["users"], 5)])
+                  .lower()[:rng.randint(1, 4)]),
+            rng.choice(['skills', 'users', 'all'])), None)),
+        'swaps': variants(lambda: ('GET', f'/api/swaps/{rng.choice(user_ids)}?max_length={rng.choice([3, 4])}', None)),
+        'recommendations': variants(lambda: ('POST', '/api/recommendations', {
+            'current_skills': profile(), 'career_goal': rng.choice(careers)})),
+        'skills-analysis': variants(lambda: ('POST', '/api/skills-analysis', {'current_skills': profile()})),
+        'learning-path': variants(lambda: ('POST', '/api/learning-path', {
+            'current_skills': profile(), 'target_career': rng.choice(careers)})),
+        'analyze': variants(lambda: ('POST', '/api/analyze', {
+            'current_skills': profile(), 'target_role': rng.choice(roles)})),
+        'compare-roles': variants(lambda: ('POST', '/api/compare-roles', {
+            'current_skills': profile(), 'roles': rng.sample(roles, min(len(roles), 5))})),
+        'ready-users': variants(lambda: ('GET', '/api/ready-users?{}={}'.format(
+            *rng.choice([('role', rng.choice(roles)), ('career_path', rng.choice(careers))])), None)),
+        'skills-overview': variants(lambda: ('POST', '/api/skills-overview', {'current_skills': profile()})),
+        'comprehensive-analysis': variants(lambda: ('POST', '/api/comprehensive-analysis', {
+            'current_skills': profile(), 'target_role': rng.choice(roles),
+            'career_goal': rng.choice(careers), 'desired_skills': profile()})),
+    }
+
+
+def _call(client, method, url, body):
+    response = client.open(url, method=method, json=body)
+    # Drain streamed bodies so their cost is measured too
+    response.get_data()
+    return response.status_code
+
+
+def measure(client, variants, iterations, max_seconds):
+    """Latency statistics for one endpoint"""
+    for method, url, body in variants[:3]:
+        _call(client, method, url, body)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for index in range(iterations):
+        method, url, body = variants[index % len(variants)]
+        call_started = time.perf_counter()
+        if _call(client, method, url, body) >= 400:
+            errors += 1
+        latencies.append(time.perf_counter() - call_started)
+        if time.perf_counter() - started > max_seconds:
+            break
+    elapsed = time.perf_counter() - started
+
+    method, url, body = variants[len(latencies) % len(variants)]
+    tracemalloc.start()
+    _call(client, method, url, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "ops_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_alloc_bytes": peak
+    }
+
+
+def run_size(size, seed, iterations, max_seconds, endpoints=None):
+    """Benchmark every endpoint at one dataset size; call in a fresh interpreter"""
+    sys.path.insert(0, BACKEND_DIR)
+    sys.path.insert(0, BENCHMARKS_DIR)
+    # Benchmarks never read or write the persisted user log or snapshot
+    os.environ['SKILLS_API_USER_LOG'] = ''
+    os.environ['SKILLS_API_SNAPSHOT'] = ''
+
+    from synthetic import generate_dataset
+    import skill_matcher
+    import skill_recommender
+    import skill_gap_analyzer
+
+    generated_at = time.perf_counter()
+    dataset = generate_dataset(size, seed)
+    generate_seconds = time.perf_counter() - generated_at
+
+    # Swapped in place so functions in those modules see the same data
+    skill_matcher.USERS_DATABASE[:] = dataset["users"]
+    skill_gap_analyzer.JOB_REQUIREMENTS.clear()
+    skill_gap_analyzer.JOB_REQUIREMENTS.update(dataset["job_requirements"])
+    skill_recommender.CAREER_PATHS.clear()
+    skill_recommender.CAREER_PATHS.update(dataset["career_paths"])
+
+    build_started = time.perf_counter()
+    import unified_skills_api
+    build_seconds = time.perf_counter() - build_started
+
+    client = unified_skills_api.app.test_client()
+    results = {}
+    for name, variants in build_requests(dataset, seed).items():
+        if endpoints and name not in endpoints:
+            continue
+        results[name] = measure(client, variants, iterations, max_seconds)
+        print(f"  {size:>8} {name:<24} {results[name]['ops_per_sec']:>10} ops/s  "
+              f"p50 {results[name]['p50_ms']:>9} ms  p99 {results[name]['p99_ms']:>9} ms", file=sys.stderr)
+
+    return {
+        "users": size,
+        "roles": len(dataset["job_requirements"]),
+        "career_paths": len(dataset["career_paths"]),
+        "generate_seconds": round(generate_seconds, 3),
+        "build_seconds": round(build_seconds, 3),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "endpoints": results
+    }
+
+
+def compare(previous, current, tolerance):
+    """Endpoints slower than ``previous`` by more than ``tolerance`` (a fraction)"""
+    earlier = {(run["users"], name): stats
+               for run in previous["runs"] for name, stats in run["endpoints"].items()}
+    regressions = []
+    for run in current["runs"]:
+        for name, stats in run["endpoints"].items():
+            before = earlier.get((run["users"], name))
+            if before is None:
+                continue
+            if stats["ops_per_sec"] < before["ops_per_sec"] * (1 - tolerance):
+                regressions.append(f"{run['users']} users {name}: ops/sec "
+                                   f"{before['ops_per_sec']} -> {stats['ops_per_sec']}")
+            if stats["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{run['users']} users {name}: p99 "
+                                   f"{before['p99_ms']} ms -> {stats['p99_ms']} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Unified Skills API on synthetic data")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated user counts, e.g. 1000,10000,100000,1000000")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=200, help="Requests per endpoint")
+    parser.add_argument('--max-seconds', type=float, default=10.0, help="Time budget per endpoint")
+    parser.add_argument('--endpoints', default='', help="Comma-separated subset of endpoint names")
+    parser.add_argument('-o', '--output', help="Write results JSON here")
+    parser.add_argument('--compare', help="Earlier results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown before flagging")
+    parser.add_argument('--single-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    endpoints = [name for name in args.endpoints.split(',') if name]
+
+    if args.single_size is not None:
+        result = run_size(args.single_size, args.seed, args.iterations, args.max_seconds, endpoints)
+        json.dump(result, sys.stdout)
+        return 0
+
+    runs = []
+    for size in (int(size) for size in args.sizes.split(',')):
+        command = [sys.executable, os.path.abspath(__file__), '--single-size', str(size),
+                   '--seed', str(args.seed), '--iterations', str(args.iterations),
+                   '--max-seconds', str(args.max_seconds), '--endpoints', args.endpoints]
+        completed = subprocess.run(command, stdout=subprocess.PIPE, check=True)
+        runs.append(json.loads(completed.stdout))
+
+    results = {
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "iterations": args.iterations,
+        "runs": runs
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target:
+            json.dump(results, target, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as source:
+            regressions = compare(json.load(source), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Deterministic synthetic datasets shaped like the API's real ones.
+
+The same size and seed always give the same data. Skill popularity follows a
+Zipf-like curve, so a few skills are very common and most are rare, as in
+the real user base.
+"""
+
+import itertools
+import random
+
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn',
+               'Priya', 'Wei', 'Amara', 'Mateo', 'Yuki', 'Leila', 'Omar', 'Ines', 'Kofi', 'Sofia']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Kim', 'Haddad', 'Muller', 'Rossi',
+              'Ivanova', 'Patel', 'Nakamura', 'Johansson', 'Mensah', 'Dubois', 'Kowalski', 'Lopez']
+SEED_SKILLS = ['Python', 'JavaScript', 'TypeScript', 'React', 'Node.js', 'SQL', 'Docker', 'Kubernetes',
+               'AWS', 'Java', 'Go', 'Rust', 'Machine Learning', 'Data Analysis', 'HTML', 'CSS',
+               'PostgreSQL', 'MongoDB', 'GraphQL', 'Figma', 'UI Design', 'Project Management']
+
+
+def skill_pool(size):
+    """``size`` skill names: the common real ones first, then numbered ones"""
+    names = SEED_SKILLS[:size]
+    names += [f"Skill {index:05d}" for index in range(size - len(names))]
+    return names
+
+
+def pool_size_for(users):
+    """Distinct skills for a user base of ``users``: grows slowly with size"""
+    return max(len(SEED_SKILLS), min(20000, int(users ** 0.6)))
+
+
+class SkillSampler:
+    """Draws distinct skills with Zipf-like popularity"""
+
+    def __init__(self, skills, rng, exponent=1.1):
+        self.skills = skills
+        self.rng = rng
+        self._cumulative = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(len(skills))))
+
+    def sample(self, count):
+        count = min(count, len(self.skills))
+        chosen = {}
+        while len(chosen) < count:
+            for skill in self.rng.choices(self.skills, cum_weights=self._cumulative, k=count - len(chosen)):
+                chosen.setdefault(skill, None)
+        return list(chosen)
+
+
+def generate_users(count, sampler, rng, first_id=1):
+    """``USERS_DATABASE``-shaped users"""
+    users = []
+    for user_id in range(first_id, first_id + count):
+        users.append({
+            "id": user_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {user_id}",
+            "skills": sampler.sample(rng.randint(1, 8)),
+            "skillsWanted": sampler.sample(rng.randint(1, 5))
+        })
+    return users
+
+
+def generate_job_requirements(count, sampler, rng):
+    """``JOB_REQUIREMENTS``-shaped roles"""
+    roles = {}
+    for index in range(count):
+        skills = sampler.sample(rng.randint(4, 12))
+        essential, preferred = max(1, len(skills) // 3), max(1, len(skills) // 3)
+        roles[f"Role {index:04d}"] = {
+            "essential": skills[:essential],
+            "preferred": skills[essential:essential + preferred],
+            "nice_to_have": skills[essential + preferred:]
+        }
+    return roles
+
+
+def generate_career_paths(count, sampler, rng):
+    """``CAREER_PATHS``-shaped paths"""
+    return {f"Career {index:04d}": sampler.sample(rng.randint(5, 15)) for index in range(count)}
+
+
+def generate_dataset(users, seed=0):
+    """Users, roles and career paths for a user base of ``users``"""
+    rng = random.Random(f"{seed}:{users}")
+    sampler = SkillSampler(skill_pool(pool_size_for(users)), rng)
+    role_count = max(10, min(2000, users // 500))
+    return {
+        "skills": sampler.skills,
+        "users": generate_users(users, sampler, rng),
+        "job_requirements": generate_job_requirements(role_count, sampler, rng),
+        "career_paths": generate_career_paths(max(5, role_count // 2), sampler, rng)
+    }
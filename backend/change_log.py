@@ -0,0 +1,370 @@
+"""
+Ingestion of user changes from the Node/Mongo backend.
+
+The Express app (src/models/User.model.js) is the source of truth for real
+users. Its changes arrive as an ordered JSON-lines change log, one event per
+line, in either of two shapes:
+
+    {"op": "upsert", "user": {"_id": "...", "fullName": "...",
+     "skillsOffered": [{"skillName": "Python", "rating": 4}], "skillsWanted": [...]},
+     "ts": 1700000000.0}
+    {"op": "delete", "id": "...", "ts": 1700000000.0}
+
+or MongoDB change stream events (``operationType``, ``fullDocument``,
+``documentKey``) as written by a watcher. ``ts`` (epoch seconds or ISO 8601)
+is optional and only used to report lag.
+
+ChangeLogIngester tails the file from the byte offset it last applied and
+hands each batch to UserStore.apply_changes, which logs the changes and
+updates every subscribed index in place. A poll applies one bounded batch,
+so the request that triggers it is only held up that long; a backlog is
+worked off over the following polls, or all at once by ``drain()``. An
+event longer than one read is skipped and counted as such, rather than
+stalling the log behind it. Node ids map to store ids through the store. The offset is kept in a state file, so a restart resumes where it
+stopped. Several server processes may poll the same log: only the one
+holding the state file's lock ingests a batch, and the others pick it up
+from the shared user log. A batch applied twice after a crash leaves the
+store as it was, since puts replace and deletes of unknown users do nothing.
+
+Producers that would rather write to a local socket can go through the
+spooler, which appends every complete line it receives to the change log:
+
+    python change_log.py spool --socket /tmp/skills-changes.sock
+    python change_log.py lag
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; single process only
+    fcntl = None
+
+# Most of the change log read and applied as one batch
+READ_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_BATCH_EVENTS = 1000
+
+logger = logging.getLogger(__name__)
+
+UPSERT_OPS = ('upsert', 'insert', 'update', 'replace')
+DELETE_OPS = ('delete',)
+
+
+def _external_id(value):
+    """Node user id as a string, from a plain id or extended JSON ({"$oid": ...})"""
+    if isinstance(value, dict):
+        value = value.get('$oid')
+    if not isinstance(value, (str, int)) or isinstance(value, bool) or value == '':
+        raise ValueError("event has no user id")
+    return str(value)
+
+
+def _skill_names(entries):
+    """Skill names of a skillsOffered / skillsWanted array ({skillName, rating} or plain strings)"""
+    names = []
+    for entry in entries or []:
+        if isinstance(entry, dict):
+            entry = entry.get('skillName')
+        if isinstance(entry, str) and entry.strip():
+            names.append(entry.strip())
+    return names
+
+
+def _timestamp(value):
+    """Epoch seconds of an event's ``ts``, or None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def parse_event(event):
+    """
+    UserStore.apply_changes change for one change log event.
+
+    Raises ValueError for events that are not user upserts or deletes.
+    """
+    if not isinstance(event, dict):
+        raise ValueError("event is not an object")
+    op = event.get('op', event.get('operationType'))
+    if op in DELETE_OPS:
+        key = event.get('id', (event.get('documentKey') or {}).get('_id'))
+        return {"op": "delete", "external_id": _external_id(key)}
+    if op not in UPSERT_OPS:
+        raise ValueError(f"unknown op: {op!r}")
+
+    user = event.get('user', event.get('fullDocument'))
+    if not isinstance(user, dict):
+        raise ValueError("upsert without a user document")
+    name = user.get('fullName') or user.get('username') or user.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("user document has no name")
+    return {
+        "op": "put",
+        "external_id": _external_id(user.get('_id', event.get('id'))),
+        "name": name.strip(),
+        "skills": _skill_names(user.get('skillsOffered', user.get('skills'))),
+        "skillsWanted": _skill_names(user.get('skillsWanted'))
+    }
+
+
+class ChangeLogIngester:
+    """Applies a JSON-lines change log to a UserStore, resuming from a saved offset"""
+
+    def __init__(self, user_store, path, state_path=None, interval=1.0, batch_events=DEFAULT_BATCH_EVENTS):
+        self.path = path
+        self.state_path = state_path
+        self.interval = interval
+        self.batch_events = batch_events
+        self._user_store = user_store
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        # Whether the last poll stopped short of the end of the change log
+        self._behind = False
+        # Offset and counters; re-read from the state file before every batch when there is one
+        self._state = {"offset": 0, "applied": 0, "skipped": 0, "last_event_ts": None, "last_applied_at": None}
+
+    def poll_if_due(self):
+        """poll(), at most once per ``interval`` seconds unless the last one left a backlog"""
+        now = time.monotonic()
+        if now < self._next_poll and not self._behind:
+            return 0
+        self._next_poll = now + self.interval
+        return self.poll()
+
+    def drain(self):
+        """Poll until the whole change log is applied; returns the number of events applied"""
+        applied = self.poll()
+        while self._behind:
+            applied += self.poll()
+        return applied
+
+    def poll(self):
+        """
+        Apply the next batch of complete events past the saved offset: at most
+        ``batch_events`` of them, from one READ_CHUNK_BYTES read. Returns the
+        number applied.
+        """
+        self._behind = False
+        if not os.path.exists(self.path):
+            return 0
+        with self._lock, self._state_locked() as owned:
+            if not owned:
+                return 0
+            state = self._load_state()
+            if os.path.getsize(self.path) < state["offset"]:
+                logger.warning("Change log %s shrank below the applied offset; re-reading it", self.path)
+                state["offset"] = 0
+            with open(self.path, 'rb') as log:
+                log.seek(state["offset"])
+                data = log.read(READ_CHUNK_BYTES)
+                oversized = 0
+                if len(data) == READ_CHUNK_BYTES and b"\n" not in data:
+                    oversized = self._line_length(log, len(data))
+            if oversized:
+                # A line no read can hold would stall ingestion for good
+                logger.warning("Skipping change log event of %d bytes (more than %d)", oversized, READ_CHUNK_BYTES)
+                state["skipped"] += 1
+                state["offset"] += oversized
+                self._save_state(state)
+                self._behind = state["offset"] < os.path.getsize(self.path)
+                return 0
+            # A line without its newline is still being written
+            lines = data[:data.rfind(b"\n") + 1].splitlines(keepends=True)
+            if not lines:
+                return 0
+
+            changes = []
+            consumed = 0
+            for line in lines:
+                if len(changes) == self.batch_events:
+                    break
+                consumed += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                    changes.append(parse_event(event))
+                except ValueError as e:
+                    logger.warning("Skipping change log event: %s", e)
+                    state["skipped"] += 1
+                    continue
+                state["last_event_ts"] = _timestamp(event.get('ts')) or state["last_event_ts"]
+            self._user_store.apply_changes(changes)
+
+            state["applied"] += len(changes)
+            state["offset"] += consumed
+            state["last_applied_at"] = time.time()
+            self._save_state(state)
+            self._behind = state["offset"] < os.path.getsize(self.path)
+            return len(changes)
+
+    def lag(self):
+        """Offset, counters and how far the applied offset trails the change log"""
+        state = self._load_state()
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        pending = max(0, size - state["offset"])
+        lag_seconds = 0.0 if not pending else None
+        if pending:
+            # Age of the oldest event not applied yet, when it carries a timestamp
+            with contextlib.suppress(OSError, ValueError, AttributeError):
+                with open(self.path, 'rb') as log:
+                    log.seek(state["offset"])
+                    ts = _timestamp(json.loads(log.readline()).get('ts'))
+                if ts is not None:
+                    lag_seconds = max(0.0, time.time() - ts)
+        return {
+            "change_log": self.path,
+            "offset": state["offset"],
+            "pending_bytes": pending,
+            "lag_seconds": lag_seconds,
+            "events_applied": state["applied"],
+            "events_skipped": state["skipped"],
+            "last_event_ts": state["last_event_ts"],
+            "last_applied_at": state["last_applied_at"]
+        }
+
+    @staticmethod
+    def _line_length(log, read):
+        """
+        Length, newline included, of the line whose first ``read`` bytes were
+        just read from ``log``; 0 if its newline is not written yet
+        """
+        while True:
+            chunk = log.read(READ_CHUNK_BYTES)
+            if not chunk:
+                return 0
+            newline = chunk.find(b"\n")
+            if newline >= 0:
+                return read + newline + 1
+            read += len(chunk)
+
+    def _load_state(self):
+        if not self.state_path:
+            return self._state
+        try:
+            with open(self.state_path, encoding='utf-8') as state_file:
+                saved = json.load(state_file)
+        except FileNotFoundError:
+            return dict(self._state)
+        except ValueError as e:
+            logger.warning("Unreadable ingestion state %s (%s); re-reading the change log", self.state_path, e)
+            return dict(self._state)
+        return {**self._state, **saved}
+
+    def _save_state(self, state):
+        self._state = state
+        if not self.state_path:
+            return
+        # Written aside and renamed, so a crash leaves the previous state intact
+        partial = self.state_path + '.tmp'
+        with open(partial, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+        os.replace(partial, self.state_path)
+
+    @contextlib.contextmanager
+    def _state_locked(self):
+        """Yields whether this process may ingest now; other processes holding the lock mean no"""
+        if not self.state_path or fcntl is None:
+            yield True
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        with open(self.state_path + '.lock', 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class _SpoolHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            # A final line cut off by the disconnect is dropped, never half-written
+            if line.endswith(b"\n") and line.strip():
+                self.server.append(line)
+
+
+class ChangeLogSpooler(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server appending the JSON lines it receives to the change log"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, change_log_path):
+        self.change_log_path = change_log_path
+        self._append_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(change_log_path)), exist_ok=True)
+        self._log_file = open(change_log_path, 'ab')
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _SpoolHandler)
+
+    def append(self, line):
+        with self._append_lock:
+            self._log_file.write(line)
+            self._log_file.flush()
+
+    def server_close(self):
+        super().server_close()
+        self._log_file.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.server_address)
+
+
+def main(argv=None):
+    import api_config
+
+    parser = argparse.ArgumentParser(description="Change log spooler and ingestion status")
+    parser.add_argument('--change-log', default=api_config.CHANGE_LOG_PATH,
+                        help="JSON-lines change log (default: SKILLS_API_CHANGE_LOG)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    spool = commands.add_parser('spool', help="Append events received on a Unix socket to the change log")
+    spool.add_argument('--socket', default=api_config.CHANGE_LOG_SOCKET,
+                       help="Socket path (default: SKILLS_API_CHANGE_LOG_SOCKET)")
+    commands.add_parser('lag', help="Print the applied offset and ingestion lag as JSON")
+    args = parser.parse_args(argv)
+    if not args.change_log:
+        parser.error("no change log: pass --change-log or set SKILLS_API_CHANGE_LOG")
+
+    if args.command == 'lag':
+        state_path = api_config.INGEST_STATE_PATH if api_config.USER_LOG_PATH else None
+        print(json.dumps(ChangeLogIngester(None, args.change_log, state_path).lag(), indent=2))
+        return 0
+
+    if not args.socket:
+        parser.error("no socket: pass --socket or set SKILLS_API_CHANGE_LOG_SOCKET")
+    server = ChangeLogSpooler(args.socket, args.change_log)
+    print(f"Spooling {args.socket} -> {args.change_log}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
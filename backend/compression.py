@@ -0,0 +1,58 @@
+"""
+Compression of dynamic response bodies.
+
+Bodies of at least ``min_bytes`` are compressed with brotli (when the
+``brotli`` package is installed) or gzip, whichever the request's
+Accept-Encoding allows. Levels favour speed, since every body is compressed
+anew. Streamed responses, ones that already carry a Content-Encoding or an
+ETag (the catalog cache serves its own pre-compressed variants), and
+``Cache-Control: no-transform`` responses are left alone.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_MIMETYPES = frozenset(('application/json', 'application/x-ndjson'))
+
+
+def _compressible(response, min_bytes):
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if 'Content-Encoding' in response.headers or 'ETag' in response.headers:
+        return False
+    if response.cache_control.no_transform:
+        return False
+    mimetype = response.mimetype or ''
+    if mimetype not in COMPRESSIBLE_MIMETYPES and not mimetype.startswith('text/'):
+        return False
+    return response.content_length is not None and response.content_length >= min_bytes
+
+
+def compress_response(response, min_bytes):
+    """Compress ``response`` in place if it is large enough and the client accepts it"""
+    if not _compressible(response, min_bytes):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        encoding, body = 'br', brotli.compress(response.get_data(), quality=BROTLI_QUALITY)
+    elif accepted.quality('gzip') > 0:
+        encoding, body = 'gzip', gzip.compress(response.get_data(), GZIP_LEVEL, mtime=0)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,155 @@
+"""
+Versioned binary snapshot of the loaded datasets and their derived indexes.
+
+Building the user store, skill vocabulary, search postings, match postings and
+role matrix from the raw datasets is repeated on every start. A snapshot holds
+all of them pickled together, so a start only has to map the file, verify it
+and unpickle.
+
+File layout (little endian):
+
+    magic (8 bytes) | format version (u16) | fingerprint (32) | payload sha256 (32)
+    | payload length (u64) | payload
+
+The fingerprint covers everything the indexes are built from (the dataset
+values themselves, dataset and index module sources, settings). The payload also records how many bytes of
+each append-only file (the user log) are already reflected in it, together
+with a digest of those bytes; records appended since are replayed on top.
+
+    python index_snapshot.py build
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+MAGIC = b'SKSNAP\x00\x01'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sH32s32sQ')
+
+
+class SnapshotError(ValueError):
+    """The snapshot is unreadable, corrupt or stale"""
+
+
+def fingerprint(source_paths, settings=(), datasets=()):
+    """
+    Digest of the given source files' contents, extra settings and the
+    contents of the datasets (JSON-serializable objects) the state derives from
+    """
+    digest = hashlib.sha256(f"snapshot-v{FORMAT_VERSION}".encode())
+    for path in source_paths:
+        digest.update(os.path.basename(path).encode() + b"\0")
+        with open(path, 'rb') as source:
+            digest.update(hashlib.sha256(source.read()).digest())
+    for setting in settings:
+        digest.update(repr(setting).encode() + b"\0")
+    for dataset in datasets:
+        # Datasets may be loaded from elsewhere than the source files, so their values are hashed
+        encoded = json.dumps(dataset, sort_keys=True, separators=(',', ':'), default=str)
+        digest.update(hashlib.sha256(encoded.encode()).digest())
+    return digest.digest()
+
+
+def _prefix_digest(path, length):
+    """Sha256 of the first ``length`` bytes of ``path``, or None if it is shorter"""
+    if not length:
+        return hashlib.sha256().hexdigest()
+    try:
+        with open(path, 'rb') as source:
+            data = source.read(length)
+    except FileNotFoundError:
+        return None
+    if len(data) < length:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def save(path, source_fingerprint, state, appended_files=None):
+    """
+    Write ``state`` atomically to ``path``.
+
+    ``appended_files`` maps append-only files to the number of their leading
+    bytes already reflected in ``state``.
+    """
+    prefixes = {
+        file_path: (length, _prefix_digest(file_path, length))
+        for file_path, length in (appended_files or {}).items()
+    }
+    payload = pickle.dumps({"state": state, "prefixes": prefixes}, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, source_fingerprint,
+                          hashlib.sha256(payload).digest(), len(payload))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as target:
+        target.write(header)
+        target.write(payload)
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary, path)
+
+
+def load(path, source_fingerprint):
+    """
+    The state saved in ``path``, or None if there is no snapshot.
+
+    Raises SnapshotError when the snapshot does not match
+    ``source_fingerprint``, fails its checksum, or an append-only file it
+    covers has changed underneath it.
+    """
+    try:
+        snapshot_file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+
+    with snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size < _HEADER.size:
+            raise SnapshotError("truncated header")
+        mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    with mapped:
+        magic, version, stored_fingerprint, checksum, length = _HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SnapshotError("unknown snapshot format")
+        if stored_fingerprint != source_fingerprint:
+            raise SnapshotError("built from different datasets or code")
+        if len(mapped) != _HEADER.size + length:
+            raise SnapshotError("truncated payload")
+
+        with memoryview(mapped)[_HEADER.size:] as payload:
+            if hashlib.sha256(payload).digest() != checksum:
+                raise SnapshotError("checksum mismatch")
+            snapshot = pickle.loads(payload)
+
+    for file_path, (length, digest) in snapshot["prefixes"].items():
+        if _prefix_digest(file_path, length) != digest:
+            raise SnapshotError(f"{file_path} changed since the snapshot was built")
+    return snapshot["state"]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv != ['build']:
+        print("usage: python index_snapshot.py build", file=sys.stderr)
+        return 2
+
+    import api_config
+    if not api_config.SNAPSHOT_PATH:
+        print("SKILLS_API_SNAPSHOT is empty; snapshots are disabled", file=sys.stderr)
+        return 1
+    # Without a snapshot, importing the API builds the indexes and writes a new one
+    if os.path.exists(api_config.SNAPSHOT_PATH):
+        os.remove(api_config.SNAPSHOT_PATH)
+    import unified_skills_api  # noqa: F401
+    print(f"Wrote {api_config.SNAPSHOT_PATH} ({os.path.getsize(api_config.SNAPSHOT_PATH)} bytes)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
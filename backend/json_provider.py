@@ -0,0 +1,119 @@
+"""
+Flask JSON provider backed by orjson, with the stdlib encoder as fallback.
+
+Bodies are encoded straight to bytes with orjson when it is installed. Calls
+that orjson cannot honour (custom encoder options, integers wider than 64
+bits) go through the stdlib ``json`` module with Flask's usual settings.
+orjson writes non-ASCII characters as UTF-8 rather than ``\\u`` escapes.
+
+RawJSON wraps JSON that is already encoded, such as a memoized analysis.
+Wherever one appears in a response it is spliced in verbatim instead of being
+encoded again. The encoders emit a placeholder string for each fragment, and
+the fragments replace those placeholders in one pass over the output. The
+placeholder token is random per process, so request data cannot forge one.
+"""
+
+import json
+import re
+import secrets
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_PLACEHOLDER_TOKEN = secrets.token_hex(8)
+# How both encoders write a placeholder string: NUL is always \u-escaped
+_PLACEHOLDER = re.compile(rb'"\\u0000' + _PLACEHOLDER_TOKEN.encode('ascii') + rb':(\d+)"')
+
+# json.dumps keyword arguments the orjson path can honour
+_ORJSON_KWARGS = frozenset(('default', 'sort_keys', 'ensure_ascii', 'separators', 'indent'))
+
+
+class RawJSON:
+    """Already-encoded JSON, spliced verbatim into responses"""
+
+    __slots__ = ('encoded',)
+
+    def __init__(self, encoded):
+        self.encoded = encoded
+
+    def __len__(self):
+        return len(self.encoded)
+
+    def __repr__(self):
+        return f"RawJSON({self.encoded!r})"
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes with orjson and splices RawJSON fragments"""
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def dumps_bytes(self, obj, **kwargs):
+        """``obj`` encoded as UTF-8 JSON bytes"""
+        fallback = kwargs.pop('default', self.default)
+        fragments = []
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                fragments.append(value.encoded)
+                return f"\x00{_PLACEHOLDER_TOKEN}:{len(fragments) - 1}"
+            return fallback(value)
+
+        encoded = None
+        options = self._orjson_options(kwargs)
+        if options is not None:
+            try:
+                encoded = orjson.dumps(obj, default=default, option=options)
+            except orjson.JSONEncodeError:
+                # Beyond orjson (e.g. a 65-bit integer); the stdlib decides
+                fragments.clear()
+        if encoded is None:
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            encoded = json.dumps(obj, default=default, **kwargs).encode('utf-8')
+
+        if fragments:
+            encoded = _PLACEHOLDER.sub(lambda match: fragments[int(match[1])], encoded)
+        return encoded
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # The stdlib accepts a little more (NaN, huge integers) and words the error
+                pass
+        return super().loads(s, **kwargs)
+
+    def fragment(self, value):
+        """``value`` pre-encoded, compactly, as a RawJSON fragment"""
+        return RawJSON(self.dumps_bytes(value, separators=(',', ':')))
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args = {'indent': 2}
+        else:
+            dump_args = {'separators': (',', ':')}
+        return self._app.response_class(self.dumps_bytes(obj, **dump_args) + b"\n", mimetype=self.mimetype)
+
+    def _orjson_options(self, kwargs):
+        """orjson option flags matching ``kwargs``, or None to use the stdlib"""
+        if orjson is None or not _ORJSON_KWARGS.issuperset(kwargs):
+            return None
+        separators = kwargs.get('separators')
+        indent = kwargs.get('indent')
+        if indent not in (None, 2) or (indent is None and separators not in (None, (',', ':'))):
+            return None
+        # Flask's own default() handles dates, decimals, UUIDs and dataclasses
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        if indent == 2:
+            options |= orjson.OPT_INDENT_2
+        return options
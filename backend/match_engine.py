@@ -0,0 +1,169 @@
+"""
+Complementary-skill matching over column-wise offered/wanted skill matrices.
+
+Users are kept as two sparse user x skill matrices stored column-wise: for
+every vocabulary id, the set of users offering it and the set of users
+wanting it, plus each user's row of offered and wanted ids. The columns are
+updated in place as users are added or removed, so writes to the user store
+(and change log events) reach /api/matches at once. They are also the single
+copy the skill-swap graph reads, and subscribers are told of every row
+change so they can maintain what they derive from them.
+
+``find_matches`` reproduces skill_matcher.find_skill_matches, which scans
+every user: a user scores TEACH_POINTS for each of their skills the requester
+desires and LEARN_POINTS for each skill they want that the requester has,
+compared as spelled, and the reasons are those skills in the user's order,
+offered ones first. Here only the users in the columns of the requested
+skills are looked at, and the top-k is picked with a bounded heap, ties in
+the order users were added, as the scan returns them.
+"""
+
+import heapq
+import threading
+
+EMPTY_ROW = (frozenset(), frozenset())
+
+# Score of a match for each skill the user can teach / wants to learn
+TEACH_POINTS = 10
+LEARN_POINTS = 5
+
+
+class MatchEngine:
+    """Column-wise offered/wanted skill matrices over the user table"""
+
+    def __init__(self, vocabulary, users=()):
+        self._vocabulary = vocabulary
+        self._lock = threading.RLock()
+        # skill id -> ids of users offering / wanting it
+        self._offered_by = {}
+        self._wanted_by = {}
+        # user id -> (offered skill ids, wanted skill ids)
+        self._rows = {}
+        # user id -> (skills, skills wanted) as listed, for exact scoring and reasons
+        self._listed = {}
+        # user id -> rank of its first addition, kept while it is replaced
+        self._positions = {}
+        self._next_position = 0
+        self._listeners = []
+        for user in users:
+            self.add_user(user)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, user_id):
+        return user_id in self._rows
+
+    def __iter__(self):
+        return iter(list(self._rows))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def lock(self):
+        """Held while a write is in progress; readers combining several columns take it too"""
+        return self._lock
+
+    def subscribe(self, listener):
+        """Call ``listener.row_changed(user_id, previous row, new row)`` after every change"""
+        self._listeners.append(listener)
+
+    def add_user(self, user):
+        """Add a user's row, replacing any previous row with the same id"""
+        with self._lock:
+            user_id = user['id']
+            previous = self._drop(user_id)
+
+            offered = frozenset(self._vocabulary.add(skill) for skill in user['skills'])
+            wanted = frozenset(self._vocabulary.add(skill) for skill in user['skillsWanted'])
+            row = self._rows[user_id] = (offered, wanted)
+            self._listed[user_id] = (tuple(user['skills']), tuple(user['skillsWanted']))
+            if user_id not in self._positions:
+                self._positions[user_id] = self._next_position
+                self._next_position += 1
+            for skill_id in offered:
+                self._offered_by.setdefault(skill_id, set()).add(user_id)
+            for skill_id in wanted:
+                self._wanted_by.setdefault(skill_id, set()).add(user_id)
+            for listener in self._listeners:
+                listener.row_changed(user_id, previous, row)
+
+    def remove_user(self, user_id):
+        with self._lock:
+            previous = self._drop(user_id)
+            self._listed.pop(user_id, None)
+            self._positions.pop(user_id, None)
+            if previous is not EMPTY_ROW:
+                for listener in self._listeners:
+                    listener.row_changed(user_id, previous, EMPTY_ROW)
+
+    def find_matches(self, user_skills, desired_skills, limit=None):
+        """
+        Users complementing a requester, as skill_matcher.find_skill_matches
+        scores them: ``({"userId", "matchScore", "reasons"} dicts, best
+        first, at most ``limit`` of them; the number of users matching)``
+        """
+        known = frozenset(user_skills)
+        desired = frozenset(desired_skills)
+        with self._lock:
+            # Any user listing one of the spellings is in the column of its id
+            candidates = set()
+            for skills, columns in ((desired, self._offered_by), (known, self._wanted_by)):
+                for skill in skills:
+                    skill_id = self._vocabulary.id_of(skill)
+                    if skill_id is not None:
+                        candidates.update(columns.get(skill_id, ()))
+
+            scored = []
+            for user_id in candidates:
+                offered, wanted = self._listed[user_id]
+                score = (TEACH_POINTS * sum(skill in desired for skill in offered)
+                         + LEARN_POINTS * sum(skill in known for skill in wanted))
+                if score:
+                    scored.append((-score, self._positions[user_id], user_id))
+            top = sorted(scored) if limit is None else heapq.nsmallest(limit, scored)
+
+            matches = []
+            for negated, _, user_id in top:
+                offered, wanted = self._listed[user_id]
+                matches.append({
+                    "userId": user_id,
+                    "matchScore": -negated,
+                    "reasons": [skill for skill in offered if skill in desired]
+                               + [skill for skill in wanted if skill in known]
+                })
+            return matches, len(scored)
+
+    def row(self, user_id):
+        """``(offered ids, wanted ids)`` of a user; empty sets for an unknown one"""
+        return self._rows.get(user_id, EMPTY_ROW)
+
+    def offering(self, skill_id):
+        """Ids of the users offering a skill id (read-only)"""
+        return self._offered_by.get(skill_id, ())
+
+    def wanting(self, skill_id):
+        """Ids of the users wanting a skill id (read-only)"""
+        return self._wanted_by.get(skill_id, ())
+
+    def _drop(self, user_id):
+        """Take a user's row out of the columns; returns it, EMPTY_ROW if there was none"""
+        row = self._rows.pop(user_id, None)
+        if row is None:
+            return EMPTY_ROW
+        offered, wanted = row
+        for columns, skill_ids in ((self._offered_by, offered), (self._wanted_by, wanted)):
+            for skill_id in skill_ids:
+                column = columns.get(skill_id)
+                if column is not None:
+                    column.discard(user_id)
+                    if not column:
+                        del columns[skill_id]
+        return row
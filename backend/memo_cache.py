@@ -0,0 +1,121 @@
+"""
+Bounded memoization for the pure analysis functions.
+
+Results are kept in LRU order with a time-to-live and limits on both the
+number of entries and their approximate serialized size. ``get_or_compute``
+hands every caller its own deep copy of a cached value, so a handler changing
+a result cannot alter what later requests see.
+
+With an ``encode`` function, each value's encoded form is computed once, on a
+miss, and kept next to it. Responses splicing that form in, and callers that
+only read a few fields through ``summarize``, get them without any copy.
+With ``max_entries`` 0 nothing is cached and values are simply computed.
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoCache:
+    """LRU + TTL cache with entry and byte limits"""
+
+    def __init__(self, max_entries=4096, max_bytes=64 * 1024 * 1024, ttl=600, encode=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # value -> encoded form whose len() is its size in bytes
+        self.encode = encode
+        self._lock = threading.Lock()
+        # key -> (value, encoded form or None, size in bytes, expiry timestamp)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` on a miss; a copy on a hit"""
+        if self.max_entries <= 0:
+            return compute()
+        value, _, hit = self._lookup(key, compute, handed_out=True)
+        return copy.deepcopy(value) if hit else value
+
+    def get_or_compute_encoded(self, key, compute):
+        """Encoded form of the value for ``key``; None without ``encode``"""
+        return self._lookup(key, compute)[1]
+
+    def get_or_compute_summary(self, key, compute, summarize):
+        """
+        ``(summarize(value), encoded form)`` for ``key``. ``summarize`` reads
+        the cached value itself, so it must not change it.
+        """
+        value, encoded, _ = self._lookup(key, compute)
+        return summarize(value), encoded
+
+    def _lookup(self, key, compute, handed_out=False):
+        """
+        ``(value, encoded form, hit)``; the value is the cached one, not a copy.
+        With ``handed_out`` the caller keeps a computed value, and a copy is cached.
+        """
+        if self.max_entries <= 0:
+            value = compute()
+            return value, None if self.encode is None else self.encode(value), False
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[3] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0], entry[1], True
+                self._drop(key)
+                self.expirations += 1
+            self.misses += 1
+
+        value = compute()
+        if self.encode is not None:
+            encoded = self.encode(value)
+            size = len(encoded)
+        else:
+            encoded = None
+            size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return value, encoded, False
+
+        stored = copy.deepcopy(value) if handed_out else value
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stored, encoded, size, now + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value, encoded, False
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _drop(self, key):
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,293 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+Counters and histograms are kept per label combination behind one lock per
+metric, so recording a sample costs a dict lookup, a bisect and a few
+additions. Collectors registered with ``MetricsRegistry.collector`` are
+called at scrape time for values that already live elsewhere (cache
+counters, table sizes).
+
+Each process keeps its own numbers. Under serve.py the registry is switched
+to a directory shared by the workers: each worker writes its counters and
+histograms there at most every FLUSH_INTERVAL seconds and when it exits, and
+a scrape adds up the files of every worker, so whichever worker answers it
+reports the whole server. The master folds the file of each worker that exits
+into a retired total, so counters never go down across restarts. Collector
+samples describe the answering process and carry a ``worker`` label.
+"""
+
+import bisect
+import contextlib
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; single process only
+    fcntl = None
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Most seconds a worker's numbers may lag in its multiprocess file
+FLUSH_INTERVAL = 1.0
+RETIRED_FILE = 'retired.json'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dump(self):
+        """The values as JSON: ``[[label values, count], ...]``"""
+        with self._lock:
+            return [[list(label_values), value] for label_values, value in self._values.items()]
+
+    def samples(self, dumps=()):
+        """Samples of this process's values plus those of other processes' ``dumps``"""
+        values = self.dump()
+        for dump in dumps:
+            values = self.merge(values, dump)
+        for label_values, value in sorted((tuple(label_values), value) for label_values, value in values):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+    @staticmethod
+    def merge(total, dump):
+        """``total`` (a dump) plus ``dump``"""
+        values = {tuple(label_values): value for label_values, value in total}
+        for label_values, value in dump:
+            values[tuple(label_values)] = values.get(tuple(label_values), 0) + value
+        return [[list(label_values), value] for label_values, value in values.items()]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][slot] += 1
+            entry[1] += value
+
+    @contextlib.contextmanager
+    def time(self, *label_values):
+        """Observe the seconds spent in the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def dump(self):
+        """The values as JSON: ``[[label values, bucket counts, sum], ...]``"""
+        with self._lock:
+            return [[list(label_values), list(counts), total] for label_values, (counts, total) in self._values.items()]
+
+    def samples(self, dumps=()):
+        """Samples of this process's values plus those of other processes' ``dumps``"""
+        values = self.dump()
+        for dump in dumps:
+            values = self.merge(values, dump)
+        for label_values, counts, total in sorted(
+                (tuple(label_values), counts, total) for label_values, counts, total in values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.labels, label_values, [('le', _format_value(float(bound)))]),
+                       cumulative)
+            yield f"{self.name}_sum", _format_labels(self.labels, label_values), total
+            yield f"{self.name}_count", _format_labels(self.labels, label_values), cumulative
+
+    @staticmethod
+    def merge(total, dump):
+        """``total`` (a dump) plus ``dump``"""
+        values = {tuple(label_values): (list(counts), value) for label_values, counts, value in total}
+        for label_values, counts, value in dump:
+            entry = values.get(tuple(label_values))
+            if entry is None or len(entry[0]) != len(counts):
+                values[tuple(label_values)] = (list(counts), value)
+            else:
+                values[tuple(label_values)] = ([a + b for a, b in zip(entry[0], counts)], entry[1] + value)
+        return [[list(label_values), counts, value] for label_values, (counts, value) in values.items()]
+
+
+class MetricsRegistry:
+    """Named metrics plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        # Directory shared with the other server processes, when there are several
+        self.multiprocess_dir = None
+        self._next_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def set_multiprocess_dir(self, path):
+        """Aggregate this registry with every other process writing to ``path``"""
+        os.makedirs(path, exist_ok=True)
+        self.multiprocess_dir = path
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, collect):
+        """
+        Register ``collect()``, returning ``(name, kind, documentation, samples)``
+        tuples where samples are ``(labels dict, value)`` pairs
+        """
+        self._collectors.append(collect)
+        return collect
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        others = self._read_others()
+        worker = [] if self.multiprocess_dir is None else [('worker', os.getpid())]
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            dumps = [dump[metric.name] for dump in others if metric.name in dump]
+            for name, labels, value in metric.samples(dumps):
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_names = list(labels.keys())
+                    lines.append(f"{name}{_format_labels(label_names, labels.values(), worker)} "
+                                 f"{_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def maybe_flush(self):
+        """flush(), at most once per FLUSH_INTERVAL seconds"""
+        if self.multiprocess_dir is None:
+            return
+        now = time.monotonic()
+        if now >= self._next_flush:
+            self._next_flush = now + FLUSH_INTERVAL
+            self.flush()
+
+    def flush(self):
+        """Write this process's counters and histograms to the multiprocess directory"""
+        if self.multiprocess_dir is None:
+            return
+        with self._flush_lock:
+            _write_json(self._process_file(os.getpid()), {metric.name: metric.dump() for metric in self._metrics})
+
+    def retire(self, pid):
+        """Fold the file of a process that exited into the retired totals"""
+        if self.multiprocess_dir is None:
+            return
+        path = self._process_file(pid)
+        with self._dir_locked(exclusive=True):
+            dump = _read_json(path)
+            if dump is None:
+                return
+            retired_path = os.path.join(self.multiprocess_dir, RETIRED_FILE)
+            retired = _read_json(retired_path) or {}
+            for metric in self._metrics:
+                if metric.name in dump:
+                    retired[metric.name] = metric.merge(retired.get(metric.name, []), dump[metric.name])
+            _write_json(retired_path, retired)
+            os.remove(path)
+
+    def _read_others(self):
+        """Dumps of every other live or retired process"""
+        if self.multiprocess_dir is None:
+            return []
+        own = self._process_file(os.getpid())
+        with self._dir_locked(exclusive=False):
+            paths = glob.glob(os.path.join(self.multiprocess_dir, 'worker-*.json'))
+            paths.append(os.path.join(self.multiprocess_dir, RETIRED_FILE))
+            dumps = [_read_json(path) for path in paths if path != own]
+        return [dump for dump in dumps if dump]
+
+    def _process_file(self, pid):
+        return os.path.join(self.multiprocess_dir, f'worker-{pid}.json')
+
+    @contextlib.contextmanager
+    def _dir_locked(self, exclusive):
+        """Retiring a file and reading the files exclude each other, so no value is counted twice or missed"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.multiprocess_dir, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path, value):
+    # Written aside and renamed, so readers never see a partial file
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, 'w', encoding='utf-8') as target:
+        json.dump(value, target, separators=(',', ':'))
+    os.replace(partial, path)
@@ -0,0 +1,64 @@
+"""
+Cursor pagination helpers for the user listing endpoints.
+
+A cursor is the opaque, URL-safe encoding of the sort key of the last item on
+a page. Sort keys always end in a unique tiebreaker, so the next page is
+"every item whose key is greater than the cursor", which stays stable while
+users are added. Pages are picked with a bounded heap, so a page of ``k``
+items out of ``n`` costs O(n log k) rather than a full sort.
+"""
+
+import base64
+import heapq
+import json
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(ordering, sort_key):
+    payload = json.dumps([ordering, list(sort_key)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """Sort key stored in ``cursor``; raises ValueError if it is malformed or from another ordering"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_ordering, sort_key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if cursor_ordering != ordering or not isinstance(sort_key, list):
+        raise ValueError("Cursor does not belong to this query")
+    return tuple(sort_key)
+
+
+def parse_limit(value):
+    """Page size from a request value; None means no paging"""
+    if value is None or value == '':
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if isinstance(value, bool) or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def select_page(items, sort_key, limit, after=None):
+    """
+    Smallest ``limit`` items by ``sort_key`` that come after the ``after`` key.
+
+    Returns ``(page, last_key)``; ``last_key`` is None when nothing follows
+    the page.
+    """
+    if after is not None:
+        items = (item for item in items if sort_key(item) > after)
+    if limit is None:
+        return sorted(items, key=sort_key), None
+
+    page = heapq.nsmallest(limit + 1, items, key=sort_key)
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, sort_key(page[-1])
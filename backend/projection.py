@@ -0,0 +1,102 @@
+"""
+Field projection and compact mode for JSON responses.
+
+``fields`` names the parts of a response to return, as dotted paths from the
+top level, e.g. ``fields=users.id,users.name,total_matches``. Paths look
+through lists, so ``users.id`` is the ``id`` of every entry of ``users``; a
+named object comes back whole. ``success`` and ``error`` are always kept.
+
+``compact=1`` drops each endpoint's heavy sub-objects and echoed request
+inputs (other users' full skill lists, nested analyses, ``user_profile``)
+unless ``fields`` names them.
+
+Both come from the query string or, for POST endpoints, from the JSON body.
+Handlers build their objects through ``Projection.build``, which never
+evaluates a left-out value, so projection saves the work of computing and
+encoding it rather than trimming a finished body.
+"""
+
+from flask import request
+
+ALWAYS_INCLUDED = frozenset(('success', 'error'))
+
+
+class Projection:
+    """Which dotted paths of a response are returned"""
+
+    def __init__(self, fields=None, compact_drops=()):
+        self.fields = None if fields is None else frozenset(fields)
+        self.drops = frozenset(
+            path for path in compact_drops
+            if not self._names_within(path)
+        )
+        self.identity = self.fields is None and not self.drops
+        # path -> included?
+        self._included = {}
+
+    def includes(self, path):
+        """Whether the value at dotted ``path`` is part of the response"""
+        included = self._included.get(path)
+        if included is None:
+            included = self._included[path] = self._requested(path) and not self._dropped(path)
+        return included
+
+    def build(self, path, fields):
+        """
+        The included entries of the ``fields`` dict, an object found at
+        ``path`` ('' for the top level). Callable values are only called
+        for included entries.
+        """
+        if self.identity:
+            return {name: value() if callable(value) else value for name, value in fields.items()}
+        prefix = f"{path}." if path else ''
+        return {
+            name: value() if callable(value) else value
+            for name, value in fields.items()
+            if self.includes(prefix + name)
+        }
+
+    def _requested(self, path):
+        if self.fields is None or path.split('.', 1)[0] in ALWAYS_INCLUDED:
+            return True
+        return any(
+            field == path or field.startswith(path + '.') or path.startswith(field + '.')
+            for field in self.fields
+        )
+
+    def _dropped(self, path):
+        return any(path == drop or path.startswith(drop + '.') for drop in self.drops)
+
+    def _names_within(self, path):
+        """Whether ``fields`` explicitly names ``path`` or something inside it"""
+        return self.fields is not None and any(
+            field == path or field.startswith(path + '.') for field in self.fields
+        )
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def request_projection(data=None, compact_drops=()):
+    """
+    Projection asked for by ``fields``/``compact`` in the query string or the
+    JSON body ``data``; raises ValueError if ``fields`` is malformed
+    """
+    fields = request.args.get('fields')
+    if fields is None and data:
+        fields = data.get('fields')
+    compact = request.args.get('compact')
+    if compact is None and data:
+        compact = data.get('compact')
+
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',')]
+    if fields is not None:
+        if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+            raise ValueError("fields must be a comma-separated string or a list of strings")
+        fields = [field for field in fields if field] or None
+
+    return Projection(fields, compact_drops if compact is not None and _flag(compact) else ())
@@ -0,0 +1,95 @@
+"""
+Pre-serialized response cache for the read-only catalog endpoints.
+
+Each entry holds the JSON body already encoded, plus gzip (and brotli, when
+the ``brotli`` package is installed) variants and a strong ETag per variant.
+Requests are answered straight from those bytes, with 304 Not Modified when
+``If-None-Match`` carries the current ETag.
+"""
+
+import gzip
+import hashlib
+import threading
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CachedResponse:
+    """Encoded body variants of one JSON payload"""
+
+    __slots__ = ('version', 'etag', 'bodies')
+
+    def __init__(self, body, version=None):
+        self.version = version
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {'identity': body, 'gzip': gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body)
+
+    def etag_for(self, encoding):
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+
+class ResponseCache:
+    """Serialized responses keyed by endpoint, invalidated on dataset reload"""
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when ``key`` is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def respond(self, key, build, version=None):
+        """
+        Serve the cached response for ``key``, building it with ``build()``
+        on a miss or when ``version`` differs from the cached one.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            body = (current_app.json.dumps(build()) + "\n").encode('utf-8')
+            entry = CachedResponse(body, version)
+            with self._lock:
+                self._entries[key] = entry
+        else:
+            self.hits += 1
+
+        encoding = self._choose_encoding(entry)
+        response = Response(mimetype='application/json')
+        response.headers['Cache-Control'] = f"public, max-age={self.max_age}"
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.set_etag(entry.etag_for(encoding))
+
+        if any(request.if_none_match.contains(entry.etag_for(known)) for known in entry.bodies):
+            response.status_code = 304
+            return response
+
+        response.set_data(entry.bodies[encoding])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _choose_encoding(entry):
+        accepted = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            if encoding in entry.bodies and accepted.quality(encoding) > 0:
+                return encoding
+        return 'identity'
@@ -0,0 +1,69 @@
+"""
+Role requirements compiled into a roles x skills weight matrix.
+
+Each role's ``essential``/``preferred``/``nice_to_have`` lists become weights
+3/2/1 (a skill listed at several levels keeps the highest one). The matrix is
+stored column-wise by vocabulary id with per-skill and per-role totals
+precomputed, so the demand for a set of skills across every role, and every
+role's weighted coverage by it, cost one pass over the skills' columns no
+matter how many roles there are.
+"""
+
+from skill_vocabulary import REQUIREMENT_LEVELS
+
+REQUIREMENT_WEIGHTS = {'essential': 3, 'preferred': 2, 'nice_to_have': 1}
+
+
+class RoleMatrix:
+    """Column-wise role requirement weights keyed by skill id"""
+
+    def __init__(self, vocabulary, job_requirements):
+        self.roles = list(job_requirements)
+        # skill id -> {role index: weight}
+        self._columns = {}
+
+        for role_index, role in enumerate(self.roles):
+            requirements = job_requirements[role]
+            for level in REQUIREMENT_LEVELS:
+                weight = REQUIREMENT_WEIGHTS[level]
+                for skill in requirements.get(level, []):
+                    column = self._columns.setdefault(vocabulary.add(skill), {})
+                    column.setdefault(role_index, weight)
+
+        self._demand = {skill_id: sum(column.values()) for skill_id, column in self._columns.items()}
+        self._first_role = {skill_id: min(column) for skill_id, column in self._columns.items()}
+        self._role_totals = [0] * len(self.roles)
+        for column in self._columns.values():
+            for role_index, weight in column.items():
+                self._role_totals[role_index] += weight
+
+    def coverage(self, skill_ids):
+        """
+        Role -> percentage of its requirement weight covered by ``skill_ids``,
+        the weighted coverage /api/ready-users ranks users by
+        """
+        covered = [0] * len(self.roles)
+        for skill_id in set(skill_ids):
+            for role_index, weight in self._columns.get(skill_id, {}).items():
+                covered[role_index] += weight
+        return {
+            role: int(100 * covered[role_index] / total) if total else 0
+            for role_index, (role, total) in enumerate(zip(self.roles, self._role_totals))
+        }
+
+    def skill_demand(self, skills, skill_ids):
+        """
+        Summed role weight of each requested skill, highest first.
+
+        ``skill_ids`` is aligned with ``skills``. Skills no role asks for are
+        left out; ties keep the order of the first role requiring them.
+        """
+        demand = {}
+        first_seen = {}
+        for position, (skill, skill_id) in enumerate(zip(skills, skill_ids)):
+            weight = self._demand.get(skill_id)
+            if weight:
+                demand[skill] = demand.get(skill, 0) + weight
+                first_seen.setdefault(skill, (self._first_role[skill_id], position))
+        return sorted(demand.items(), key=lambda item: (-item[1], first_seen[item[0]]))
+
@@ -0,0 +1,179 @@
+"""
+Reverse readiness index: which users are closest to a role or career path.
+
+Every target (a JOB_REQUIREMENTS role or a CAREER_PATHS path) is compiled to
+skill id weights: a role's ``essential``/``preferred``/``nice_to_have`` skills
+weigh 3/2/1 as in RoleMatrix, and every skill of a career path counts as
+essential. An inverted index maps each skill id to the targets requiring it,
+and each target keeps the summed weight of the required skills every
+candidate user offers, the users offering at least one of them. Adding or
+removing a user only touches the targets that require one of its skills.
+
+Once a target has been queried, its candidates are also bucketed by score.
+Weights are small integers, so there are few distinct scores, and the top
+users of a target are read from the highest buckets down without looking at
+the rest.
+"""
+
+import heapq
+import threading
+from collections import Counter
+
+from role_matrix import REQUIREMENT_WEIGHTS
+from skill_vocabulary import REQUIREMENT_LEVELS
+
+TARGET_TYPES = ('role', 'career_path')
+
+
+class RoleReadiness:
+    """Weighted requirement coverage of every user for every role and career path"""
+
+    def __init__(self, vocabulary, job_requirements, career_paths, users=()):
+        self._vocabulary = vocabulary
+        self._lock = threading.RLock()
+        # user id -> offered skill ids
+        self._rows = {user['id']: self._offered(user) for user in users}
+        self.set_targets(job_requirements, career_paths)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def set_targets(self, job_requirements, career_paths):
+        """Recompile the targets (after a dataset reload) and rescore every user"""
+        with self._lock:
+            # (type, name) -> [(skill name, skill id, level)] in dataset order, one per id
+            self._requirements = {}
+            # skill id -> [((type, name), weight)]
+            self._columns = {}
+            # (type, name) -> user id -> summed weight of the required skills offered
+            self._scores = {}
+            # (type, name) -> score -> user ids, for the targets queried so far
+            self._buckets = {}
+
+            for role, requirements in job_requirements.items():
+                self._add_target(('role', role), (
+                    (skill, level) for level in REQUIREMENT_LEVELS for skill in requirements.get(level, [])
+                ))
+            for career, skills in career_paths.items():
+                self._add_target(('career_path', career), ((skill, 'essential') for skill in skills))
+
+            # Scored target by target, counting skill columns instead of walking users
+            offered_by = {}
+            for user_id, offered in self._rows.items():
+                for skill_id in offered:
+                    offered_by.setdefault(skill_id, []).append(user_id)
+            for key, requirements in self._requirements.items():
+                scores = Counter()
+                for _, skill_id, level in requirements:
+                    for _ in range(REQUIREMENT_WEIGHTS[level]):
+                        scores.update(offered_by.get(skill_id, ()))
+                self._scores[key] = scores
+
+    def add_user(self, user):
+        """Score a user against every target, replacing any previous scores"""
+        with self._lock:
+            user_id = user['id']
+            if user_id in self._rows:
+                self.remove_user(user_id)
+            offered = self._rows[user_id] = self._offered(user)
+            self._score(user_id, offered, 1)
+
+    def remove_user(self, user_id):
+        with self._lock:
+            offered = self._rows.pop(user_id, None)
+            if offered is not None:
+                self._score(user_id, offered, -1)
+
+    def has_target(self, target_type, name):
+        return (target_type, name) in self._requirements
+
+    def total_weight(self, target_type, name):
+        """Weight of a user offering every required skill"""
+        return sum(REQUIREMENT_WEIGHTS[level] for _, _, level in self._requirements[(target_type, name)])
+
+    def candidate_count(self, target_type, name):
+        """Users offering at least one skill the target requires"""
+        return len(self._scores[(target_type, name)])
+
+    def top(self, target_type, name, limit, after=None):
+        """
+        Up to ``limit`` ``(user id, weighted score)``, best first (ties by
+        user id), that come after the ``(-score, user id)`` key ``after``.
+
+        Returns ``(page, last_key)`` as pagination.select_page does.
+        """
+        with self._lock:
+            buckets = self._target_buckets((target_type, name))
+            page = []
+            for score in sorted(buckets, reverse=True):
+                user_ids = buckets[score]
+                if after is not None:
+                    if -score < after[0]:
+                        continue
+                    if -score == after[0]:
+                        user_ids = [user_id for user_id in user_ids if user_id > after[1]]
+                page.extend((user_id, score) for user_id in heapq.nsmallest(limit + 1 - len(page), user_ids))
+                if len(page) > limit:
+                    user_id, score = page[limit - 1]
+                    return page[:limit], (-score, user_id)
+            return page, None
+
+    def coverage(self, target_type, name, user_id):
+        """``(matching, missing_essential)`` required skill names of a user, in dataset order"""
+        with self._lock:
+            offered = self._rows.get(user_id, frozenset())
+            requirements = self._requirements[(target_type, name)]
+            matching = [skill for skill, skill_id, _ in requirements if skill_id in offered]
+            missing = [
+                skill for skill, skill_id, level in requirements
+                if level == 'essential' and skill_id not in offered
+            ]
+            return matching, missing
+
+    def _add_target(self, key, skills):
+        requirements = []
+        seen = set()
+        for skill, level in skills:
+            skill_id = self._vocabulary.add(skill)
+            # Levels come highest first, so a skill listed twice keeps the higher weight
+            if skill_id not in seen:
+                seen.add(skill_id)
+                requirements.append((skill, skill_id, level))
+                self._columns.setdefault(skill_id, []).append((key, REQUIREMENT_WEIGHTS[level]))
+        self._requirements[key] = requirements
+
+    def _target_buckets(self, key):
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = self._buckets[key] = {}
+            for user_id, score in self._scores[key].items():
+                buckets.setdefault(score, set()).add(user_id)
+        return buckets
+
+    def _offered(self, user):
+        return frozenset(self._vocabulary.add(skill) for skill in user['skills'])
+
+    def _score(self, user_id, offered, sign):
+        for skill_id in offered:
+            for key, weight in self._columns.get(skill_id, ()):
+                scores = self._scores[key]
+                buckets = self._buckets.get(key)
+                score = scores.get(user_id, 0)
+                if score and buckets is not None:
+                    bucket = buckets[score]
+                    bucket.discard(user_id)
+                    if not bucket:
+                        del buckets[score]
+                score += sign * weight
+                if score:
+                    scores[user_id] = score
+                    if buckets is not None:
+                        buckets.setdefault(score, set()).add(user_id)
+                else:
+                    del scores[user_id]
@@ -0,0 +1,282 @@
+"""
+Production server for the Unified Skills API.
+
+A master process loads the datasets and builds every index once, freezes the
+resulting objects out of the garbage collector's reach and then forks worker
+processes that share one listening socket. Forked workers start with the
+indexes already in memory, and because the collector never touches the
+frozen objects their pages stay shared copy-on-write between workers.
+
+    python serve.py --workers 4 --port 5013
+
+Signals sent to the master:
+
+    SIGHUP           reload the catalog datasets, then replace every worker
+    SIGTERM, SIGINT  stop workers after their current request and exit
+
+Workers are restarted when they exit unexpectedly and, if configured, after
+serving a maximum number of requests. POSIX only.
+
+Workers share their request metrics through a directory (SKILLS_API_METRICS_DIR,
+by default a temporary one), so /metrics reports the totals of every worker
+whichever one answers it; see metrics.py.
+
+Concurrency model: each worker is a single-threaded werkzeug server speaking
+HTTP/1.0, so it handles one request at a time and closes the connection after
+each response (no keep-alive). The number of requests served at once is the
+number of workers; a slow request, such as a long /api/batch stream, holds its
+worker until it finishes. Within a request, /api/compare-roles,
+/api/comprehensive-analysis and /api/batch still fan out on their worker's
+analysis pools. Put a reverse proxy in front to keep client connections
+alive and buffer slow clients.
+"""
+
+import argparse
+import gc
+import glob
+import logging
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from werkzeug.serving import BaseWSGIServer
+
+import api_config
+
+logger = logging.getLogger(__name__)
+
+# Seconds between master housekeeping passes, and between a worker's checks for shutdown
+POLL_INTERVAL = 0.5
+
+
+class WorkerServer(BaseWSGIServer):
+    """Single-threaded server accepting from a socket shared with other workers"""
+
+    def __init__(self, listener, app):
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, app, fd=listener.fileno())
+        # Every worker is woken for a new connection but only one wins the
+        # accept(); the others must get an error back instead of blocking
+        self.socket.setblocking(False)
+        self.timeout = POLL_INTERVAL
+        self.requests_handled = 0
+
+    def get_request(self):
+        connection, address = super().get_request()
+        connection.setblocking(True)
+        return connection, address
+
+    def process_request(self, request, client_address):
+        # Without threads werkzeug speaks HTTP/1.0: one request per connection
+        self.requests_handled += 1
+        super().process_request(request, client_address)
+
+
+def _worker_main(listener, app, metrics_registry, max_requests):
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    gc.enable()
+
+    server = WorkerServer(listener, app)
+    while not stopping and not (max_requests and server.requests_handled >= max_requests):
+        server.handle_request()
+        # Also when idle, so the last requests before a pause reach the shared totals
+        metrics_registry.maybe_flush()
+    server.server_close()
+    metrics_registry.flush()
+
+
+class Master:
+    """Forks, supervises and replaces the worker processes"""
+
+    def __init__(self, host, port, workers, max_requests=0, max_requests_jitter=0,
+                 graceful_timeout=30, backlog=128):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.api = None
+        self.listener = None
+        self.metrics_dir = None
+        self.generation = 0
+        # pid -> generation the worker was forked in
+        self._children = {}
+        # pid -> time after which a worker asked to stop is killed
+        self._stop_deadlines = {}
+        self._signals = []
+
+    def run(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        self.listener = socket.create_server((self.host, self.port), family=family, backlog=self.backlog)
+        self._load()
+
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self._signals.append(signum))
+        logger.info("Listening on %s:%d with %d workers", self.host, self.port, self.workers)
+
+        try:
+            while True:
+                while self._signals:
+                    signum = self._signals.pop(0)
+                    if signum == signal.SIGHUP:
+                        self._reload()
+                    else:
+                        return self._stop()
+                self._reap()
+                self._spawn_missing()
+                self._kill_overdue()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self.listener.close()
+            if not api_config.METRICS_DIR:
+                shutil.rmtree(self.metrics_dir, ignore_errors=True)
+
+    def _load(self):
+        # Collections during the load would only walk objects about to be frozen
+        gc.disable()
+        started = time.perf_counter()
+        import unified_skills_api
+        self.api = unified_skills_api
+        self._share_metrics()
+        self._freeze()
+        # Frozen objects are out of the collector's reach, so the master can collect again
+        gc.enable()
+        logger.info("Loaded %d users and %d skills in %.2fs", len(self.api.user_store),
+                    len(self.api.skill_vocabulary), time.perf_counter() - started)
+
+    def _share_metrics(self):
+        """Point the workers' metrics at one directory, emptied of any previous run's files"""
+        self.metrics_dir = api_config.METRICS_DIR or tempfile.mkdtemp(prefix='skills-api-metrics-')
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(self.metrics_dir, '*.json')):
+            os.remove(path)
+        self.api.metrics_registry.set_multiprocess_dir(self.metrics_dir)
+
+    def _freeze(self):
+        gc.collect()
+        # Keep the collector from writing to (and so un-sharing) the loaded objects
+        gc.freeze()
+
+    def _reload(self):
+        logger.info("Reloading datasets")
+        try:
+            self.api.reload_datasets()
+            self.api.user_store.refresh()
+        except Exception as e:
+            logger.exception("Reload failed, keeping current workers: %s", e)
+            return
+        self._freeze()
+
+        self.generation += 1
+        # New workers come up before the old ones are told to finish
+        self._spawn_missing()
+        for pid, generation in self._children.items():
+            if generation < self.generation:
+                self._stop_worker(pid)
+
+    def _stop(self):
+        logger.info("Shutting down")
+        for pid in self._children:
+            self._stop_worker(pid)
+        while self._children:
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.1)
+        return 0
+
+    def _spawn_missing(self):
+        current = sum(1 for generation in self._children.values() if generation == self.generation)
+        for _ in range(self.workers - current):
+            self._spawn()
+
+    def _spawn(self):
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _worker_main(self.listener, self.api.app, self.api.metrics_registry, max_requests)
+            except BaseException as e:
+                logger.exception("Worker %d failed: %r", os.getpid(), e)
+                status = 1
+            finally:
+                os._exit(status)
+        self._children[pid] = self.generation
+
+    def _stop_worker(self, pid):
+        if pid in self._stop_deadlines:
+            return
+        self._stop_deadlines[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if pid == 0:
+                return
+            self._children.pop(pid, None)
+            # Its numbers stay in the totals after it is gone
+            self.api.metrics_registry.retire(pid)
+            if self._stop_deadlines.pop(pid, None) is None:
+                code = os.waitstatus_to_exitcode(status)
+                if code != 0:
+                    logger.warning("Worker %d exited with status %d", pid, code)
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self._stop_deadlines.items()):
+            if deadline <= now:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Unified Skills API with pre-forked workers")
+    parser.add_argument('--host', default=api_config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=api_config.SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=api_config.SERVER_WORKERS,
+                        help="Worker processes to fork")
+    parser.add_argument('--max-requests', type=int, default=api_config.WORKER_MAX_REQUESTS,
+                        help="Requests a worker serves before it is replaced (0 = never)")
+    parser.add_argument('--max-requests-jitter', type=int, default=api_config.WORKER_MAX_REQUESTS_JITTER,
+                        help="Random extra requests added to each worker's maximum")
+    parser.add_argument('--graceful-timeout', type=float, default=api_config.GRACEFUL_TIMEOUT,
+                        help="Seconds a stopping worker may take to finish its request")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, 'fork'):
+        parser.error("serve.py needs fork(); use the development server on this platform")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    logging.basicConfig(level=logging.INFO, format="[%(process)d] %(levelname)s %(name)s: %(message)s")
+
+    master = Master(args.host, args.port, args.workers, args.max_requests, args.max_requests_jitter,
+                    args.graceful_timeout, api_config.SERVER_BACKLOG)
+    return master.run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
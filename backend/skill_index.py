@@ -0,0 +1,195 @@
+"""
+Inverted skill index for the Skill Swapper search endpoints.
+
+Skills are case-folded into terms and every term is split into character
+n-grams. A keyword only has to be checked against the terms that share its
+n-grams, and each term points at the users listing it, so a search touches
+the matching users instead of the whole user table.
+"""
+
+import threading
+from collections import defaultdict
+
+NGRAM_SIZE = 3
+
+SKILL_FIELDS = ('skills', 'skillsWanted')
+
+
+def _ngrams_of_size(term, size):
+    return {term[start:start + size] for start in range(len(term) - size + 1)}
+
+
+def _ngrams(term):
+    """All substrings of ``term`` up to NGRAM_SIZE characters long"""
+    grams = set()
+    for size in range(1, NGRAM_SIZE + 1):
+        grams |= _ngrams_of_size(term, size)
+    return grams
+
+
+class SkillIndex:
+    """Term and n-gram posting lists over users' ``skills`` and ``skillsWanted``"""
+
+    def __init__(self, users=()):
+        self._lock = threading.RLock()
+        # field -> term -> user id -> original skill strings
+        self._postings = {field: {} for field in SKILL_FIELDS}
+        # n-gram -> terms containing it
+        self._grams = defaultdict(set)
+        self._users = {}
+        for user in users:
+            self.add_user(user)
+
+    def __len__(self):
+        return len(self._users)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def add_user(self, user):
+        """Index a user, replacing any previous entry with the same id"""
+        with self._lock:
+            user_id = user['id']
+            if user_id in self._users:
+                self.remove_user(user_id)
+
+            self._users[user_id] = user
+
+            for field in SKILL_FIELDS:
+                postings = self._postings[field]
+                for skill in user[field]:
+                    term = skill.lower()
+                    if not self._has_term(term):
+                        for gram in _ngrams(term):
+                            self._grams[gram].add(term)
+                    postings.setdefault(term, {}).setdefault(user_id, []).append(skill)
+
+    def remove_user(self, user_id):
+        """Drop a user from every posting list it appears in"""
+        with self._lock:
+            user = self._users.pop(user_id, None)
+            if user is None:
+                return
+
+            for field in SKILL_FIELDS:
+                postings = self._postings[field]
+                for skill in user[field]:
+                    term = skill.lower()
+                    users = postings.get(term)
+                    if not users:
+                        continue
+                    users.pop(user_id, None)
+                    if not users:
+                        del postings[term]
+                        if not self._has_term(term):
+                            self._drop_term(term)
+
+    def get_user(self, user_id):
+        return self._users.get(user_id)
+
+    def search(self, keywords, search_type='skills', terms_of=None):
+        """
+        Score users against lowercase ``keywords``.
+
+        A skill matches a keyword when either one contains the other, or, if
+        ``terms_of`` is given, when its lowercase form is among
+        ``terms_of[keyword]``. Each
+        (skill, keyword) match scores 1 for offered skills and 0.5 for wanted
+        skills. Returns an unordered dict of user id to
+        ``(user, score, matched_skills, matched_wanted)`` for every user that
+        scored; rank by ``(-score, UserStore.position(user_id))``.
+        """
+        weights = []
+        if search_type in ['skills', 'both']:
+            weights.append(('skills', 1))
+        if search_type in ['wanted', 'both']:
+            weights.append(('skillsWanted', 0.5))
+
+        with self._lock:
+            scores = {}
+            matched = {}
+            term_cache = {}
+            for keyword in keywords:
+                if keyword not in term_cache:
+                    term_cache[keyword] = (
+                        self._matching_terms(keyword) if terms_of is None else terms_of[keyword]
+                    )
+                terms = term_cache[keyword]
+
+                for field, weight in weights:
+                    postings = self._postings[field]
+                    for term in terms:
+                        for user_id, skills in postings.get(term, {}).items():
+                            scores[user_id] = scores.get(user_id, 0) + weight * len(skills)
+                            hits = matched.setdefault(user_id, ([], []))
+                            hits[0 if field == 'skills' else 1].extend(skills)
+
+            return {
+                user_id: (self._users[user_id], score, matched[user_id][0], matched[user_id][1])
+                for user_id, score in scores.items()
+            }
+
+    def users_containing(self, text, field):
+        """Ids of users with a ``field`` entry whose lowercase form contains ``text``"""
+        with self._lock:
+            postings = self._postings[field]
+            user_ids = set()
+            for term in self._terms_containing(text):
+                user_ids.update(postings.get(term, ()))
+            return user_ids
+
+    def _terms_containing(self, keyword):
+        """Indexed terms containing ``keyword``, found through shared n-grams"""
+        if not keyword:
+            return self._all_terms()
+        if len(keyword) <= NGRAM_SIZE:
+            return set(self._grams.get(keyword, ()))
+
+        posting_sets = sorted(
+            (self._grams.get(gram, set()) for gram in _ngrams_of_size(keyword, NGRAM_SIZE)),
+            key=len
+        )
+        candidates = set(posting_sets[0])
+        for posting in posting_sets[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {term for term in candidates if keyword in term}
+
+    def _matching_terms(self, keyword):
+        """Indexed terms that contain ``keyword`` or are contained in it"""
+        terms = self._terms_containing(keyword)
+
+        # Terms contained in the keyword are among its substrings
+        for start in range(len(keyword)):
+            for end in range(start + 1, len(keyword) + 1):
+                substring = keyword[start:end]
+                if self._has_term(substring):
+                    terms.add(substring)
+        if self._has_term(''):
+            terms.add('')
+
+        return terms
+
+    def _has_term(self, term):
+        return any(term in self._postings[field] for field in SKILL_FIELDS)
+
+    def _all_terms(self):
+        terms = set()
+        for field in SKILL_FIELDS:
+            terms.update(self._postings[field])
+        return terms
+
+    def _drop_term(self, term):
+        for gram in _ngrams(term):
+            terms = self._grams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._grams[gram]
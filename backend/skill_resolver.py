@@ -0,0 +1,167 @@
+"""
+Fuzzy resolution of free-text skill names to known vocabulary skills.
+
+Every vocabulary skill is split into character bigrams and trigrams of its
+normalized name, padded with a space at each end so that word boundaries
+count, and weighted by TF-IDF. A gram shared by many skills ("ing", " ja") says little
+about which one was meant. A query is vectorized the same way. Candidates
+are the skills listed under its selective grams, those held by at most
+CANDIDATE_MAX_DF of the vocabulary, and are scored by exact cosine
+similarity. The cost follows those postings rather than the vocabulary size.
+Candidates well behind the best one ("TypeScript" for "javscript") are
+dropped even when they clear the similarity floor.
+
+Exact names and SKILL_ALIASES shorthands ("js", "k8s", "ml") resolve
+straight to their skill and are never widened to fuzzy neighbours.
+
+Skills added to the vocabulary after the resolver was built (new users) are
+indexed on the next lookup. Document frequencies are kept current, while
+the per-skill vector norms are recomputed once the vocabulary has grown by a
+quarter since they were last computed.
+"""
+
+import heapq
+import math
+import threading
+from collections import Counter
+
+from skill_vocabulary import normalize_skill
+
+NGRAM_SIZES = (2, 3)
+DEFAULT_TOP_K = 3
+# Cosine similarity a fuzzy candidate needs to count as a resolution
+DEFAULT_MIN_SIMILARITY = 0.4
+# Fraction of the best candidate's similarity the others need
+RELATIVE_CUTOFF = 0.8
+# Share of the vocabulary a gram may appear in and still propose candidates
+CANDIDATE_MAX_DF = 0.05
+# Vocabulary growth, as a fraction, that triggers recomputing every norm
+RENORM_GROWTH = 0.25
+
+MATCH_MODES = ('exact', 'fuzzy')
+
+
+def _grams(name):
+    """Bigram and trigram counts of a normalized name, padded at both ends"""
+    padded = f" {name} "
+    return Counter(
+        padded[start:start + size]
+        for size in NGRAM_SIZES
+        for start in range(len(padded) - size + 1)
+    )
+
+
+class SkillResolver:
+    """TF-IDF character n-gram index over a SkillVocabulary"""
+
+    def __init__(self, vocabulary):
+        self._vocabulary = vocabulary
+        self._lock = threading.RLock()
+        # gram -> skill id -> occurrences of the gram in the skill's name
+        self._postings = {}
+        # skill id -> gram counts
+        self._vectors = []
+        self._norms = []
+        self._normed_size = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def similar(self, skill, k=DEFAULT_TOP_K, min_similarity=DEFAULT_MIN_SIMILARITY):
+        """
+        Up to ``k`` (skill id, similarity) for the known skills closest to
+        ``skill``, best first; a single exact or alias match when there is one
+        """
+        skill_id = self._vocabulary.id_of(skill)
+        if skill_id is not None:
+            return [(skill_id, 1.0)]
+
+        with self._lock:
+            self._sync()
+            query = self._weighted(_grams(normalize_skill(skill)))
+            query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+            if not query_norm:
+                return []
+
+            # A skill's weight for a gram is its count times the gram's idf
+            factors = {gram: weight * self._idf(gram) / query_norm for gram, weight in query.items()}
+            vectors = self._vectors
+            norms = self._norms
+            scored = (
+                (
+                    sum(factor * vectors[other_id].get(gram, 0) for gram, factor in factors.items())
+                    / norms[other_id],
+                    other_id
+                )
+                for other_id in self._candidates(query)
+            )
+            best = heapq.nlargest(k, scored)
+            if not best:
+                return []
+            floor = max(min_similarity, best[0][0] * RELATIVE_CUTOFF)
+            return [(other_id, round(similarity, 4)) for similarity, other_id in best if similarity >= floor]
+
+    def resolve(self, skills, min_similarity=DEFAULT_MIN_SIMILARITY):
+        """
+        ``skills`` with each unknown name replaced by its closest known skill.
+
+        Returns the new list and ``{original: resolved name or None}`` for
+        every name that was not an exact or alias match. Names with nothing
+        similar enough are kept as given.
+        """
+        resolved = []
+        resolutions = {}
+        for skill in skills:
+            if self._vocabulary.id_of(skill) is not None:
+                resolved.append(skill)
+                continue
+            closest = self.similar(skill, 1, min_similarity)
+            name = self._vocabulary.name_of(closest[0][0]) if closest else None
+            resolutions[skill] = name
+            resolved.append(skill if name is None else name)
+        return resolved, resolutions
+
+    def _candidates(self, query):
+        """
+        Skills sharing one of the query's selective grams, or, if it has
+        none, any of its grams
+        """
+        max_df = max(1, int(len(self._vectors) * CANDIDATE_MAX_DF))
+        postings = [self._postings[gram] for gram in query if gram in self._postings]
+        selective = [skill_ids for skill_ids in postings if len(skill_ids) <= max_df]
+        candidates = set()
+        for skill_ids in selective or postings:
+            candidates.update(skill_ids)
+        return candidates
+
+    def _sync(self):
+        """Index skills added to the vocabulary since the last lookup"""
+        size = len(self._vocabulary)
+        if size == len(self._vectors):
+            return
+        for skill_id in range(len(self._vectors), size):
+            counts = _grams(normalize_skill(self._vocabulary.name_of(skill_id)))
+            self._vectors.append(counts)
+            for gram, count in counts.items():
+                self._postings.setdefault(gram, {})[skill_id] = count
+
+        if size >= self._normed_size * (1 + RENORM_GROWTH):
+            self._norms = [self._norm(counts) for counts in self._vectors]
+            self._normed_size = size
+        else:
+            self._norms.extend(self._norm(counts) for counts in self._vectors[len(self._norms):])
+
+    def _idf(self, gram):
+        return math.log((len(self._vectors) + 1) / (len(self._postings.get(gram, ())) + 1)) + 1
+
+    def _weighted(self, counts):
+        return {gram: count * self._idf(gram) for gram, count in counts.items()}
+
+    def _norm(self, counts):
+        return math.sqrt(sum(weight * weight for weight in self._weighted(counts).values())) or 1.0
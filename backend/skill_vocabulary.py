@@ -0,0 +1,156 @@
+"""
+Canonical skill vocabulary shared by the matcher, recommender and gap analyzer.
+
+Every skill name seen in the datasets is case-folded, mapped through
+SKILL_ALIASES and given a dense integer id. Request skill lists are resolved
+to id sets once, so later membership tests are integer set operations rather
+than scans over lists of strings.
+"""
+
+import threading
+
+# Common shorthands, keyed and valued by normalized (case-folded) names
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vue': 'vue.js',
+    'vuejs': 'vue.js',
+    'angularjs': 'angular',
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'html5': 'html',
+    'css3': 'css',
+    'c sharp': 'c#',
+    'cpp': 'c++',
+}
+
+REQUIREMENT_LEVELS = ('essential', 'preferred', 'nice_to_have')
+
+
+def normalize_skill(skill):
+    """Case-fold, collapse whitespace and resolve aliases"""
+    key = ' '.join(skill.casefold().split())
+    return SKILL_ALIASES.get(key, key)
+
+
+class SkillVocabulary:
+    """Interned skill names with dense integer ids"""
+
+    def __init__(self, skills=()):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = []
+        # Raw spelling -> id, so each spelling is normalized only once
+        self._spellings = {}
+        # id -> raw spellings seen for it
+        self._variants = []
+        for skill in skills:
+            self.add(skill)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, skill):
+        return self.id_of(skill) is not None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, skill):
+        """Return the id for ``skill``, assigning the next free id if it is new"""
+        skill_id = self._spellings.get(skill)
+        if skill_id is not None:
+            return skill_id
+        with self._lock:
+            key = normalize_skill(skill)
+            skill_id = self._ids.get(key)
+            if skill_id is None:
+                skill_id = len(self._names)
+                self._ids[key] = skill_id
+                self._names.append(skill)
+                self._variants.append([])
+            self._spellings[skill] = skill_id
+            self._variants[skill_id].append(skill)
+            return skill_id
+
+    def id_of(self, skill):
+        """Id of a known skill, or None"""
+        skill_id = self._spellings.get(skill)
+        if skill_id is None:
+            skill_id = self._ids.get(normalize_skill(skill))
+        return skill_id
+
+    def name_of(self, skill_id):
+        """Display name (first spelling seen) for an id"""
+        return self._names[skill_id]
+
+    def spellings(self, skill_id):
+        """Every raw spelling added for an id"""
+        return tuple(self._variants[skill_id])
+
+    def ids(self, skills):
+        """Ids aligned with ``skills``; unknown skills map to None"""
+        return [self.id_of(skill) for skill in skills]
+
+    def resolve(self, skills):
+        """Frozenset of ids for the known skills in ``skills``"""
+        return frozenset(skill_id for skill_id in self.ids(skills) if skill_id is not None)
+
+
+def trending_skill_names(trending_skills):
+    """Skill names listed in TRENDING_SKILLS, whatever the shape of its entries"""
+    for entries in trending_skills.values():
+        if isinstance(entries, dict):
+            entries = entries.get('skills', [])
+        for entry in entries:
+            if isinstance(entry, dict):
+                entry = entry.get('skill') or entry.get('name')
+            if isinstance(entry, str):
+                yield entry
+
+
+def add_catalog_skills(vocabulary, skill_categories, career_paths, job_requirements, trending_skills):
+    """Add every skill named in the catalog datasets; existing ids are kept"""
+    for skills in skill_categories.values():
+        for skill in skills:
+            vocabulary.add(skill)
+    for skills in career_paths.values():
+        for skill in skills:
+            vocabulary.add(skill)
+    for requirements in job_requirements.values():
+        for level in REQUIREMENT_LEVELS:
+            for skill in requirements.get(level, []):
+                vocabulary.add(skill)
+    for skill in trending_skill_names(trending_skills):
+        vocabulary.add(skill)
+
+
+def build_vocabulary(users, skill_categories, career_paths, job_requirements, trending_skills):
+    """Collect every skill name from the datasets into one vocabulary"""
+    vocabulary = SkillVocabulary()
+    add_catalog_skills(vocabulary, skill_categories, career_paths, job_requirements, trending_skills)
+    for user in users:
+        for skill in user['skills'] + user['skillsWanted']:
+            vocabulary.add(skill)
+    return vocabulary
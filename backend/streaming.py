@@ -0,0 +1,29 @@
+"""
+Newline-delimited JSON (NDJSON) streaming responses.
+
+A client opts in with ``Accept: application/x-ndjson`` or ``?stream=1``.
+Lines are encoded, with the app's JSON provider, and flushed one at a time,
+so the first record leaves the server before the last one is computed.
+"""
+
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    """True when the current request asked for a streamed NDJSON body"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def ndjson_response(records, status=200):
+    """Stream each object yielded by ``records`` as one JSON line"""
+    dumps = current_app.json.dumps
+
+    def generate():
+        for record in records:
+            yield dumps(record, separators=(',', ':')) + "\n"
+
+    return Response(stream_with_context(generate()), status=status, mimetype=NDJSON_MIMETYPE)
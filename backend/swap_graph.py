@@ -0,0 +1,276 @@
+"""
+Skill-swap discovery over the "can teach" graph of the user table.
+
+User A can teach user B when A offers a skill B wants. Stored as an edge
+list, that graph grows with the square of the user count, since every
+holder of a popular skill reaches every learner of it. So it is kept
+implicit. The match engine's columns index users by each skill they offer
+and want; the graph adds an index by each (offered skill, wanted skill) pair
+they hold, which makes "who offers X and wants Y" a single lookup. It is
+updated in place from the engine's row changes.
+
+- A's learners and teachers, with the number of skills each edge carries,
+  are counted from the skill indexes. Reciprocal pairs (A teaches B and B
+  teaches A) are the users that are both.
+- 3-cycles A -> B -> C -> A pair B from A's best learners with C from A's
+  best teachers wherever B can teach C.
+- 4-cycles A -> B -> C -> D -> A take B and D the same way and find middles
+  C through the pair index, one lookup per (skill D wants, skill B offers).
+
+Cycle search is bounded: at most ``beam`` learners and teachers are expanded
+per query, and a few middles per (B, D). Cycles are ranked by their
+bottleneck (the fewest skills exchanged on any one edge), then by length
+(shorter swaps are easier to arrange), then by the total number of skills
+exchanged. Candidates are ranked on their edge sizes alone, and only the
+ones returned are built into full cycles.
+
+Served by GET /api/swaps/<user_id>. Usable offline to list the best cycles
+across the whole user base:
+
+    python swap_graph.py --max-length 3 --limit 100 -o cycles.jsonl
+"""
+
+import argparse
+import heapq
+import json
+import sys
+from collections import Counter, namedtuple
+
+from match_engine import EMPTY_ROW
+
+MAX_CYCLE_LENGTH = 4
+# Learners / teachers of the requester expanded when searching for cycles
+DEFAULT_BEAM = 32
+# Middle members tried per (learner, teacher) when closing 4-cycles
+MIDDLES_PER_PAIR = 4
+
+# members[i] teaches members[i + 1] (the last teaches the first) the skill ids exchanges[i]
+SwapCycle = namedtuple('SwapCycle', ['members', 'exchanges', 'bottleneck', 'total'])
+
+
+def _pair_key(offered_id, wanted_id):
+    return offered_id << 32 | wanted_id
+
+
+def _rank_key(cycle):
+    return (-cycle.bottleneck, len(cycle.members), -cycle.total, cycle.members)
+
+
+def _candidate_key(members, sizes):
+    """_rank_key of the cycle through ``members`` with edge ``sizes``, without building it"""
+    return (-min(sizes), len(members), -sum(sizes), members)
+
+
+class SwapGraph:
+    """Implicit can-teach graph over a MatchEngine, indexed by (offered, wanted) skill pair"""
+
+    def __init__(self, match_engine):
+        self._engine = match_engine
+        # _pair_key(offered id, wanted id) -> ids of users offering the first and wanting the second
+        self._pairs = {}
+        with self._lock:
+            for user_id in match_engine:
+                self.row_changed(user_id, EMPTY_ROW, match_engine.row(user_id))
+            match_engine.subscribe(self)
+
+    def __len__(self):
+        return len(self._engine)
+
+    @property
+    def _lock(self):
+        # Shared with the engine, whose changes reach the graph while it is held
+        return self._engine.lock
+
+    def row_changed(self, user_id, previous, row):
+        """Move a user between pair index entries after the engine changed its row"""
+        with self._lock:
+            for offered_id in previous[0]:
+                for wanted_id in previous[1]:
+                    key = _pair_key(offered_id, wanted_id)
+                    user_ids = self._pairs.get(key)
+                    if user_ids is not None:
+                        user_ids.discard(user_id)
+                        if not user_ids:
+                            del self._pairs[key]
+            for offered_id in row[0]:
+                for wanted_id in row[1]:
+                    self._pairs.setdefault(_pair_key(offered_id, wanted_id), set()).add(user_id)
+
+    def teaches(self, teacher_id, learner_id):
+        """Skill ids ``teacher_id`` offers that ``learner_id`` wants"""
+        return self._engine.row(teacher_id)[0] & self._engine.row(learner_id)[1]
+
+    def reciprocal_pairs(self, user_id, limit=10, above=None):
+        """
+        Best two-way swaps for a user, as SwapCycles of length 2.
+
+        With ``above``, only partners with a larger id are considered.
+        """
+        with self._lock:
+            if user_id not in self._engine:
+                return []
+            # Partners are both learners and teachers of the user; the counts are the edge sizes
+            learned = self._shared(user_id, self._engine.wanting, 0, above)
+            taught = self._shared(user_id, self._engine.offering, 1, above)
+            if len(taught) < len(learned):
+                learned, taught = taught, learned
+            candidates = (
+                _candidate_key((user_id, partner), (count, taught[partner]))
+                for partner, count in learned.items() if partner in taught
+            )
+            return self._best(candidates, limit)
+
+    def swap_cycles(self, user_id, max_length=3, limit=10, beam=DEFAULT_BEAM, above=None):
+        """
+        Best swap cycles of length 3 to ``max_length`` through a user.
+
+        With ``above``, only cycles whose other members all have larger ids
+        are considered, so a walk over every user finds each cycle once.
+        """
+        with self._lock:
+            if user_id not in self._engine or max_length < 3:
+                return []
+            learners = self._top(self._shared(user_id, self._engine.wanting, 0, above), beam)
+            teachers = self._top(self._shared(user_id, self._engine.offering, 1, above), beam)
+            candidates = list(self._three_cycles(user_id, learners, teachers))
+            if min(max_length, MAX_CYCLE_LENGTH) >= 4:
+                candidates += self._four_cycles(user_id, learners, teachers, above)
+            return self._best(candidates, limit)
+
+    def best_cycles(self, max_length=3, limit=100, beam=DEFAULT_BEAM):
+        """Best swaps of length 2 to ``max_length`` across every user, each found once"""
+        with self._lock:
+            user_ids = sorted(self._engine)
+        best = []
+        for user_id in user_ids:
+            with self._lock:
+                if user_id not in self._engine:
+                    continue
+                # Each cycle is reported from its smallest member
+                best += self.reciprocal_pairs(user_id, limit, above=user_id)
+                best += self.swap_cycles(user_id, max_length, limit, beam, above=user_id)
+            if len(best) > 4 * limit:
+                best = heapq.nsmallest(limit, best, key=_rank_key)
+        return heapq.nsmallest(limit, best, key=_rank_key)
+
+    def _shared(self, user_id, column, side, above):
+        """
+        Users sharing skills with ``user_id``'s ``side`` (0 offered, 1 wanted)
+        in the engine ``column`` -- its learners or teachers -- with the shared counts
+        """
+        counts = Counter()
+        for skill_id in self._engine.row(user_id)[side]:
+            counts.update(column(skill_id))
+        counts.pop(user_id, None)
+        if above is not None:
+            counts = {other: count for other, count in counts.items() if other > above}
+        return counts
+
+    @staticmethod
+    def _top(counts, beam):
+        """The ``beam`` (user, count) with the highest counts"""
+        return [(other, counts[other]) for other in heapq.nlargest(beam, counts, key=counts.get)]
+
+    def _three_cycles(self, user_id, learners, teachers):
+        """Candidates (user, B, C) for B in ``learners`` and C in ``teachers`` whenever B teaches C"""
+        row = self._engine.row
+        for learner, learned in learners:
+            learner_offered = row(learner)[0]
+            for teacher, taught in teachers:
+                if teacher != learner:
+                    passed_on = len(learner_offered & row(teacher)[1])
+                    if passed_on:
+                        yield _candidate_key((user_id, learner, teacher), (learned, passed_on, taught))
+
+    def _four_cycles(self, user_id, learners, teachers, above):
+        """Candidates (user, B, C, D) for B in ``learners``, D in ``teachers`` and a few C taught by B who teach D"""
+        row = self._engine.row
+        for learner, learned in learners:
+            learner_offered = row(learner)[0]
+            for teacher, taught in teachers:
+                if teacher != learner:
+                    teacher_wanted = row(teacher)[1]
+                    for middle in self._middles(user_id, learner_offered, learner, teacher, above):
+                        middle_offered, middle_wanted = row(middle)
+                        sizes = (learned, len(learner_offered & middle_wanted),
+                                 len(middle_offered & teacher_wanted), taught)
+                        yield _candidate_key((user_id, learner, middle, teacher), sizes)
+
+    def _middles(self, user_id, learner_offered, learner, teacher, above):
+        """Up to MIDDLES_PER_PAIR users taught by ``learner`` who teach ``teacher``"""
+        middles = set()
+        for offered_id in learner_offered:
+            for wanted_id in self._engine.row(teacher)[1]:
+                for middle in self._pairs.get(_pair_key(wanted_id, offered_id), ()):
+                    if middle not in (user_id, learner, teacher) and (above is None or middle > above):
+                        middles.add(middle)
+                        if len(middles) == MIDDLES_PER_PAIR:
+                            return middles
+        return middles
+
+    def _best(self, candidates, limit):
+        """SwapCycles of the ``limit`` best candidates, given by their rank keys"""
+        return [self._cycle(key[-1]) for key in heapq.nsmallest(limit, candidates)]
+
+    def _cycle(self, members):
+        exchanges = tuple(
+            self.teaches(members[position], members[(position + 1) % len(members)])
+            for position in range(len(members))
+        )
+        sizes = [len(skills) for skills in exchanges]
+        return SwapCycle(members, exchanges, min(sizes), sum(sizes))
+
+
+def describe_cycle(cycle, vocabulary, user_store):
+    """JSON form of a SwapCycle, with user and skill names"""
+    members = [user_store.get(user_id) for user_id in cycle.members]
+    return {
+        "length": len(cycle.members),
+        "bottleneck": cycle.bottleneck,
+        "total_skills": cycle.total,
+        "users": [
+            {"id": user_id, "name": member["name"] if member is not None else None}
+            for user_id, member in zip(cycle.members, members)
+        ],
+        "exchanges": [
+            {
+                "from": cycle.members[position],
+                "to": cycle.members[(position + 1) % len(cycle.members)],
+                "skills": sorted(vocabulary.name_of(skill_id) for skill_id in skills)
+            }
+            for position, skills in enumerate(cycle.exchanges)
+        ]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the best skill-swap cycles across all users")
+    parser.add_argument('--max-length', type=int, default=3,
+                        help=f"Longest cycle to look for (2-{MAX_CYCLE_LENGTH})")
+    parser.add_argument('--limit', type=int, default=100, help="Cycles to report")
+    parser.add_argument('--beam', type=int, default=DEFAULT_BEAM,
+                        help="Learners/teachers expanded per user")
+    parser.add_argument('-o', '--output', default='-', help="Where to write JSON lines (default: stdout)")
+    args = parser.parse_args(argv)
+    if not 2 <= args.max_length <= MAX_CYCLE_LENGTH:
+        parser.error(f"--max-length must be between 2 and {MAX_CYCLE_LENGTH}")
+
+    # Loading the API builds the user store and the swap graph
+    from unified_skills_api import swap_graph, skill_vocabulary, user_store
+
+    cycles = swap_graph.best_cycles(args.max_length, args.limit, args.beam)
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for cycle in cycles:
+            target.write(json.dumps(describe_cycle(cycle, skill_vocabulary, user_store),
+                                    separators=(',', ':')) + "\n")
+    finally:
+        if target is not sys.stdout:
+            target.close()
+
+    print(f"{len(cycles)} cycles across {len(swap_graph)} users", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
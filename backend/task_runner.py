@@ -0,0 +1,129 @@
+"""
+Fan-out of independent analyses onto a thread or process pool.
+
+The pool type and size come from configuration. Every task gets a result
+slot with a status ("ok", "error" or "timeout"), so one failing or slow task
+never fails the whole request.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError, as_completed
+
+EXECUTION_MODES = ('serial', 'thread', 'process')
+
+TaskResult = namedtuple('TaskResult', ['status', 'value', 'error', 'elapsed'])
+
+
+def _timed_call(fn, args):
+    started = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - started
+
+
+class TaskRunner:
+    """Runs calls serially or on a lazily created thread/process pool"""
+
+    def __init__(self, mode='thread', workers=None):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(EXECUTION_MODES)}")
+        self.mode = mode
+        if workers is None:
+            workers = 8 if mode == 'thread' else os.cpu_count() or 1
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def map(self, fn, arg_tuples, timeout=None):
+        """
+        Call ``fn(*args)`` for each entry of ``arg_tuples``.
+
+        Returns one TaskResult per call, in input order. With a pool, each
+        call may take up to ``timeout`` seconds once it reaches a worker;
+        calls still queued behind a full pool get an extra ``timeout`` per
+        wave ahead of them.
+        """
+        arg_tuples = list(arg_tuples)
+        if self.mode == 'serial':
+            return [self._run_inline(fn, args) for args in arg_tuples]
+
+        executor = self._get_executor()
+        started = time.perf_counter()
+        futures = [executor.submit(_timed_call, fn, args) for args in arg_tuples]
+
+        results = []
+        for position, future in enumerate(futures):
+            remaining = None
+            if timeout is not None:
+                deadline = started + timeout * (position // self.workers + 1)
+                remaining = max(0, deadline - time.perf_counter())
+            results.append(self._collect(future, remaining, started))
+        return results
+
+    def as_completed(self, calls, timeout=None):
+        """
+        Run every ``key -> (fn, args)`` entry of ``calls`` and yield
+        ``(key, TaskResult)`` pairs as each one finishes.
+
+        Calls still unfinished ``timeout`` seconds after the first was
+        submitted are yielded as timeouts.
+        """
+        started = time.perf_counter()
+        if self.mode == 'serial':
+            for key, (fn, args) in calls.items():
+                if timeout is not None and time.perf_counter() - started >= timeout:
+                    yield key, TaskResult('timeout', None, "Deadline reached before start", 0.0)
+                else:
+                    yield key, self._run_inline(fn, args)
+            return
+
+        executor = self._get_executor()
+        futures = {executor.submit(_timed_call, fn, args): key for key, (fn, args) in calls.items()}
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                pending.discard(future)
+                yield futures[future], self._collect(future, 0, started)
+        except TimeoutError:
+            elapsed = time.perf_counter() - started
+            for future in futures:
+                if future in pending:
+                    future.cancel()
+                    yield futures[future], TaskResult('timeout', None, f"Timed out after {elapsed:.2f}s", elapsed)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                pool = ThreadPoolExecutor if self.mode == 'thread' else ProcessPoolExecutor
+                self._executor = pool(max_workers=self.workers)
+            return self._executor
+
+    @staticmethod
+    def _run_inline(fn, args):
+        started = time.perf_counter()
+        try:
+            value = fn(*args)
+        except Exception as e:
+            return TaskResult('error', None, str(e), time.perf_counter() - started)
+        return TaskResult('ok', value, None, time.perf_counter() - started)
+
+    @staticmethod
+    def _collect(future, timeout, started):
+        try:
+            value, elapsed = future.result(timeout=timeout)
+        except TimeoutError:
+            # A running thread cannot be interrupted; a queued call is dropped
+            future.cancel()
+            elapsed = time.perf_counter() - started
+            return TaskResult('timeout', None, f"Timed out after {elapsed:.2f}s", elapsed)
+        except Exception as e:
+            return TaskResult('error', None, str(e), time.perf_counter() - started)
+        return TaskResult('ok', value, None, elapsed)
@@ -0,0 +1,48 @@
+"""
+Make the backend's flat modules importable from the tests.
+
+The skill_matcher, skill_recommender and skill_gap_analyzer service modules
+are not part of this tree. When they are not installed, the stand-ins in
+stubs/ are imported in their place, so the API tests run everywhere. They
+are plain modules on the path rather than sys.modules entries, so
+importlib.reload() (dataset reloads) works on them.
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TESTS_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Last on the path, so installed service modules win
+sys.path.append(os.path.join(TESTS_DIR, 'stubs'))
+
+
+def random_user(rng, user_id, skills, max_skills=4, max_wanted=3, names=None):
+    """
+    A user listing up to ``max_skills`` offered and ``max_wanted`` wanted
+    entries of ``skills``, named from ``names`` if given
+    """
+    return {"id": user_id, "name": rng.choice(names) if names else f"User {user_id}",
+            "skills": rng.sample(skills, rng.randint(0, max_skills)),
+            "skillsWanted": rng.sample(skills, rng.randint(0, max_wanted))}
+
+
+def churn(rng, index, make_user, id_range, steps, users=None):
+    """
+    Replace or remove (one in four) random ids below ``id_range``, ``steps``
+    times, through ``index.add_user``/``index.remove_user``; ``users``, if
+    given, is kept in step and returned
+    """
+    users = {} if users is None else users
+    for _ in range(steps):
+        user_id = rng.randrange(id_range)
+        if rng.random() < 0.25:
+            index.remove_user(user_id)
+            users.pop(user_id, None)
+        else:
+            users[user_id] = make_user(rng, user_id)
+            index.add_user(users[user_id])
+    return users
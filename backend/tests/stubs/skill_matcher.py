@@ -0,0 +1,31 @@
+"""
+Stand-in for the skill_matcher service module, for the tests only.
+
+find_skill_matches is the reference linear scan the match engine reproduces.
+"""
+
+USERS_DATABASE = [
+    {"id": 1, "name": "Alice", "skills": ["Python", "SQL"], "skillsWanted": ["React"]},
+    {"id": 2, "name": "Bob", "skills": ["React", "JavaScript"], "skillsWanted": ["Python"]},
+    {"id": 3, "name": "Carol", "skills": ["Go", "Docker"], "skillsWanted": ["SQL", "JavaScript"]},
+    {"id": 4, "name": "dave", "skills": ["Machine Learning", "HTML"], "skillsWanted": ["Go"]},
+]
+
+
+def find_skill_matches(user_skills, desired_skills):
+    matches = []
+    for user in USERS_DATABASE:
+        teaches = [skill for skill in user["skills"] if skill in desired_skills]
+        learns = [skill for skill in user["skillsWanted"] if skill in user_skills]
+        if teaches or learns:
+            matches.append({
+                "userId": user["id"],
+                "matchScore": len(teaches) * 10 + len(learns) * 5,
+                "reasons": teaches + learns
+            })
+    matches.sort(key=lambda match: -match["matchScore"])
+    return matches
+
+
+def fallback_matching(user_skills, desired_skills):
+    return []
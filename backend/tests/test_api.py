@@ -0,0 +1,344 @@
+"""End-to-end checks through the Flask app (with the conftest service stand-ins)"""
+
+import gzip
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+# Runs the API in a fresh interpreter (settings are read at import) and prints
+# the services block of one comprehensive analysis
+PROCESS_MODE_SCRIPT = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+sys.path.append(sys.argv[2])
+import unified_skills_api as api
+body = api.app.test_client().post('/api/comprehensive-analysis', json={
+    "current_skills": ["Python"], "target_role": "Data Scientist", "desired_skills": ["Go"]}).get_json()
+api.analysis_runner.shutdown()
+print(json.dumps(body["services"]))
+"""
+
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    # Settings are read at import: keep the test away from the real user log and snapshot
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('SKILLS_API_USER_LOG', str(data_dir / 'users.jsonl'))
+        for name in ('SKILLS_API_SNAPSHOT', 'SKILLS_API_CHANGE_LOG', 'SKILLS_API_TRAFFIC_LOG'):
+            patch.setenv(name, '')
+        module = importlib.import_module('unified_skills_api')
+    client = module.app.test_client()
+    for index in range(30):
+        response = client.post('/api/add-user', json={
+            "name": f"Paged {index % 6}",
+            "skills": ["Python", "SQL"][:index % 3],
+            "skillsWanted": ["Go"]
+        })
+        assert response.status_code in (200, 201)
+    return module
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
+
+
+def walk(fetch):
+    """Every item of a paged listing, following next_cursor; also returns the page count"""
+    items, cursor, pages = [], None, 0
+    while True:
+        body = fetch(cursor)
+        items.extend(body["users"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.mark.parametrize('sort_by', ['name', 'skills_count', 'match_score'])
+def test_browse_pages_add_up_to_the_unpaged_listing(client, sort_by):
+    query = {'sort_by': sort_by, 'search': 'paged'}
+    everyone = client.get('/api/browse-users', query_string=query).get_json()
+    assert everyone["next_cursor"] is None
+
+    def fetch(cursor):
+        paging = {'limit': 7, 'cursor': cursor} if cursor else {'limit': 7}
+        response = client.get('/api/browse-users', query_string={**query, **paging})
+        assert response.status_code == 200
+        return response.get_json()
+
+    paged, pages = walk(fetch)
+    assert paged == everyone["users"]
+    assert pages == -(-len(everyone["users"]) // 7)
+
+
+def test_search_pages_add_up_to_the_unpaged_results(client):
+    request = {'keywords': ['python', 'go'], 'search_type': 'both'}
+    everyone = client.post('/api/search-users', json=request).get_json()
+
+    def fetch(cursor):
+        response = client.post('/api/search-users', json={**request, 'limit': 4, 'cursor': cursor})
+        assert response.status_code == 200
+        return response.get_json()
+
+    paged, _ = walk(fetch)
+    assert paged == everyone["users"]
+    assert len(paged) == everyone["total_matches"]
+
+
+def test_bad_limits_and_cursors_are_rejected(client):
+    assert client.get('/api/browse-users?limit=0').status_code == 400
+    assert client.get('/api/browse-users?cursor=junk').status_code == 400
+    name_cursor = client.get('/api/browse-users?limit=1').get_json()["next_cursor"]
+    response = client.get('/api/browse-users', query_string={'sort_by': 'skills_count', 'cursor': name_cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('path', ['/api/categories', '/api/career-paths', '/api/trending-skills', '/api/roles'])
+def test_catalog_endpoints_revalidate_with_etags(client, path):
+    response = client.get(path)
+    assert response.status_code == 200 and response.get_json()["success"]
+    etag = response.headers['ETag']
+    revalidated = client.get(path, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+
+
+def test_dataset_reload_rebuilds_catalog_bodies_under_the_same_etags(api, client):
+    etag = client.get('/api/categories').headers['ETag']
+    misses = api.catalog_cache.misses
+    api.reload_datasets()
+
+    # Rebuilt from the reloaded data; unchanged content keeps its ETag, so clients stay valid
+    response = client.get('/api/categories', headers={'If-None-Match': etag})
+    assert api.catalog_cache.misses == misses + 1
+    assert response.status_code == 304
+
+
+def test_catalog_gzip_variant_revalidates_under_its_own_etag(client):
+    plain = client.get('/api/career-paths')
+    compressed = client.get('/api/career-paths', headers={'Accept-Encoding': 'gzip'})
+    if compressed.headers.get('Content-Encoding') == 'br':
+        pytest.skip("brotli is preferred when installed")
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    revalidated = client.get('/api/career-paths', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_added_users_are_matched_at_once(client):
+    response = client.post('/api/add-user', json={
+        "name": "Rusty", "skills": ["Rust", "React"], "skillsWanted": ["Python"]})
+    user_id = response.get_json()["user"]["id"]
+
+    body = client.post('/api/matches', json={"user_skills": ["Python"], "desired_skills": ["Rust"]}).get_json()
+    match = next(match for match in body["matches"] if match["userId"] == user_id)
+    assert match["name"] == "Rusty"
+    assert match["matchScore"] == body["matches"][0]["matchScore"]
+    assert match["reasons"] == ["Rust", "Python"]
+    assert match["userSkills"] == ["Rust", "React"]
+    assert body["total_matches"] == len(body["matches"])
+
+    analysis = client.post('/api/comprehensive-analysis', json={
+        "current_skills": ["Python"], "desired_skills": ["Rust"]}).get_json()
+    assert user_id in [match["userId"] for match in analysis["comprehensive_analysis"]["skill_matches"]]
+
+
+def test_best_matching_roles_agree_with_role_analyses(api, client):
+    overview = client.post('/api/skills-overview', json={
+        "current_skills": ["Python", "SQL"]}).get_json()["overview"]
+    analyses = overview["role_analyses"]
+    readiness = {role: int(analysis["overall_readiness"].replace('%', '')) for role, analysis in analyses.items()}
+    expected = sorted(analyses, key=readiness.get, reverse=True)[:5]
+    assert [entry["role"] for entry in overview["best_matching_roles"]] == expected
+    for entry in overview["best_matching_roles"]:
+        analysis = analyses[entry["role"]]
+        assert entry["readiness"] == f"{readiness[entry['role']]}%"
+        assert entry["readiness_level"] == analysis["readiness_level"]
+    assert {entry["role"] for entry in overview["role_coverage"]} <= set(api.JOB_REQUIREMENTS)
+
+
+def test_search_ties_keep_store_order_across_updates(api, client):
+    def put(external_id, name):
+        return {"op": "put", "external_id": external_id, "name": name, "skills": ["Zig"], "skillsWanted": []}
+
+    api.user_store.apply_changes([put("zig-1", "First"), put("zig-2", "Second")])
+    # Replacing a user keeps its place in the store, and so among equal scores
+    api.user_store.apply_changes([put("zig-1", "First again")])
+    body = client.post('/api/search-users', json={"keywords": ["zig"]}).get_json()
+    assert [user["name"] for user in body["users"]] == ["First again", "Second"]
+
+
+def test_batches_run_while_the_analysis_pool_is_busy(api, client):
+    runner = api.analysis_runner
+    if runner.mode != 'thread':
+        pytest.skip("needs the thread pool")
+    release = threading.Event()
+    try:
+        for _ in range(runner.workers):
+            runner._get_executor().submit(release.wait, 10)
+        response = client.post('/api/batch', data='{"current_skills": ["Python"]}\n')
+        records = [json.loads(line) for line in response.data.splitlines()]
+    finally:
+        release.set()
+    assert records == [{"line": 1, "success": True, "result": records[0]["result"]}]
+
+
+@pytest.mark.parametrize('memo_entries', ['4096', '0'])
+def test_process_pools_need_the_memo_cache_off(tmp_path, memo_entries):
+    env = dict(os.environ, SKILLS_API_EXECUTOR_MODE='process', SKILLS_API_EXECUTOR_WORKERS='2',
+               SKILLS_API_MEMO_MAX_ENTRIES=memo_entries, SKILLS_API_USER_LOG=str(tmp_path / 'users.jsonl'),
+               SKILLS_API_SNAPSHOT='', SKILLS_API_CHANGE_LOG='', SKILLS_API_TRAFFIC_LOG='')
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run(
+        [sys.executable, '-c', PROCESS_MODE_SCRIPT, os.path.dirname(tests_dir), os.path.join(tests_dir, 'stubs')],
+        env=env, capture_output=True, text=True, timeout=60)
+    if memo_entries != '0':
+        assert completed.returncode != 0
+        assert "SKILLS_API_MEMO_MAX_ENTRIES=0" in completed.stderr
+        return
+    assert completed.returncode == 0, completed.stderr
+    services = json.loads(completed.stdout.splitlines()[-1])
+    assert {service: status["status"] for service, status in services.items()} == {
+        "gap_analysis": "ok", "recommendations": "ok", "skill_matches": "ok"}
+
+
+def test_batch_answers_every_line_in_order(client):
+    lines = [
+        '{"id": "a", "current_skills": ["Python"], "desired_skills": ["Go"]}',
+        'not json',
+        '',
+        '[1, 2]',
+        '{"id": "b", "current_skills": [1, "Python"]}',
+        '{"current_skills": "Python"}',
+        '{"current_skills": ["Python"], "desired_skills": [null]}',
+        '{"id": "c", "current_skills": ["SQL"], "target_role": "Data Scientist"}',
+        '{}',
+    ]
+    response = client.post('/api/batch?chunk_size=2', data='\n'.join(lines) + '\n')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.data.splitlines()]
+
+    # Blank lines get no record; every other line keeps its number and id
+    assert [(record["line"], record.get("id"), record["success"]) for record in records] == [
+        (1, "a", True), (2, None, False), (4, None, False), (5, "b", False),
+        (6, None, False), (7, None, False), (8, "c", True), (9, None, False)]
+    errors = {record["line"]: record["error"] for record in records if not record["success"]}
+    assert errors[2].startswith("Invalid JSON")
+    assert errors[4] == "Each line must be a JSON object"
+    assert errors[5] == errors[6] == "current_skills must be a list of strings"
+    assert errors[7] == "desired_skills must be a list of strings"
+    assert errors[9] == "current_skills is required"
+    assert set(records[0]["result"]) == {"recommendations", "skill_matches"}
+    assert records[6]["result"]["gap_analysis"]["target_role"] == "Data Scientist"
+
+
+def test_batch_rejects_bad_chunk_sizes(api, client):
+    for chunk_size in ('0', 'x', str(api.api_config.BATCH_CHUNK_SIZE + 1)):
+        assert client.post(f'/api/batch?chunk_size={chunk_size}', data='{}\n').status_code == 400
+
+
+def test_status_lists_every_service_endpoint(api, client):
+    status = client.get('/api/status').get_json()
+    endpoints = [endpoint for service in status["services"].values() for endpoint in service["endpoints"]]
+    assert status["total_endpoints"] == len(endpoints) == len(set(endpoints))
+    assert {'/api/batch', '/metrics'} <= set(endpoints)
+    routes = {rule.rule.replace('<int:user_id>', '<id>').replace('<path:role_name>', '<name>')
+              for rule in api.app.url_map.iter_rules()}
+    assert set(endpoints) <= routes
+
+
+def ndjson_lines(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    return [json.loads(line) for line in response.get_data().splitlines()]
+
+
+@pytest.mark.parametrize('negotiation', [{'query_string': {'stream': '1'}},
+                                         {'headers': {'Accept': 'application/x-ndjson'}}])
+def test_users_stream_as_ndjson(client, negotiation):
+    listing = client.get('/api/users').get_json()
+    response = client.get('/api/users', **negotiation)
+    assert ndjson_lines(response) == listing["users"]
+    assert response.headers['X-Total-Count'] == str(listing["total_users"])
+
+
+@pytest.mark.parametrize('query', [{'sort_by': 'name'},
+                                   {'sort_by': 'skills_count', 'search': 'python'},
+                                   {'sort_by': 'match_score', 'search': 'paged'}])
+def test_browse_streams_the_listing_as_ndjson(client, query):
+    listing = client.get('/api/browse-users', query_string=query).get_json()
+    response = client.get('/api/browse-users', query_string={**query, 'stream': '1'})
+    assert ndjson_lines(response) == listing["users"]
+    assert response.headers['X-Total-Count'] == str(listing["total_users"])
+
+    # A limit and a cursor cut the stream the way they page the listing
+    first = client.get('/api/browse-users', query_string={**query, 'limit': 5}).get_json()
+    limited = client.get('/api/browse-users', query_string={**query, 'limit': 5, 'stream': '1'})
+    assert ndjson_lines(limited) == first["users"]
+    resumed = client.get('/api/browse-users', query_string={**query, 'cursor': first["next_cursor"], 'stream': '1'})
+    assert ndjson_lines(resumed) == listing["users"][5:]
+    assert resumed.headers['X-Total-Count'] == str(listing["total_users"])
+
+
+def test_metrics_endpoint_serves_the_registry(api, client):
+    client.get('/api/users')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == api.METRICS_CONTENT_TYPE
+    counted = [line for line in response.get_data(as_text=True).splitlines()
+               if line.startswith('skills_api_requests_total{') and '/api/users' in line]
+    assert counted and all(int(line.rsplit(' ', 1)[1]) >= 1 for line in counted)
+
+
+def test_fields_compact_mode_and_gzip_through_the_app(client):
+    full = client.get('/api/browse-users', query_string={'search': 'paged'}).get_json()
+    compact = client.get('/api/browse-users', query_string={'search': 'paged', 'compact': '1'}).get_json()
+    assert [set(user) for user in compact["users"]] == [set(user) - {"skills", "skillsWanted"} for user in full["users"]]
+    ids = client.post('/api/search-users', json={'keywords': ['python'], 'fields': ['users.id']}).get_json()
+    assert set(ids) == {"success", "users"} and all(list(user) == ["id"] for user in ids["users"])
+
+    plain = client.get('/api/users')
+    zipped = client.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.data) == plain.data
+
+
+def test_fuzzy_search_for_ml_skips_html(client):
+    added = {}
+    for name, skills in (("Webby", ["HTML"]), ("Neural", ["Machine Learning"])):
+        response = client.post('/api/add-user', json={"name": name, "skills": skills, "skillsWanted": []})
+        added[response.get_json()["user"]["id"]] = name
+
+    def found(match_mode):
+        body = client.post('/api/search-users', json={"keywords": ["ml"], "match_mode": match_mode}).get_json()
+        return {added[user["id"]] for user in body["users"] if user["id"] in added}
+
+    # Exact mode keeps the substring match; fuzzy mode goes through the alias
+    assert found('exact') == {"Webby"}
+    assert found('fuzzy') == {"Neural"}
+
+
+def test_traffic_recording_leaves_streamed_bodies_unread(api, client, tmp_path, monkeypatch):
+    log_path = tmp_path / 'traffic.jsonl'
+    monkeypatch.setattr(api, 'traffic_recorder', api.TrafficRecorder(str(log_path)))
+    profiles = '{"current_skills": ["Python"]}\n{"current_skills": ["SQL"]}\n'
+    response = client.post('/api/batch', data=profiles, content_type='application/json')
+    assert [json.loads(line)["line"] for line in response.data.splitlines()] == [1, 2]
+    client.post('/api/matches', json={"user_skills": ["Python"], "desired_skills": ["Go"]})
+    api.traffic_recorder.close()
+
+    recorded = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [(record["route"], record["body"]) for record in recorded] == [
+        ('/api/batch', None), ('/api/matches', {"user_skills": ["Python"], "desired_skills": ["Go"]})]
@@ -0,0 +1,90 @@
+"""PrefixIndex completions and Autocomplete kept current as users change"""
+
+import random
+
+from autocomplete import Autocomplete, PrefixIndex
+from conftest import churn, random_user
+from skill_vocabulary import SkillVocabulary
+
+SKILLS = ["Python", "python", "JavaScript", "Java", "Go", "GraphQL", "Git", "SQL", "Scala", "Swift",
+          "Machine Learning", "Node.js", "React", "Rust", "Ruby"]
+NAMES = ["Ann", "ann", "Anna", "Al", "Alice", "Alfred", "Bo", "Bob", "Zed"]
+TRENDING = {"2026": ["Rust", "Go"]}
+PREFIXES = ["", "a", "al", "an", "b", "z", "x", "j", "ja", "g", "go", "py", "r", "ru", "s", "m", "ml", "n"]
+
+
+def brute_force(entries, prefix, top_k):
+    """Best ``top_k`` (payload, weight) of ``entries`` {(key, payload): weight} under ``prefix``"""
+    best = {}
+    for (key, payload), weight in entries.items():
+        if key.startswith(prefix):
+            item = (-weight, key, payload)
+            if payload not in best or item < best[payload]:
+                best[payload] = item
+    return [(payload, -negated) for negated, _, payload in sorted(best.values())[:top_k]]
+
+
+def test_prefix_index_matches_brute_force_under_churn():
+    rng = random.Random(19)
+    keys = ["a", "ab", "abc", "abd", "b", "ba", "bab", "c", "abcd", "bb"]
+    index = PrefixIndex(top_k=3)
+    entries = {}
+    for _ in range(2000):
+        key, payload = rng.choice(keys), rng.randrange(8)
+        if rng.random() < 0.3:
+            index.discard(key, payload)
+            entries.pop((key, payload), None)
+        else:
+            weight = rng.randrange(10)
+            index.set(key, payload, weight)
+            entries[(key, payload)] = weight
+        for prefix in ("", "a", "ab", "abc", "b", "ba", "c", "d"):
+            assert index.complete(prefix) == brute_force(entries, prefix, 3)
+
+
+def test_bulk_load_matches_incremental_sets():
+    rng = random.Random(23)
+    loaded, incremental = PrefixIndex(top_k=4), PrefixIndex(top_k=4)
+    for payload in range(50):
+        key = ''.join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+        weight = rng.randrange(20)
+        loaded.load(key, payload, weight)
+        incremental.set(key, payload, weight)
+    loaded.rebuild()
+    for prefix in ("", "a", "ab", "abc", "b", "c", "ca"):
+        assert loaded.complete(prefix) == incremental.complete(prefix)
+
+
+def named_user(rng, user_id):
+    return random_user(rng, user_id, SKILLS, names=NAMES)
+
+
+def test_incremental_autocomplete_matches_a_rebuild():
+    rng = random.Random(29)
+    vocabulary = SkillVocabulary(SKILLS)
+    users = {user_id: named_user(rng, user_id) for user_id in range(10)}
+    autocomplete = Autocomplete(vocabulary, TRENDING, users.values(), top_k=5)
+    churn(rng, autocomplete, named_user, id_range=25, steps=500, users=users)
+
+    rebuilt = Autocomplete(vocabulary, TRENDING, users.values(), top_k=5)
+    for prefix in PREFIXES:
+        assert autocomplete.complete_skills(prefix) == rebuilt.complete_skills(prefix)
+        assert autocomplete.complete_users(prefix) == rebuilt.complete_users(prefix)
+
+
+def test_skills_complete_from_aliases_and_rank_by_popularity():
+    vocabulary = SkillVocabulary(SKILLS)
+    autocomplete = Autocomplete(vocabulary, TRENDING, [
+        {"id": 1, "name": "Ann", "skills": ["Java", "python"], "skillsWanted": ["Machine Learning"]},
+        {"id": 2, "name": "Al", "skills": ["Java"], "skillsWanted": []},
+    ])
+    assert autocomplete.complete_skills("py") == [("Python", 1, False)]
+    assert autocomplete.complete_skills("ml") == [("Machine Learning", 1, False)]
+    assert autocomplete.complete_skills("ja")[0] == ("Java", 2, False)
+    # Trending skills are boosted even with no users
+    assert autocomplete.complete_skills("g")[0] == ("Go", 0, True)
+    assert autocomplete.complete_users("a") == [1, 2]
+
+    autocomplete.remove_user(1)
+    assert autocomplete.complete_skills("py") == [("Python", 0, False)]
+    assert autocomplete.complete_users("an") == []
@@ -0,0 +1,175 @@
+"""Change log parsing, bounded batches, resumption and replay"""
+
+import json
+
+import pytest
+
+import change_log as change_log_module
+from change_log import ChangeLogIngester, parse_event
+from match_engine import MatchEngine
+from skill_vocabulary import SkillVocabulary
+from user_store import UserStore
+
+
+def upsert(node_id, name, offered=(), wanted=()):
+    return {"op": "upsert", "ts": 1700000000.0,
+            "user": {"_id": node_id, "fullName": name,
+                     "skillsOffered": [{"skillName": skill, "rating": 3} for skill in offered],
+                     "skillsWanted": [{"skillName": skill} for skill in wanted]}}
+
+
+def delete(node_id):
+    return {"op": "delete", "id": node_id}
+
+
+def write_events(path, *events):
+    with open(path, 'a', encoding='utf-8') as log:
+        for event in events:
+            log.write((event if isinstance(event, str) else json.dumps(event)) + "\n")
+
+
+def snapshot(store):
+    return [user.to_dict() for user in store]
+
+
+def test_parse_event_shapes():
+    assert parse_event(upsert("a1", " Ada ", ["Python", " "], ["Go"])) == {
+        "op": "put", "external_id": "a1", "name": "Ada", "skills": ["Python"], "skillsWanted": ["Go"]}
+    assert parse_event({"operationType": "replace", "fullDocument": {
+        "_id": {"$oid": "b2"}, "username": "bob", "skillsOffered": ["SQL"]}})["external_id"] == "b2"
+    assert parse_event({"operationType": "delete", "documentKey": {"_id": {"$oid": "b2"}}}) == {
+        "op": "delete", "external_id": "b2"}
+    for event in ([], {"op": "drop"}, {"op": "upsert"}, {"op": "upsert", "user": {"_id": "x"}},
+                  {"op": "delete"}):
+        with pytest.raises(ValueError):
+            parse_event(event)
+
+
+def test_replay_applies_puts_replacements_and_deletes(tmp_path):
+    change_log = tmp_path / "changes.jsonl"
+    write_events(change_log, upsert("a", "Ada", ["Python"]), upsert("b", "Bob", ["SQL"]),
+                 upsert("a", "Ada", ["Rust"], ["Go"]), delete("b"), delete("unknown"),
+                 "not json", {"op": "drop"})
+    store = UserStore()
+    ingester = ChangeLogIngester(store, str(change_log))
+
+    assert ingester.drain() == 5
+    assert snapshot(store) == [{"id": 1, "name": "Ada", "skills": ["Rust"], "skillsWanted": ["Go"]}]
+    lag = ingester.lag()
+    assert lag["events_applied"] == 5 and lag["events_skipped"] == 2 and lag["pending_bytes"] == 0
+
+
+def test_poll_applies_one_bounded_batch(tmp_path):
+    change_log = tmp_path / "changes.jsonl"
+    write_events(change_log, *(upsert(f"u{index}", f"User {index}") for index in range(5)))
+    store = UserStore()
+    ingester = ChangeLogIngester(store, str(change_log), batch_events=2)
+
+    assert ingester.poll() == 2
+    assert len(store) == 2 and ingester.lag()["pending_bytes"] > 0
+    assert ingester.drain() == 3
+    assert len(store) == 5 and ingester.lag()["pending_bytes"] == 0
+
+
+def test_incomplete_last_line_waits_for_its_newline(tmp_path):
+    change_log = tmp_path / "changes.jsonl"
+    write_events(change_log, upsert("a", "Ada"))
+    partial = json.dumps(upsert("b", "Bob"))
+    with open(change_log, 'a', encoding='utf-8') as log:
+        log.write(partial[:10])
+    store = UserStore()
+    ingester = ChangeLogIngester(store, str(change_log))
+
+    assert ingester.drain() == 1
+    with open(change_log, 'a', encoding='utf-8') as log:
+        log.write(partial[10:] + "\n")
+    assert ingester.drain() == 1
+    assert [user.name for user in store] == ["Ada", "Bob"]
+
+
+def test_restart_resumes_from_the_saved_offset(tmp_path):
+    change_log, state, user_log = (str(tmp_path / name) for name in ("changes.jsonl", "state.json", "users.jsonl"))
+    write_events(change_log, upsert("a", "Ada"), upsert("b", "Bob"))
+    store = UserStore(log_path=user_log)
+    assert ChangeLogIngester(store, change_log, state).drain() == 2
+    store.close()
+
+    write_events(change_log, upsert("c", "Cy"), delete("a"))
+    restarted = UserStore(log_path=user_log)
+    ingester = ChangeLogIngester(restarted, change_log, state)
+    assert ingester.drain() == 2
+    assert [(user.id, user.name) for user in restarted] == [(2, "Bob"), (3, "Cy")]
+    assert ingester.lag()["events_applied"] == 4
+    restarted.close()
+
+
+def test_reapplying_a_batch_leaves_the_store_unchanged(tmp_path):
+    change_log, user_log = str(tmp_path / "changes.jsonl"), str(tmp_path / "users.jsonl")
+    write_events(change_log, upsert("a", "Ada", ["Python"]), upsert("b", "Bob"), delete("b"),
+                 upsert("c", "Cy", ["SQL"]))
+    store = UserStore(log_path=user_log)
+    ChangeLogIngester(store, change_log).drain()
+    applied = snapshot(store)
+
+    # As after a crash between applying the batch and saving the offset
+    ChangeLogIngester(store, change_log).drain()
+    assert snapshot(store) == applied
+    store.close()
+    replayed = UserStore(log_path=user_log)
+    assert snapshot(replayed) == applied
+    replayed.close()
+
+
+def test_unreadable_state_re_reads_the_change_log(tmp_path):
+    change_log, state = str(tmp_path / "changes.jsonl"), tmp_path / "state.json"
+    write_events(change_log, upsert("a", "Ada"))
+    state.write_text("{not json")
+    store = UserStore()
+    assert ChangeLogIngester(store, change_log, str(state)).drain() == 1
+    assert json.loads(state.read_text())["offset"] > 0
+
+
+def test_ingested_upserts_and_deletes_reach_the_matches(tmp_path):
+    change_log = str(tmp_path / "changes.jsonl")
+    store = UserStore([{"id": 1, "name": "Seed", "skills": ["Go"], "skillsWanted": []}])
+    engine = MatchEngine(SkillVocabulary(), store)
+    store.subscribe(engine)
+    ingester = ChangeLogIngester(store, change_log)
+
+    write_events(change_log, upsert("m1", "Mongo", ["Rust"], ["Python"]))
+    ingester.drain()
+    matches, _ = engine.find_matches(["Python"], ["Rust"])
+    assert [(match["userId"], match["matchScore"]) for match in matches] == [(2, 15)]
+
+    write_events(change_log, upsert("m1", "Mongo", ["Go"], []))
+    ingester.drain()
+    assert engine.find_matches(["Python"], ["Rust"]) == ([], 0)
+    assert [match["userId"] for match in engine.find_matches(["Python"], ["Go"])[0]] == [1, 2]
+
+    write_events(change_log, delete("m1"))
+    ingester.drain()
+    assert [match["userId"] for match in engine.find_matches(["Python"], ["Go"])[0]] == [1]
+
+
+def test_event_longer_than_a_read_is_skipped(tmp_path, monkeypatch):
+    # Room for a few ordinary events, not for the oversized one
+    monkeypatch.setattr(change_log_module, 'READ_CHUNK_BYTES', 3 * len(json.dumps(upsert("a", "Ada"))))
+    change_log = tmp_path / "changes.jsonl"
+    write_events(change_log, upsert("a", "Ada"))
+    oversized = json.dumps(upsert("b", "B" * 1000))
+    with open(change_log, 'a', encoding='utf-8') as log:
+        log.write(oversized[:600])
+    store = UserStore()
+    ingester = ChangeLogIngester(store, str(change_log))
+
+    # Its newline is not written yet: nothing to skip so far
+    assert ingester.drain() == 1
+    assert ingester.lag()["events_skipped"] == 0
+    with open(change_log, 'a', encoding='utf-8') as log:
+        log.write(oversized[600:] + "\n")
+    write_events(change_log, upsert("c", "Cy"))
+
+    assert ingester.drain() == 1
+    assert [user.name for user in store] == ["Ada", "Cy"]
+    lag = ingester.lag()
+    assert lag["events_skipped"] == 1 and lag["pending_bytes"] == 0
@@ -0,0 +1,77 @@
+"""Content negotiation and the cases compress_response leaves alone"""
+
+import gzip
+
+import pytest
+from flask import Flask, Response
+
+import compression
+from compression import compress_response
+
+BODY = b'{"users":[' + b','.join(b'{"id":%d,"name":"User"}' % user_id for user_id in range(100)) + b']}'
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Negotiated as if brotli were not installed, so gzip is what is offered
+    monkeypatch.setattr(compression, 'brotli', None)
+    return Flask(__name__)
+
+
+def compressed(app, response, accept='gzip, deflate', min_bytes=1024):
+    with app.test_request_context(headers={'Accept-Encoding': accept}):
+        return compress_response(response, min_bytes)
+
+
+def test_large_bodies_are_gzipped_for_clients_that_accept_it(app):
+    response = compressed(app, Response(BODY, mimetype='application/json'))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.get_data()) == BODY
+    assert response.content_length == len(response.get_data())
+
+
+@pytest.mark.parametrize('accept', ['', 'identity', 'br, gzip;q=0'])
+def test_bodies_stay_plain_unless_gzip_is_accepted(app, accept):
+    response = compressed(app, Response(BODY, mimetype='application/json'), accept)
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == BODY
+    # The body still depends on Accept-Encoding for caches
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_brotli_is_preferred_when_installed(app, monkeypatch):
+    brotli = pytest.importorskip('brotli')
+    monkeypatch.setattr(compression, 'brotli', brotli)
+    response = compressed(app, Response(BODY, mimetype='application/json'), 'gzip, br')
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == BODY
+
+
+def no_transform():
+    response = Response(BODY, mimetype='application/json')
+    response.cache_control.no_transform = True
+    return response
+
+
+def with_header(name, value):
+    response = Response(BODY, mimetype='application/json')
+    response.headers[name] = value
+    return response
+
+
+@pytest.mark.parametrize('make_response', [
+    lambda: Response(BODY[:1000], mimetype='application/json'),
+    lambda: Response(BODY, mimetype='image/png'),
+    lambda: Response(BODY, status=304, mimetype='application/json'),
+    lambda: Response(iter([BODY]), mimetype='application/x-ndjson'),
+    lambda: with_header('ETag', '"catalog"'),
+    lambda: with_header('Content-Encoding', 'br'),
+    no_transform,
+], ids=['small', 'binary', 'not-modified', 'streamed', 'etag', 'encoded', 'no-transform'])
+def test_responses_left_alone(app, make_response):
+    response = make_response()
+    encoding = response.headers.get('Content-Encoding')
+    response = compressed(app, response)
+    assert response.headers.get('Content-Encoding') == encoding
+    assert 'Vary' not in response.headers
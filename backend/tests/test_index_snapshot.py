@@ -0,0 +1,78 @@
+"""Snapshot round trips and the checks that reject stale or damaged ones"""
+
+import pytest
+
+import index_snapshot
+from index_snapshot import SnapshotError
+from match_engine import MatchEngine
+from skill_vocabulary import SkillVocabulary
+from user_store import UserStore
+
+FINGERPRINT = b"f" * 32
+
+
+def test_missing_snapshot_loads_as_none(tmp_path):
+    assert index_snapshot.load(str(tmp_path / "absent.snap"), FINGERPRINT) is None
+
+
+def test_indexes_round_trip(tmp_path):
+    path = str(tmp_path / "indexes.snap")
+    users = [{"id": 1, "name": "Ada", "skills": ["Python"], "skillsWanted": ["Go"]}]
+    vocabulary = SkillVocabulary()
+    state = {"store": UserStore(users), "engine": MatchEngine(vocabulary, users)}
+    index_snapshot.save(path, FINGERPRINT, state)
+
+    loaded = index_snapshot.load(path, FINGERPRINT)
+    assert [user.to_dict() for user in loaded["store"]] == users
+    assert loaded["engine"].row(1) == state["engine"].row(1)
+    # Locks are recreated, so the loaded indexes stay writable
+    loaded["engine"].add_user({"id": 2, "name": "Bob", "skills": ["Go"], "skillsWanted": []})
+    assert 2 in loaded["engine"]
+
+
+def test_fingerprint_covers_sources_settings_and_datasets(tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text("A = 1\n")
+    base = index_snapshot.fingerprint([str(source)], ("setting",), ({"Role": ["Python"]},))
+    assert base == index_snapshot.fingerprint([str(source)], ("setting",), ({"Role": ["Python"]},))
+    assert base != index_snapshot.fingerprint([str(source)], ("other",), ({"Role": ["Python"]},))
+    assert base != index_snapshot.fingerprint([str(source)], ("setting",), ({"Role": ["Go"]},))
+    source.write_text("A = 2\n")
+    assert base != index_snapshot.fingerprint([str(source)], ("setting",), ({"Role": ["Python"]},))
+
+
+def test_fingerprint_mismatch_is_rejected(tmp_path):
+    path = str(tmp_path / "indexes.snap")
+    index_snapshot.save(path, FINGERPRINT, {"value": 1})
+    with pytest.raises(SnapshotError, match="different"):
+        index_snapshot.load(path, b"g" * 32)
+
+
+@pytest.mark.parametrize("damage, message", [
+    (lambda data: data[:20], "truncated header"),
+    (lambda data: b"NOTSNAP!" + data[8:], "format"),
+    (lambda data: data[:-1], "truncated payload"),
+    (lambda data: data[:-1] + bytes([data[-1] ^ 0xFF]), "checksum"),
+])
+def test_damaged_snapshot_is_rejected(tmp_path, damage, message):
+    path = tmp_path / "indexes.snap"
+    index_snapshot.save(str(path), FINGERPRINT, {"value": list(range(100))})
+    path.write_bytes(damage(path.read_bytes()))
+    with pytest.raises(SnapshotError, match=message):
+        index_snapshot.load(str(path), FINGERPRINT)
+
+
+def test_appended_files_may_grow_but_not_change(tmp_path):
+    path, user_log = str(tmp_path / "indexes.snap"), tmp_path / "users.jsonl"
+    user_log.write_bytes(b"first\n")
+    index_snapshot.save(path, FINGERPRINT, {"value": 1}, appended_files={str(user_log): 6})
+
+    user_log.write_bytes(b"first\nsecond\n")
+    assert index_snapshot.load(path, FINGERPRINT) == {"value": 1}
+
+    user_log.write_bytes(b"fir5t\nsecond\n")
+    with pytest.raises(SnapshotError, match="changed"):
+        index_snapshot.load(path, FINGERPRINT)
+    user_log.write_bytes(b"fir")
+    with pytest.raises(SnapshotError, match="changed"):
+        index_snapshot.load(path, FINGERPRINT)
@@ -0,0 +1,65 @@
+"""FastJSONProvider encoding, RawJSON splicing and the stdlib fallback"""
+
+import json
+
+import pytest
+from flask import Flask
+
+import json_provider
+from json_provider import FastJSONProvider, RawJSON
+
+BODY = {"name": "Zoë", "skills": ["Python", "SQL"], "scores": {"b": 1.5, "a": None}}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, monkeypatch):
+    if request.param == 'orjson':
+        if json_provider.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    app = Flask(__name__)
+    # The provider only holds a weak reference to its app
+    yield FastJSONProvider(app)
+
+
+def test_encodes_like_the_stdlib(provider):
+    for kwargs in ({}, {'separators': (',', ':')}, {'indent': 2}, {'sort_keys': False}):
+        assert json.loads(provider.dumps(BODY, **kwargs)) == json.loads(json.dumps(BODY))
+    assert provider.dumps({"b": 1, "a": 2}, separators=(',', ':')) == '{"a":2,"b":1}'
+
+
+def test_raw_fragments_are_spliced_verbatim(provider):
+    cached = provider.fragment({"overall_readiness": "50%", "gaps": ["Go"]})
+    body = {"analysis": cached, "roles": [cached, RawJSON(b'[1, 2]')], "note": "x"}
+    assert provider.dumps_bytes(body, separators=(',', ':')) == (
+        b'{"analysis":{"gaps":["Go"],"overall_readiness":"50%"},'
+        b'"note":"x","roles":[{"gaps":["Go"],"overall_readiness":"50%"},[1, 2]]}')
+    assert json.loads(provider.dumps(body, indent=2))["roles"][1] == [1, 2]
+
+
+def test_request_data_cannot_forge_a_placeholder(provider):
+    # Right shape, wrong token: an ordinary string that must survive untouched
+    forged = "\x00" + "0" * 16 + ":0"
+    assert json.loads(provider.dumps({"a": RawJSON(b'1'), "b": forged})) == {"a": 1, "b": forged}
+
+
+def test_wide_integers_fall_back_to_the_stdlib(provider):
+    wide = 2 ** 70
+    body = {"id": wide, "analysis": RawJSON(b'{"x":1}')}
+    assert provider.dumps_bytes(body, separators=(',', ':')) == b'{"analysis":{"x":1},"id":%d}' % wide
+    assert provider.loads(provider.dumps({"id": wide})) == {"id": wide}
+
+
+def test_stdlib_only_arguments_are_honoured(provider):
+    assert provider.dumps({"a": [1, 2]}, separators=(', ', ': ')) == '{"a": [1, 2]}'
+    assert provider.dumps({"a": 1}, indent=4) == '{\n    "a": 1\n}'
+    with pytest.raises(ValueError):
+        provider.loads('{"a": ')
+
+
+def test_responses_are_compact_bytes_with_a_newline(provider):
+    with provider._app.app_context():
+        response = provider.response({"users": [], "raw": RawJSON(b'{"n":1}')})
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == b'{"raw":{"n":1},"users":[]}\n'
@@ -0,0 +1,81 @@
+"""MatchEngine scoring against skill_matcher.find_skill_matches"""
+
+import random
+
+import pytest
+
+import skill_matcher
+from match_engine import MatchEngine
+from skill_vocabulary import SkillVocabulary
+
+# Spelling variants and aliases share vocabulary ids but must still be compared as spelled
+SKILLS = ["Python", "python", "Py", "JavaScript", "js", "React", "SQL", "Go", "golang", "Docker", "Rust", "HTML"]
+
+
+def random_user(rng, user_id):
+    return {"id": user_id, "name": f"User {user_id}",
+            "skills": [rng.choice(SKILLS) for _ in range(rng.randint(0, 4))],
+            "skillsWanted": [rng.choice(SKILLS) for _ in range(rng.randint(0, 3))]}
+
+
+def random_request(rng):
+    return rng.sample(SKILLS, rng.randint(1, 4)), rng.sample(SKILLS, rng.randint(1, 4))
+
+
+def assert_parity(monkeypatch, engine, users, rng, requests=200):
+    """The engine's matches equal the scan over ``users`` (in insertion order)"""
+    monkeypatch.setattr(skill_matcher, 'USERS_DATABASE', list(users))
+    for _ in range(requests):
+        user_skills, desired_skills = random_request(rng)
+        expected = skill_matcher.find_skill_matches(user_skills, desired_skills)
+        matches, total = engine.find_matches(user_skills, desired_skills)
+        assert matches == expected
+        assert total == len(expected)
+        limit = rng.randint(1, 5)
+        assert engine.find_matches(user_skills, desired_skills, limit) == (expected[:limit], len(expected))
+
+
+def test_matches_equal_the_reference_scan(monkeypatch):
+    rng = random.Random(37)
+    users = [random_user(rng, user_id) for user_id in rng.sample(range(1, 500), 120)]
+    engine = MatchEngine(SkillVocabulary(), users)
+    assert_parity(monkeypatch, engine, users, rng)
+
+
+def test_matches_follow_adds_replacements_and_removals(monkeypatch):
+    rng = random.Random(41)
+    # Insertion-ordered like the store: a replaced user keeps its place, a re-added one goes last
+    users = {user_id: random_user(rng, user_id) for user_id in range(1, 30)}
+    engine = MatchEngine(SkillVocabulary(), users.values())
+    for _ in range(300):
+        user_id = rng.randrange(1, 60)
+        if rng.random() < 0.3:
+            engine.remove_user(user_id)
+            users.pop(user_id, None)
+        else:
+            users[user_id] = random_user(rng, user_id)
+            engine.add_user(users[user_id])
+    assert_parity(monkeypatch, engine, users.values(), rng)
+
+
+def test_scores_and_reasons():
+    engine = MatchEngine(SkillVocabulary(), [
+        {"id": 7, "name": "A", "skills": ["Rust", "React", "Rust"], "skillsWanted": ["Python"]},
+        {"id": 3, "name": "B", "skills": ["rust"], "skillsWanted": ["Python", "Go"]},
+        {"id": 5, "name": "C", "skills": ["Go"], "skillsWanted": []},
+    ])
+    matches, total = engine.find_matches(["Python"], ["Rust", "React"])
+    assert matches == [
+        {"userId": 7, "matchScore": 35, "reasons": ["Rust", "React", "Rust", "Python"]},
+        {"userId": 3, "matchScore": 5, "reasons": ["Python"]},
+    ]
+    assert total == 2
+    assert engine.find_matches(["Haskell"], ["Elixir"]) == ([], 0)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 10])
+def test_ties_keep_insertion_order(limit):
+    users = [{"id": user_id, "name": "", "skills": ["Go"], "skillsWanted": []} for user_id in (9, 2, 5, 1)]
+    engine = MatchEngine(SkillVocabulary(), users)
+    matches, _ = engine.find_matches(["Python"], ["Go"], limit)
+    assert [match["userId"] for match in matches] == [9, 2, 5, 1][:limit]
@@ -0,0 +1,79 @@
+"""MemoCache hits, copies, encoded reads and limits"""
+
+import json
+
+import memo_cache
+from memo_cache import MemoCache
+
+
+class Counting:
+    """compute() stand-in counting its calls"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return json.loads(json.dumps(self.value))
+
+
+def test_hits_are_private_copies():
+    cache = MemoCache()
+    compute = Counting({"gaps": ["Go"]})
+    first = cache.get_or_compute('key', compute)
+    first["gaps"].append("changed by a caller")
+    second = cache.get_or_compute('key', compute)
+    assert second == {"gaps": ["Go"]}
+    second["gaps"].clear()
+    assert cache.get_or_compute('key', compute) == {"gaps": ["Go"]}
+    assert compute.calls == 1 and (cache.hits, cache.misses) == (2, 1)
+
+
+def test_encoded_and_summarized_reads_copy_nothing(monkeypatch):
+    cache = MemoCache(encode=lambda value: json.dumps(value).encode())
+    compute = Counting({"overall_readiness": "50%", "critical_gaps": ["Go"]})
+    copies = []
+    monkeypatch.setattr(memo_cache.copy, 'deepcopy', lambda value: copies.append(value) or value)
+
+    encoded = cache.get_or_compute_encoded('key', compute)
+    assert json.loads(encoded) == compute.value
+    assert cache.get_or_compute_encoded('key', compute) is encoded
+    summary, again = cache.get_or_compute_summary('key', compute, lambda value: value["overall_readiness"])
+    assert (summary, again) == ("50%", encoded)
+    assert compute.calls == 1 and copies == []
+
+
+def test_disabled_cache_just_computes():
+    encodes = []
+    cache = MemoCache(max_entries=0, encode=lambda value: encodes.append(value) or b"{}")
+    compute = Counting([1])
+    assert cache.get_or_compute('key', compute) == [1]
+    assert cache.get_or_compute('key', compute) == [1]
+    assert compute.calls == 2 and encodes == []
+    assert cache.get_or_compute_encoded('key', compute) == b"{}"
+    assert len(cache) == 0 and cache.evictions == 0
+
+
+def test_entry_and_byte_limits_evict_least_recently_used():
+    cache = MemoCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.get_or_compute(key, Counting(key))
+    cache.get_or_compute('a', Counting('a'))
+    cache.get_or_compute('c', Counting('c'))
+    assert list(cache._entries) == ['a', 'c'] and cache.evictions == 1
+
+    small = MemoCache(max_bytes=10)
+    assert small.get_or_compute('big', Counting("x" * 50)) == "x" * 50
+    assert len(small) == 0
+
+
+def test_expired_entries_are_recomputed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(memo_cache.time, 'monotonic', lambda: now[0])
+    cache = MemoCache(ttl=10)
+    compute = Counting(1)
+    cache.get_or_compute('key', compute)
+    now[0] += 11
+    cache.get_or_compute('key', compute)
+    assert compute.calls == 2 and cache.expirations == 1
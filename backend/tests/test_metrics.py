@@ -0,0 +1,97 @@
+"""Prometheus rendering and aggregation of worker metrics through a shared directory"""
+
+import multiprocessing
+import os
+
+import pytest
+
+import metrics
+from metrics import MetricsRegistry
+
+
+def build_registry():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests handled', ('route', 'status'))
+    latency = registry.histogram('latency_seconds', 'Request latency', ('route',), buckets=(0.1, 1.0))
+    return registry, requests, latency
+
+
+def record(registry, requests, latency, count):
+    """What one worker serves before exiting: ``count`` requests of 0.5s, then a flush"""
+    for _ in range(count):
+        requests.inc('/api/users', '200')
+        latency.observe(0.5, '/api/users')
+    registry.flush()
+
+
+def samples(text):
+    """Sample lines of a rendering: name{labels} -> value"""
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def test_render_in_the_text_format():
+    registry, requests, latency = build_registry()
+    requests.inc('/api/users', '200')
+    requests.inc('/api/users', '200', amount=2)
+    requests.inc('/say "hi"\\', '500')
+    latency.observe(0.05, '/api/users')
+    latency.observe(1.0, '/api/users')
+    latency.observe(3.0, '/api/users')
+    registry.collector(lambda: [('users', 'gauge', 'Users in the store', [({}, 7), ({'kind': 'seed'}, 2.5)])])
+
+    assert registry.render().splitlines() == [
+        '# HELP requests_total Requests handled',
+        '# TYPE requests_total counter',
+        'requests_total{route="/api/users",status="200"} 3',
+        'requests_total{route="/say \\"hi\\"\\\\",status="500"} 1',
+        '# HELP latency_seconds Request latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{route="/api/users",le="0.1"} 1',
+        'latency_seconds_bucket{route="/api/users",le="1.0"} 2',
+        'latency_seconds_bucket{route="/api/users",le="+Inf"} 3',
+        'latency_seconds_sum{route="/api/users"} 4.05',
+        'latency_seconds_count{route="/api/users"} 3',
+        '# HELP users Users in the store',
+        '# TYPE users gauge',
+        'users 7',
+        'users{kind="seed"} 2.5',
+    ]
+
+
+@pytest.mark.skipif(metrics.fcntl is None, reason="needs flock")
+def test_scrapes_add_up_live_and_retired_workers(tmp_path):
+    registry, requests, latency = build_registry()
+    registry.set_multiprocess_dir(str(tmp_path))
+    registry.collector(lambda: [('users', 'gauge', 'Users in the store', [({}, 7)])])
+
+    # Forked workers inherit the registry and write their own files
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=record, args=(registry, requests, latency, count)) for count in (2, 3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+    record(registry, requests, latency, 1)
+
+    expected = {
+        'requests_total{route="/api/users",status="200"}': '6',
+        'latency_seconds_bucket{route="/api/users",le="0.1"}': '0',
+        'latency_seconds_bucket{route="/api/users",le="1.0"}': '6',
+        'latency_seconds_bucket{route="/api/users",le="+Inf"}': '6',
+        'latency_seconds_sum{route="/api/users"}': '3.0',
+        'latency_seconds_count{route="/api/users"}': '6',
+        # Collector samples describe the answering process only
+        f'users{{worker="{os.getpid()}"}}': '7',
+    }
+    assert samples(registry.render()) == expected
+
+    # Exited workers are folded into the retired totals, once
+    registry.retire(workers[0].pid)
+    registry.retire(workers[0].pid)
+    assert not os.path.exists(tmp_path / f'worker-{workers[0].pid}.json')
+    assert samples(registry.render()) == expected
+    registry.retire(workers[1].pid)
+    assert sorted(os.listdir(tmp_path)) == ['.lock', metrics.RETIRED_FILE, f'worker-{os.getpid()}.json']
+    assert samples(registry.render()) == expected
+
@@ -0,0 +1,57 @@
+"""Cursors, page selection and the store orderings pages walk"""
+
+import random
+
+import pytest
+
+from pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, parse_limit, select_page
+from user_store import UserStore
+
+
+def test_cursor_round_trip_and_validation():
+    cursor = encode_cursor('name', ("ada", 3))
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 'name') == ("ada", 3)
+    with pytest.raises(ValueError, match="does not belong"):
+        decode_cursor(cursor, 'skills_count')
+    for junk in ("!!!", "e30", encode_cursor('name', ())[:-3]):
+        with pytest.raises(ValueError):
+            decode_cursor(junk, 'name')
+
+
+def test_parse_limit():
+    assert parse_limit(None) is None and parse_limit('') is None
+    assert parse_limit('25') == 25 and parse_limit(MAX_PAGE_SIZE) == MAX_PAGE_SIZE
+    for bad in ('0', str(MAX_PAGE_SIZE + 1), 'ten', True, [3]):
+        with pytest.raises(ValueError):
+            parse_limit(bad)
+
+
+def test_select_page_walks_every_item_once():
+    rng = random.Random(31)
+    scores = {item: rng.randrange(5) for item in range(103)}
+    sort_key = lambda item: (-scores[item], item)
+    walked, after = [], None
+    while True:
+        page, after = select_page(scores, sort_key, 10, after)
+        walked.extend(page)
+        if after is None:
+            break
+    assert walked == sorted(scores, key=sort_key)
+    assert select_page(scores, sort_key, None) == (sorted(scores, key=sort_key), None)
+
+
+def test_store_orderings_resume_after_a_key_while_users_are_added():
+    store = UserStore([{"id": index, "name": f"User {index % 7}", "skills": ["Python"] * (index % 4),
+                        "skillsWanted": []} for index in range(1, 40)])
+    first = list(store.iter_sorted('name'))[:10]
+    resume = store.sort_key('name', first[-1].id)
+
+    # Added after the first page: sorts before the cursor, so it is not on later pages
+    store.add("Aaron", ["Go"], [])
+    rest = [user.id for user in store.iter_sorted('name', resume)]
+    before = {user.id for user in first}
+    assert not before & set(rest)
+    assert len(before) + len(rest) == 39
+    assert [store.sort_key('name', user_id) for user_id in rest] == sorted(
+        store.sort_key('name', user_id) for user_id in rest)
@@ -0,0 +1,77 @@
+"""Projection path selection and compact mode, and how requests ask for them"""
+
+import pytest
+from flask import Flask
+
+from projection import Projection, request_projection
+
+
+def listing(projection, calls):
+    """A response shaped like /api/browse-users, counting the lazy values built"""
+    def heavy():
+        calls.append('skills')
+        return ["Python"]
+
+    users = [projection.build('users', {"id": user_id, "name": f"User {user_id}", "skills": heavy})
+             for user_id in (1, 2)]
+    return projection.build('', {
+        "success": True,
+        "users": users,
+        "paging": {"next_cursor": "abc", "limit": 2},
+        "total_users": 2,
+    })
+
+
+def test_no_projection_returns_everything():
+    calls = []
+    body = listing(Projection(), calls)
+    assert Projection().identity
+    assert body["users"][0] == {"id": 1, "name": "User 1", "skills": ["Python"]}
+    assert calls == ['skills', 'skills']
+
+
+def test_fields_select_paths_through_lists():
+    calls = []
+    body = listing(Projection(['users.id', 'paging']), calls)
+    # Named objects come back whole; success is always kept
+    assert body == {"success": True, "users": [{"id": 1}, {"id": 2}], "paging": {"next_cursor": "abc", "limit": 2}}
+    # Left-out values are never computed
+    assert calls == []
+
+
+def test_compact_mode_drops_unless_fields_name_the_path():
+    calls = []
+    body = listing(Projection(compact_drops=('users.skills',)), calls)
+    assert body["users"] == [{"id": 1, "name": "User 1"}, {"id": 2, "name": "User 2"}]
+    assert calls == []
+
+    body = listing(Projection(['users.id', 'users.skills'], compact_drops=('users.skills',)), calls)
+    assert body["users"] == [{"id": 1, "skills": ["Python"]}, {"id": 2, "skills": ["Python"]}]
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.mark.parametrize('query, data, fields, drops', [
+    ('', None, None, frozenset()),
+    ('?fields=users.id,,total_users', None, {'users.id', 'total_users'}, frozenset()),
+    ('?fields=', None, None, frozenset()),
+    ('?compact=1', None, None, {'users.skills'}),
+    ('?compact=0', {'compact': True}, None, frozenset()),
+    ('', {'fields': ['users.skills'], 'compact': True}, {'users.skills'}, frozenset()),
+    ('?fields=total_users', {'fields': ['users.id']}, {'total_users'}, frozenset()),
+])
+def test_request_projection_reads_the_query_then_the_body(app, query, data, fields, drops):
+    with app.test_request_context('/api/browse-users' + query):
+        projection = request_projection(data, compact_drops=('users.skills',))
+    assert projection.fields == (None if fields is None else frozenset(fields))
+    assert projection.drops == frozenset(drops)
+
+
+@pytest.mark.parametrize('fields', [7, ['users.id', 3], {'users': 'id'}])
+def test_malformed_fields_are_rejected(app, fields):
+    with app.test_request_context('/api/matches', method='POST'):
+        with pytest.raises(ValueError):
+            request_projection({'fields': fields})
@@ -0,0 +1,72 @@
+"""Pre-serialized catalog responses: ETags, 304s, encodings and invalidation"""
+
+import gzip
+
+import pytest
+from flask import Flask
+
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    cache = app.config['CACHE'] = ResponseCache(max_age=60)
+    catalog = app.config['CATALOG'] = {"skills": ["Python", "Go"]}
+    app.add_url_rule('/catalog', 'catalog', lambda: cache.respond('catalog', lambda: dict(catalog)))
+    app.add_url_rule('/versioned/<int:version>', 'versioned',
+                     lambda version: cache.respond('versioned', lambda: {"version": version}, version))
+    return app
+
+
+def test_body_is_built_once_and_served_with_an_etag(app):
+    client = app.test_client()
+    first = client.get('/catalog')
+    assert first.status_code == 200
+    assert first.get_json() == {"skills": ["Python", "Go"]}
+    assert first.headers['Cache-Control'] == 'public, max-age=60'
+    assert first.headers['Vary'] == 'Accept-Encoding'
+
+    second = client.get('/catalog')
+    assert second.headers['ETag'] == first.headers['ETag']
+    cache = app.config['CACHE']
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_matching_if_none_match_gets_304(app):
+    client = app.test_client()
+    etag = client.get('/catalog').headers['ETag']
+    response = client.get('/catalog', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert client.get('/catalog', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_gzip_variant_has_its_own_etag_and_any_variant_revalidates(app):
+    client = app.test_client()
+    plain = client.get('/catalog')
+    compressed = client.get('/catalog', headers={'Accept-Encoding': 'gzip'})
+    if compressed.headers.get('Content-Encoding') == 'br':
+        pytest.skip("brotli is preferred when installed")
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    # A client holding either variant is up to date
+    response = client.get('/catalog', headers={'If-None-Match': compressed.headers['ETag']})
+    assert response.status_code == 304
+
+
+def test_invalidate_and_version_change_rebuild_the_body(app):
+    client = app.test_client()
+    etag = client.get('/catalog').headers['ETag']
+    app.config['CATALOG']["skills"].append("Rust")
+    assert client.get('/catalog').headers['ETag'] == etag
+
+    app.config['CACHE'].invalidate('catalog')
+    response = client.get('/catalog', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()["skills"] == ["Python", "Go", "Rust"]
+
+    assert client.get('/versioned/1').get_json() == {"version": 1}
+    assert client.get('/versioned/2').get_json() == {"version": 2}
@@ -0,0 +1,69 @@
+"""RoleReadiness scores kept up to date as users change"""
+
+import random
+
+from conftest import churn, random_user
+from role_readiness import RoleReadiness
+from skill_vocabulary import SkillVocabulary
+
+JOB_REQUIREMENTS = {
+    "Backend Developer": {"essential": ["Python", "SQL"], "preferred": ["Docker"], "nice_to_have": ["Go"]},
+    "Frontend Developer": {"essential": ["JavaScript", "CSS"], "preferred": ["React"], "nice_to_have": ["Figma"]},
+}
+CAREER_PATHS = {"Data Engineer": ["Python", "SQL", "AWS"]}
+SKILLS = ["Python", "python", "SQL", "Docker", "Go", "JavaScript", "CSS", "React", "Figma", "AWS", "Rust"]
+TARGETS = [("role", "Backend Developer"), ("role", "Frontend Developer"), ("career_path", "Data Engineer")]
+
+
+def skilled_user(rng, user_id):
+    return random_user(rng, user_id, SKILLS, max_skills=5, max_wanted=0)
+
+
+def ranking(readiness, target_type, name):
+    page, _ = readiness.top(target_type, name, limit=10 ** 6)
+    return page
+
+
+def test_scores_weigh_requirement_levels():
+    readiness = RoleReadiness(SkillVocabulary(), JOB_REQUIREMENTS, CAREER_PATHS, [
+        {"id": 1, "name": "A", "skills": ["Python", "SQL", "Docker", "Go"], "skillsWanted": []},
+        {"id": 2, "name": "B", "skills": ["python", "Go"], "skillsWanted": []},
+        {"id": 3, "name": "C", "skills": ["Rust"], "skillsWanted": []},
+    ])
+    assert readiness.total_weight("role", "Backend Developer") == 3 + 3 + 2 + 1
+    assert ranking(readiness, "role", "Backend Developer") == [(1, 9), (2, 4)]
+    assert readiness.candidate_count("role", "Backend Developer") == 2
+    assert readiness.coverage("role", "Backend Developer", 2) == (["Python", "Go"], ["SQL"])
+
+
+def test_incremental_scores_match_a_fresh_build():
+    rng = random.Random(13)
+    vocabulary = SkillVocabulary()
+    users = {user_id: skilled_user(rng, user_id) for user_id in range(15)}
+    readiness = RoleReadiness(vocabulary, JOB_REQUIREMENTS, CAREER_PATHS, users.values())
+    # Query first, so the score buckets are maintained alongside the scores
+    for target in TARGETS:
+        ranking(readiness, *target)
+
+    churn(rng, readiness, skilled_user, id_range=30, steps=400, users=users)
+
+    fresh = RoleReadiness(vocabulary, JOB_REQUIREMENTS, CAREER_PATHS, users.values())
+    for target in TARGETS:
+        assert ranking(readiness, *target) == ranking(fresh, *target)
+        assert readiness.candidate_count(*target) == fresh.candidate_count(*target)
+
+
+def test_pages_resume_after_the_last_key():
+    rng = random.Random(17)
+    readiness = RoleReadiness(SkillVocabulary(), JOB_REQUIREMENTS, CAREER_PATHS,
+                              [skilled_user(rng, user_id) for user_id in range(40)])
+    everyone = ranking(readiness, "career_path", "Data Engineer")
+
+    pages, after = [], None
+    while True:
+        page, after = readiness.top("career_path", "Data Engineer", limit=7, after=after)
+        pages.extend(page)
+        if after is None:
+            break
+    assert pages == everyone
+    assert everyone == sorted(everyone, key=lambda entry: (-entry[1], entry[0]))
@@ -0,0 +1,90 @@
+"""SkillIndex.search against the substring scan /api/search-users used to run"""
+
+import random
+
+import pytest
+
+from skill_index import SkillIndex
+
+# Skills that contain one another, so both directions of the substring match come up
+SKILLS = ["Java", "JavaScript", "java", "Script", "TypeScript", "Go", "Golang", "SQL", "NoSQL", "PostgreSQL",
+          "C", "C++", "C#", "R", "React", "React Native", "Rust", "ML", "HTML", "HTML5", "Machine Learning"]
+KEYWORDS = ["java", "javascript", "script", "go", "golang", "sql", "c", "c++", "r", "re", "react native",
+            "ml", "html", "learning", "machine learning and more", "postgresql", "x", "", "s"]
+
+
+def indexed_user(rng, user_id):
+    # Duplicates included: every listed spelling scores on its own
+    return {"id": user_id, "name": f"User {user_id}",
+            "skills": [rng.choice(SKILLS) for _ in range(rng.randint(0, 4))],
+            "skillsWanted": [rng.choice(SKILLS) for _ in range(rng.randint(0, 3))]}
+
+
+def scan(users, keywords, search_type):
+    """The original ranking: a pass over ``users`` in store order, stable sort on score"""
+    ranked = []
+    for user in users:
+        score, matched_skills, matched_wanted = 0, [], []
+        if search_type in ['skills', 'both']:
+            for skill in user['skills']:
+                for keyword in keywords:
+                    if keyword in skill.lower() or skill.lower() in keyword:
+                        score += 1
+                        matched_skills.append(skill)
+        if search_type in ['wanted', 'both']:
+            for wanted in user['skillsWanted']:
+                for keyword in keywords:
+                    if keyword in wanted.lower() or wanted.lower() in keyword:
+                        score += 0.5
+                        matched_wanted.append(wanted)
+        if score > 0:
+            ranked.append((user['id'], score, sorted(matched_skills), sorted(matched_wanted)))
+    ranked.sort(key=lambda entry: entry[1], reverse=True)
+    return ranked
+
+
+def ranked(index, positions, keywords, search_type):
+    hits = index.search(keywords, search_type)
+    order = sorted(hits, key=lambda user_id: (-hits[user_id][1], positions[user_id]))
+    return [(user_id, hits[user_id][1], sorted(hits[user_id][2]), sorted(hits[user_id][3])) for user_id in order]
+
+
+def random_keywords(rng):
+    return [rng.choice(KEYWORDS) for _ in range(rng.randint(1, 4))]
+
+
+@pytest.mark.parametrize('search_type', ['skills', 'wanted', 'both'])
+def test_search_matches_the_scan(search_type):
+    rng = random.Random(5)
+    users = [indexed_user(rng, user_id) for user_id in range(60)]
+    index = SkillIndex(users)
+    positions = {user["id"]: position for position, user in enumerate(users)}
+    for _ in range(200):
+        keywords = random_keywords(rng)
+        assert ranked(index, positions, keywords, search_type) == scan(users, keywords, search_type)
+
+
+def test_search_matches_the_scan_under_churn():
+    """Replacements keep their store position; users re-added after removal go last"""
+    rng = random.Random(11)
+    index = SkillIndex()
+    users, positions = {}, {}
+    next_position = 0
+    for _ in range(600):
+        user_id = rng.randrange(40)
+        if rng.random() < 0.25:
+            index.remove_user(user_id)
+            users.pop(user_id, None)
+            positions.pop(user_id, None)
+        else:
+            user = indexed_user(rng, user_id)
+            index.add_user(user)
+            users[user_id] = user
+            if user_id not in positions:
+                positions[user_id] = next_position
+                next_position += 1
+
+        keywords = random_keywords(rng)
+        in_store_order = sorted(users.values(), key=lambda user: positions[user["id"]])
+        assert len(index) == len(users)
+        assert ranked(index, positions, keywords, 'both') == scan(in_store_order, keywords, 'both')
@@ -0,0 +1,81 @@
+"""SkillResolver: exact and alias lookups, typo recovery and its thresholds"""
+
+import pytest
+
+from skill_index import SkillIndex
+from skill_resolver import SkillResolver
+from skill_vocabulary import SkillVocabulary
+
+SKILLS = ["Python", "JavaScript", "TypeScript", "Java", "Go", "Rust", "C++", "C#", "Ruby", "PHP", "Swift", "Kotlin",
+          "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "GraphQL", "HTML", "CSS", "React", "Angular", "Vue.js",
+          "Node.js", "Django", "Flask", "Docker", "Kubernetes", "AWS", "Google Cloud", "Azure", "Terraform", "Git",
+          "Linux", "Machine Learning", "Deep Learning", "Data Analysis", "Data Visualization", "Figma", "UI Design",
+          "Project Management", "Agile", "Scrum", "Testing", "DevOps", "Networking", "Excel", "Tableau", "Spark"]
+
+
+@pytest.fixture
+def vocabulary():
+    return SkillVocabulary(SKILLS)
+
+
+@pytest.fixture
+def resolver(vocabulary):
+    return SkillResolver(vocabulary)
+
+
+def names(vocabulary, similar):
+    return [vocabulary.name_of(skill_id) for skill_id, _ in similar]
+
+
+@pytest.mark.parametrize('query, skill', [
+    ('python', 'Python'), ('JS', 'JavaScript'), ('k8s', 'Kubernetes'), ('golang', 'Go'),
+    ('ml', 'Machine Learning'), ('Postgres', 'PostgreSQL'),
+])
+def test_exact_names_and_aliases_resolve_alone(vocabulary, resolver, query, skill):
+    assert resolver.similar(query) == [(vocabulary.id_of(skill), 1.0)]
+
+
+@pytest.mark.parametrize('query, skill', [
+    ('javscript', 'JavaScript'), ('typescrpt', 'TypeScript'), ('kubernets', 'Kubernetes'),
+    ('postgresq', 'PostgreSQL'), ('dockr', 'Docker'), ('machine learnin', 'Machine Learning'),
+    ('data analisys', 'Data Analysis'), ('htm', 'HTML'),
+])
+def test_typos_recover_the_intended_skill(vocabulary, resolver, query, skill):
+    assert names(vocabulary, resolver.similar(query)) == [skill]
+
+
+def test_thresholds(vocabulary, resolver):
+    # Nothing close enough
+    assert resolver.similar('xyzzy') == []
+    similarity = resolver.similar('reakt')[0][1]
+    assert resolver.similar('reakt', min_similarity=similarity + 0.01) == []
+    # Candidates well behind the best are cut even with no absolute floor
+    assert names(vocabulary, resolver.similar('javscript', k=5, min_similarity=0)) == ['JavaScript']
+    # Close seconds are kept, best first, up to k
+    assert names(vocabulary, resolver.similar('learning')) == ['Deep Learning', 'Machine Learning']
+    assert names(vocabulary, resolver.similar('learning', k=1)) == ['Deep Learning']
+
+
+def test_ml_never_means_html(vocabulary, resolver):
+    assert 'HTML' not in names(vocabulary, resolver.similar('ml', k=5, min_similarity=0))
+
+    # Searched in fuzzy mode, "ml" matches the skills it resolves to, not substrings of HTML
+    index = SkillIndex([
+        {"id": 1, "name": "Web", "skills": ["HTML", "CSS"], "skillsWanted": []},
+        {"id": 2, "name": "Data", "skills": ["Machine Learning"], "skillsWanted": []},
+    ])
+    terms_of = {'ml': {spelling.lower() for skill_id, _ in resolver.similar('ml')
+                       for spelling in vocabulary.spellings(skill_id)}}
+    assert set(index.search(['ml'], terms_of=terms_of)) == {2}
+
+
+def test_skills_added_later_are_resolved(vocabulary, resolver):
+    assert resolver.similar('elixer') == []
+    vocabulary.add('Elixir')
+    assert names(vocabulary, resolver.similar('elixer')) == ['Elixir']
+
+
+def test_resolve_reports_every_fuzzy_replacement(resolver):
+    resolved, resolutions = resolver.resolve(['Python', 'js', 'javscript', 'xyzzy'])
+    assert resolved == ['Python', 'js', 'JavaScript', 'xyzzy']
+    assert resolutions == {'javscript': 'JavaScript', 'xyzzy': None}
@@ -0,0 +1,81 @@
+"""SwapGraph kept up to date from MatchEngine row changes"""
+
+import itertools
+import random
+
+from conftest import churn, random_user
+from match_engine import MatchEngine
+from skill_vocabulary import SkillVocabulary
+from swap_graph import SwapGraph
+
+SKILLS = ["Python", "python", "JavaScript", "React", "SQL", "Go", "Rust", "Docker", "AWS", "CSS", "Figma"]
+
+
+def swap_user(rng, user_id):
+    return random_user(rng, user_id, SKILLS)
+
+
+def churned_graph(seed, steps=300):
+    """A graph built incrementally through adds, replacements and removals"""
+    rng = random.Random(seed)
+    vocabulary = SkillVocabulary(SKILLS)
+    engine = MatchEngine(vocabulary, [swap_user(rng, user_id) for user_id in range(20)])
+    graph = SwapGraph(engine)
+    churn(rng, engine, swap_user, id_range=40, steps=steps)
+    return vocabulary, engine, graph
+
+
+def test_incremental_graph_matches_a_fresh_build():
+    vocabulary, engine, graph = churned_graph(seed=3)
+    users = [{"id": user_id,
+              "name": "",
+              "skills": [vocabulary.name_of(skill_id) for skill_id in engine.row(user_id)[0]],
+              "skillsWanted": [vocabulary.name_of(skill_id) for skill_id in engine.row(user_id)[1]]}
+             for user_id in engine]
+    fresh = SwapGraph(MatchEngine(vocabulary, users))
+
+    assert graph._pairs == fresh._pairs
+    for user_id in engine:
+        assert graph.reciprocal_pairs(user_id, limit=50) == fresh.reciprocal_pairs(user_id, limit=50)
+        assert (set(graph.swap_cycles(user_id, 3, limit=10 ** 6, beam=10 ** 6))
+                == set(fresh.swap_cycles(user_id, 3, limit=10 ** 6, beam=10 ** 6)))
+
+
+def test_reciprocal_pairs_match_brute_force():
+    _, engine, graph = churned_graph(seed=5)
+    for user_id in engine:
+        expected = {
+            other for other in engine
+            if other != user_id and graph.teaches(user_id, other) and graph.teaches(other, user_id)
+        }
+        found = {cycle.members[1] for cycle in graph.reciprocal_pairs(user_id, limit=10 ** 6)}
+        assert found == expected
+
+
+def test_three_cycles_match_brute_force():
+    _, engine, graph = churned_graph(seed=11)
+    for user_id in engine:
+        expected = set()
+        for learner, teacher in itertools.permutations(set(engine) - {user_id}, 2):
+            if (graph.teaches(user_id, learner) and graph.teaches(learner, teacher)
+                    and graph.teaches(teacher, user_id)):
+                expected.add((user_id, learner, teacher))
+        found = {cycle.members for cycle in graph.swap_cycles(user_id, 3, limit=10 ** 6, beam=10 ** 6)}
+        assert found == expected
+
+
+def test_cycles_are_ranked_by_bottleneck_then_length():
+    vocabulary = SkillVocabulary()
+    engine = MatchEngine(vocabulary, [
+        {"id": 1, "name": "A", "skills": ["Python", "SQL"], "skillsWanted": ["Go", "Rust"]},
+        {"id": 2, "name": "B", "skills": ["Go", "Rust"], "skillsWanted": ["Python", "SQL"]},
+        {"id": 3, "name": "C", "skills": ["Go"], "skillsWanted": ["Python"]},
+    ])
+    graph = SwapGraph(engine)
+    pairs = graph.reciprocal_pairs(1)
+    assert [cycle.members for cycle in pairs] == [(1, 2), (1, 3)]
+    assert [cycle.bottleneck for cycle in pairs] == [2, 1]
+
+    engine.remove_user(2)
+    assert [cycle.members for cycle in graph.reciprocal_pairs(1)] == [(1, 3)]
+    assert graph.reciprocal_pairs(2) == []
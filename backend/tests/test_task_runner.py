@@ -0,0 +1,76 @@
+"""TaskRunner result slots, timeouts and pool modes"""
+
+import threading
+import time
+
+import pytest
+
+from task_runner import TaskRunner
+
+
+def square(value):
+    if value < 0:
+        raise ValueError(f"negative: {value}")
+    return value * value
+
+
+@pytest.fixture
+def release():
+    """Event the slow calls wait on; set at teardown so no pool thread is left blocked"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.mark.parametrize('mode', ['serial', 'thread', 'process'])
+def test_map_keeps_input_order_and_reports_errors(mode):
+    runner = TaskRunner(mode=mode, workers=2)
+    try:
+        results = runner.map(square, [(3,), (-1,), (4,)], timeout=10)
+    finally:
+        runner.shutdown()
+    assert [result.status for result in results] == ['ok', 'error', 'ok']
+    assert [result.value for result in results] == [9, None, 16]
+    assert results[1].error == "negative: -1"
+
+
+def test_map_times_out_slow_calls_only(release):
+    runner = TaskRunner(mode='thread', workers=4)
+    results = runner.map(lambda slow: release.wait(5) if slow else 'done', [(False,), (True,), (False,)], timeout=0.2)
+    runner.shutdown()
+    assert [result.status for result in results] == ['ok', 'timeout', 'ok']
+    assert results[1].error.startswith("Timed out after")
+
+
+def test_map_gives_queued_calls_their_own_timeout():
+    # Two waves of 0.15s calls on two workers: the second wave starts after the
+    # first call's timeout but still gets a full one of its own
+    runner = TaskRunner(mode='thread', workers=2)
+    results = runner.map(time.sleep, [(0.15,)] * 4, timeout=0.25)
+    runner.shutdown()
+    assert [result.status for result in results] == ['ok'] * 4
+
+
+def test_as_completed_yields_fast_calls_first_and_times_out_the_rest(release):
+    runner = TaskRunner(mode='thread', workers=4)
+    calls = {'slow': (release.wait, (5,)), 'fast': (square, (2,)), 'broken': (square, (-2,))}
+    results = list(runner.as_completed(calls, timeout=0.2))
+    runner.shutdown()
+    assert [key for key, _ in results][-1] == 'slow'
+    results = dict(results)
+    assert results['fast'].value == 4
+    assert results['broken'].status == 'error'
+    assert results['slow'].status == 'timeout'
+
+
+def test_serial_as_completed_skips_calls_past_the_deadline():
+    runner = TaskRunner(mode='serial')
+    calls = {'first': (time.sleep, (0.1,)), 'second': (square, (2,))}
+    results = dict(runner.as_completed(calls, timeout=0.05))
+    assert results['first'].status == 'ok'
+    assert results['second'].status == 'timeout'
+
+
+def test_unknown_modes_are_rejected():
+    with pytest.raises(ValueError):
+        TaskRunner(mode='fiber')
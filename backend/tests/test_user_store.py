@@ -0,0 +1,121 @@
+"""UserStore log persistence, replay, and sharing one log between processes"""
+
+import multiprocessing
+
+import pytest
+
+import user_store
+from user_store import UserStore
+
+SEED = [{"id": 1, "name": "Alice", "skills": ["Python"], "skillsWanted": ["Go"]},
+        {"id": 2, "name": "Bob", "skills": ["Go"], "skillsWanted": []}]
+
+
+class Recorder:
+    """Store listener remembering what it was told"""
+
+    def __init__(self):
+        self.added, self.removed = [], []
+
+    def add_user(self, user):
+        self.added.append(user.id)
+
+    def remove_user(self, user_id):
+        self.removed.append(user_id)
+
+
+def snapshot(store):
+    return [(user.to_dict(), store.position(user.id)) for user in store]
+
+
+def add_users(log_path, name, count):
+    store = UserStore(SEED, log_path=log_path)
+    for index in range(count):
+        store.add(f"{name} {index}", ["Rust"], [])
+    store.close()
+
+
+def test_writes_survive_a_restart(tmp_path):
+    log_path = str(tmp_path / 'users.jsonl')
+    store = UserStore(SEED, log_path=log_path)
+    carol = store.add("Carol", ["SQL"], ["Python"])
+    store.apply_changes([
+        {"op": "put", "external_id": "x-1", "name": "Dave", "skills": ["Go"], "skillsWanted": []},
+        {"op": "put", "external_id": "x-2", "name": "Erin", "skills": [], "skillsWanted": ["SQL"]},
+    ])
+    store.apply_changes([
+        {"op": "put", "external_id": "x-1", "name": "Dave", "skills": ["Go", "Rust"], "skillsWanted": []},
+        {"op": "delete", "external_id": "x-2"},
+    ])
+    store.close()
+
+    replayed = UserStore(SEED, log_path=log_path)
+    assert snapshot(replayed) == snapshot(store)
+    assert replayed.get(carol.id)["skillsWanted"] == ["Python"]
+    # Ids keep counting past the replayed ones, deleted ones included
+    assert replayed.add("Fay", [], []).id == 6
+    # External ids still resolve to the same store ids after a restart
+    replayed.apply_changes([{"op": "delete", "external_id": "x-1"}])
+    assert [user["name"] for user in replayed] == ["Alice", "Bob", "Carol", "Fay"]
+
+
+def test_a_torn_tail_is_skipped_and_terminated(tmp_path):
+    log_path = tmp_path / 'users.jsonl'
+    UserStore(SEED, log_path=str(log_path)).add("Carol", [], [])
+    with open(log_path, 'ab') as log:
+        log.write(b'{"op": "put", "user": {"id": 9')
+
+    store = UserStore(SEED, log_path=str(log_path))
+    assert len(store) == 3
+    store.add("Dave", [], [])
+    store.close()
+    assert [user["name"] for user in UserStore(SEED, log_path=str(log_path))] == ["Alice", "Bob", "Carol", "Dave"]
+
+
+def test_writers_catch_up_on_each_others_records(tmp_path):
+    log_path = str(tmp_path / 'users.jsonl')
+    first, second = UserStore(SEED, log_path=log_path), UserStore(SEED, log_path=log_path)
+    listener = Recorder()
+    second.subscribe(listener)
+
+    carol = first.add("Carol", [], [])
+    # The second writer sees Carol before picking an id, so never reuses hers
+    dave = second.add("Dave", [], [])
+    assert (carol.id, dave.id) == (3, 4)
+    assert second.get(carol.id)["name"] == "Carol"
+    assert listener.added == [carol.id, dave.id]
+
+
+def test_refresh_applies_other_processes_records(tmp_path):
+    log_path = str(tmp_path / 'users.jsonl')
+    writer, reader = UserStore(SEED, log_path=log_path), UserStore(SEED, log_path=log_path)
+    listener = Recorder()
+    reader.subscribe(listener)
+    assert reader.refresh() == 0
+
+    carol = writer.add("Carol", [], [])
+    writer.apply_changes([{"op": "put", "external_id": "x-1", "name": "Dave", "skills": [], "skillsWanted": []}])
+    writer.apply_changes([{"op": "delete", "external_id": "x-1"}])
+    assert reader.refresh() == 3
+    assert snapshot(reader) == snapshot(writer)
+    assert listener.added == [carol.id, carol.id + 1]
+    assert listener.removed == [carol.id + 1]
+    assert reader.refresh() == 0
+    assert reader.log_offset == writer.log_offset
+
+
+@pytest.mark.skipif(user_store.fcntl is None, reason="needs flock")
+def test_concurrent_processes_never_share_an_id(tmp_path):
+    log_path = str(tmp_path / 'users.jsonl')
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=add_users, args=(log_path, f"Worker {worker}", 25)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    store = UserStore(SEED, log_path=log_path)
+    ids = [user.id for user in store]
+    assert len(ids) == len(set(ids)) == len(SEED) + 100
+    assert sorted(ids) == list(range(1, len(SEED) + 101))
@@ -0,0 +1,122 @@
+"""UserTable rows, superseded rows and compaction"""
+
+import random
+import sys
+import threading
+
+import user_table
+from user_store import UserStore
+from user_table import UserTable
+
+
+def user(user_id, name, skills, skills_wanted=()):
+    return {"id": user_id, "name": name, "skills": list(skills), "skillsWanted": list(skills_wanted)}
+
+
+def test_rows_read_back_as_dicts():
+    table = UserTable()
+    table.append(user(1, "Ada", ["Python", "SQL"], ["Rust"]))
+    row = table.get(1)
+    assert row.to_dict() == user(1, "Ada", ["Python", "SQL"], ["Rust"])
+    assert row["skills"] == ["Python", "SQL"]
+    assert table.get(2) is None
+    assert 1 in table and len(table) == 1
+
+
+def test_rows_handed_out_outlive_writes_and_compaction():
+    table = UserTable()
+    old = table.append(user(1, "Ada", ["Python"]))
+    table.append(user(1, "Ada", ["Go"]))
+    table.remove(1)
+    table.compact()
+    # The reclaimed slot now holds someone else
+    table.append(user(2, "Bo", ["Rust"], ["SQL"]))
+    assert old.to_dict() == user(1, "Ada", ["Python"])
+    assert table.get(2).to_dict() == user(2, "Bo", ["Rust"], ["SQL"])
+    assert len(table) == 1
+
+
+def test_remove_forgets_the_user():
+    table = UserTable()
+    table.append(user(1, "Ada", ["Python"]))
+    table.remove(1)
+    table.remove(1)
+    assert table.get(1) is None and len(table) == 0
+
+
+def test_compact_reuses_rows_and_drops_unused_spellings():
+    table = UserTable()
+    for user_id in range(10):
+        table.append(user(user_id, f"User {user_id}", [f"Skill {user_id}"], ["Shared"]))
+    for user_id in range(5):
+        table.remove(user_id)
+    table.compact()
+
+    assert sorted(table._spellings) == sorted(["Shared"] + [f"Skill {i}" for i in range(5, 10)])
+    for user_id in range(5, 10):
+        assert table.get(user_id).to_dict() == user(user_id, f"User {user_id}", [f"Skill {user_id}"], ["Shared"])
+
+    rows_before = len(table._ids)
+    table.append(user(20, "New", ["Skill 20"]))
+    assert len(table._ids) == rows_before
+    assert table.get(20).skills == ["Skill 20"]
+
+
+def test_automatic_compaction_keeps_the_live_rows(monkeypatch):
+    monkeypatch.setattr(user_table, "COMPACT_MIN_DEAD_ROWS", 8)
+    rng = random.Random(7)
+    skills = [f"Skill {index}" for index in range(30)]
+    table = UserTable()
+    expected = {}
+    for step in range(2000):
+        user_id = rng.randrange(40)
+        if rng.random() < 0.2:
+            table.remove(user_id)
+            expected.pop(user_id, None)
+        else:
+            entry = user(user_id, f"User {step}", rng.sample(skills, 3), rng.sample(skills, 2))
+            table.append(entry)
+            expected[user_id] = entry
+
+    assert len(table) == len(expected)
+    for user_id, entry in expected.items():
+        assert table.get(user_id).to_dict() == entry
+    # Rows are reused rather than growing with every write
+    assert len(table._ids) < 200
+
+
+def test_reads_stay_consistent_under_concurrent_writes(monkeypatch):
+    monkeypatch.setattr(user_table, "COMPACT_MIN_DEAD_ROWS", 4)
+    skills = [f"Skill {index}" for index in range(20)]
+    store = UserStore([user(user_id, "1", skills[:1], skills[:1]) for user_id in range(1, 21)])
+    done = threading.Event()
+    torn = []
+
+    def write():
+        rng = random.Random(3)
+        for _ in range(3000):
+            count = rng.randint(0, 6)
+            # The name says how many skills the row lists
+            store.apply_changes([{"op": "put", "external_id": rng.randrange(30), "name": str(count),
+                                  "skills": skills[:count], "skillsWanted": skills[:count]}])
+        done.set()
+
+    def read():
+        while not done.is_set():
+            for row in store:
+                entry = row.to_dict()
+                if entry["skills"] != skills[:int(entry["name"])] or entry["skillsWanted"] != entry["skills"]:
+                    torn.append(entry)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(2)]
+    # Switch threads often, so reads land in the middle of writes and compactions
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert torn == []
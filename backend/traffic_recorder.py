@@ -0,0 +1,51 @@
+"""
+Records served requests as JSON lines for later replay.
+
+Each line holds the method, path (with query string), JSON body and matched
+route of one request, which is the format benchmarks/replay.py reads:
+
+    {"ts": 1700000000.123, "method": "POST", "path": "/api/matches",
+     "route": "/api/matches", "body": {...}, "status": 200}
+
+A sample rate below 1 keeps a random fraction of requests.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+
+class TrafficRecorder:
+    """Appends a sample of requests to a JSON-lines file"""
+
+    def __init__(self, path, sample_rate=1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._file = None
+
+    def record(self, method, path, route, body, status):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        line = json.dumps({
+            "ts": round(time.time(), 3),
+            "method": method,
+            "path": path,
+            "route": route,
+            "body": body,
+            "status": status
+        }, separators=(',', ':')) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,10 +1,20 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
+import heapq
+import hmac
+import importlib
+import inspect
+import itertools
 import json
+import sys
+import time
 import urllib.parse
 
 # Import all the original modules
-from skill_matcher import find_skill_matches, fallback_matching, USERS_DATABASE
+import skill_matcher
+import skill_recommender
+import skill_gap_analyzer
+from skill_matcher import USERS_DATABASE
 from skill_recommender import (
     get_skill_recommendations, 
     get_fallback_recommendations,
@@ -17,10 +27,442 @@ from skill_gap_analyzer import (
     get_fallback_analysis,
     JOB_REQUIREMENTS
 )
+from skill_index import SkillIndex
+from skill_vocabulary import build_vocabulary, add_catalog_skills
+from role_matrix import RoleMatrix
+from match_engine import MatchEngine
+from swap_graph import SwapGraph, MAX_CYCLE_LENGTH, describe_cycle
+from skill_resolver import SkillResolver, MATCH_MODES
+from role_readiness import RoleReadiness
+from autocomplete import Autocomplete, MAX_COMPLETIONS
+from change_log import ChangeLogIngester
+from user_store import UserStore
+from user_table import UserTable
+from pagination import encode_cursor, decode_cursor, parse_limit, select_page
+from projection import request_projection
+from compression import compress_response
+from response_cache import ResponseCache
+from memo_cache import MemoCache
+from task_runner import TaskRunner
+from streaming import wants_ndjson, ndjson_response
+from batch import run_batch
+import index_snapshot
+from traffic_recorder import TrafficRecorder
+from json_provider import FastJSONProvider
+from metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE, SIZE_BUCKETS
+import api_config
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
+def _compile_catalogs():
+    """Resolve the catalog datasets to vocabulary ids"""
+    global CATEGORY_SKILL_IDS, CAREER_PATH_SKILL_IDS, role_matrix
+    
+    add_catalog_skills(skill_vocabulary, SKILL_CATEGORIES, CAREER_PATHS, JOB_REQUIREMENTS, TRENDING_SKILLS)
+    CATEGORY_SKILL_IDS = {
+        category: skill_vocabulary.resolve(skills)
+        for category, skills in SKILL_CATEGORIES.items()
+    }
+    CAREER_PATH_SKILL_IDS = {
+        career: skill_vocabulary.ids(skills)
+        for career, skills in CAREER_PATHS.items()
+    }
+    role_matrix = RoleMatrix(skill_vocabulary, JOB_REQUIREMENTS)
+
+def _build_indexes():
+    """Build the user store and every index derived from the datasets"""
+    global user_store, skill_index, skill_vocabulary, match_engine, swap_graph, role_readiness
+    global autocomplete
+    
+    # Seed users plus every user added through /api/add-user
+    user_store = UserStore(USERS_DATABASE, api_config.USER_LOG_PATH)
+    
+    # Inverted index over users' skills, used by the keyword search endpoints
+    skill_index = SkillIndex(user_store)
+    
+    # Canonical skill ids shared by the matcher, recommender and gap analyzer
+    skill_vocabulary = build_vocabulary(
+        user_store, SKILL_CATEGORIES, CAREER_PATHS, JOB_REQUIREMENTS, TRENDING_SKILLS
+    )
+    _compile_catalogs()
+    
+    # Offered/wanted skill columns of every user
+    match_engine = MatchEngine(skill_vocabulary, user_store)
+    
+    # Can-teach graph behind /api/swaps, kept current by the match engine
+    swap_graph = SwapGraph(match_engine)
+    
+    # Per-role / career path requirement coverage of every user, behind /api/ready-users
+    role_readiness = RoleReadiness(skill_vocabulary, JOB_REQUIREMENTS, CAREER_PATHS, user_store)
+    
+    # Prefix tries over skill and user names behind /api/autocomplete
+    autocomplete = Autocomplete(skill_vocabulary, TRENDING_SKILLS, user_store)
+
+# Module globals saved in (and restored from) the index snapshot
+SNAPSHOT_STATE = (
+    'user_store', 'skill_index', 'skill_vocabulary', 'match_engine', 'swap_graph', 'role_readiness',
+    'autocomplete',
+    'CATEGORY_SKILL_IDS', 'CAREER_PATH_SKILL_IDS', 'role_matrix'
+)
+
+def _snapshot_fingerprint():
+    """Digest of the datasets and code the indexes are built from"""
+    sources = [
+        inspect.getsourcefile(source)
+        for source in (skill_matcher, skill_recommender, skill_gap_analyzer,
+                       UserStore, UserTable, SkillIndex, build_vocabulary, RoleMatrix, MatchEngine,
+                       SwapGraph, RoleReadiness, Autocomplete)
+    ]
+    sources.append(__file__)
+    return index_snapshot.fingerprint(
+        sources,
+        settings=(api_config.USER_LOG_PATH, sys.version_info[:2]),
+        datasets=(USERS_DATABASE, SKILL_CATEGORIES, CAREER_PATHS, TRENDING_SKILLS, JOB_REQUIREMENTS)
+    )
+
+def _load_indexes():
+    """Restore the indexes from the snapshot, or build them and write a fresh one"""
+    if not api_config.SNAPSHOT_PATH:
+        _build_indexes()
+        return
+    
+    fingerprint = _snapshot_fingerprint()
+    try:
+        state = index_snapshot.load(api_config.SNAPSHOT_PATH, fingerprint)
+    except Exception as e:
+        app.logger.warning("Index snapshot not used (%s); rebuilding", e)
+        state = None
+    if state is not None:
+        globals().update(state)
+        return
+    
+    _build_indexes()
+    appended_files = {api_config.USER_LOG_PATH: user_store.log_offset} if api_config.USER_LOG_PATH else {}
+    try:
+        index_snapshot.save(
+            api_config.SNAPSHOT_PATH, fingerprint,
+            {name: globals()[name] for name in SNAPSHOT_STATE}, appended_files
+        )
+    except OSError as e:
+        app.logger.error("Could not write index snapshot: %s", e)
+
+_load_indexes()
+DEFAULT_SWAP_LIMIT = 10
+DEFAULT_READY_LIMIT = 20
+AUTOCOMPLETE_TYPES = ('skills', 'users', 'all')
+
+# Keep the derived indexes in step with writes to the store
+user_store.subscribe(skill_index)
+user_store.subscribe(match_engine)
+user_store.subscribe(role_readiness)
+user_store.subscribe(autocomplete)
+# Users logged after the snapshot was taken
+user_store.refresh()
+
+# User changes from the Node backend. The applied offset is only saved when the
+# users it produced are persisted too (SKILLS_API_USER_LOG)
+change_log_ingester = ChangeLogIngester(
+    user_store,
+    api_config.CHANGE_LOG_PATH,
+    api_config.INGEST_STATE_PATH if api_config.USER_LOG_PATH else None,
+    api_config.INGEST_INTERVAL,
+    api_config.INGEST_BATCH_EVENTS
+) if api_config.CHANGE_LOG_PATH else None
+if change_log_ingester is not None:
+    # Caught up before serving; requests then apply one bounded batch each
+    change_log_ingester.drain()
+
+# Fuzzy skill lookups for match_mode=fuzzy; follows the vocabulary as it grows
+skill_resolver = SkillResolver(skill_vocabulary)
+
+# Serialized bodies of the read-only catalog endpoints
+catalog_cache = ResponseCache(max_age=api_config.CATALOG_CACHE_MAX_AGE)
+
+# Gap analyses and recommendations, keyed by the request profile, with their
+# JSON encodings for splicing into responses
+analysis_cache = MemoCache(
+    max_entries=api_config.MEMO_MAX_ENTRIES,
+    max_bytes=api_config.MEMO_MAX_BYTES,
+    ttl=api_config.MEMO_TTL,
+    encode=app.json.fragment
+)
+
+def find_user_matches(user_skills, desired_skills):
+    """Every match for a requester, as skill_matcher.find_skill_matches lists them, over the user store"""
+    return match_engine.find_matches(user_skills, desired_skills)[0]
+
+def check_match_mode(match_mode):
+    """``match_mode``, defaulting to 'exact'; raises ValueError if unknown"""
+    match_mode = match_mode or 'exact'
+    if match_mode not in MATCH_MODES:
+        raise ValueError(f"match_mode must be one of: {', '.join(MATCH_MODES)}")
+    return match_mode
+
+def request_match_mode(data=None):
+    """'exact' (default) or 'fuzzy', from the query string or the JSON body ``data``"""
+    match_mode = request.args.get('match_mode')
+    if match_mode is None and data:
+        match_mode = data.get('match_mode')
+    return check_match_mode(match_mode)
+
+def check_skill_lists(data, keys):
+    """Raise ValueError unless each of ``data[key]`` that is given is a list of strings"""
+    for key in keys:
+        skills = data.get(key)
+        if skills is not None and (not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills)):
+            raise ValueError(f"{key} must be a list of strings")
+
+def resolve_skill_lists(data, keys, match_mode):
+    """
+    Check the skill lists ``data[key]`` and, in fuzzy ``match_mode``, replace
+    each in place with the closest known skills. Returns ``{original:
+    resolved or None}`` for the names that were not exact or alias matches,
+    or None in exact mode; raises ValueError for an unknown mode or a value
+    that is not a list of strings.
+    """
+    check_skill_lists(data, keys)
+    if check_match_mode(match_mode) == 'exact':
+        return None
+    resolutions = {}
+    for key in keys:
+        skills = data.get(key)
+        if skills is not None:
+            data[key], resolved = skill_resolver.resolve(skills, api_config.FUZZY_MIN_SIMILARITY)
+            resolutions.update(resolved)
+    return resolutions
+
+def resolve_request_skills(data, *keys):
+    """resolve_skill_lists() in the match_mode the request asks for"""
+    return resolve_skill_lists(data, keys, request_match_mode(data))
+
+def resolve_keywords(keywords):
+    """
+    Fuzzy resolution of lowercase search keywords: ``(resolved, terms_of)``,
+    the known skills each keyword resolved to, with their similarity, and
+    the lowercase spellings of those skills to look up in the skill index
+    """
+    resolved = {}
+    terms_of = {}
+    for keyword in keywords:
+        if keyword in terms_of:
+            continue
+        similar = skill_resolver.similar(keyword, api_config.FUZZY_TOP_K, api_config.FUZZY_MIN_SIMILARITY)
+        resolved[keyword] = [
+            {"skill": skill_vocabulary.name_of(skill_id), "similarity": similarity}
+            for skill_id, similarity in similar
+        ]
+        terms_of[keyword] = {
+            spelling.lower() for skill_id, _ in similar for spelling in skill_vocabulary.spellings(skill_id)
+        }
+    return resolved, terms_of
+
+def resolution_fields(resolutions, name='resolved_skills'):
+    """Response fields reporting fuzzy resolutions; none in exact mode"""
+    return {} if resolutions is None else {name: resolutions}
+
+def analyze_profile(profile):
+    """Gap analysis, recommendations and matches for one batch profile"""
+    resolutions = resolve_skill_lists(
+        profile, ('current_skills', 'desired_skills'), profile.get('match_mode')
+    )
+    current_skills = profile.get('current_skills', [])
+    target_role = profile.get('target_role')
+    career_goal = profile.get('career_goal')
+    experience_level = profile.get('experience_level', 'intermediate')
+    desired_skills = profile.get('desired_skills', [])
+    
+    if not current_skills:
+        raise ValueError("current_skills is required")
+    
+    results = {}
+    if target_role:
+        results['gap_analysis'] = cached_skill_gaps(current_skills, target_role)
+    results['recommendations'] = cached_skill_recommendations(current_skills, career_goal, experience_level)
+    if desired_skills:
+        results['skill_matches'] = find_user_matches(current_skills, desired_skills)
+    results.update(resolution_fields(resolutions))
+    return results
+
+if api_config.EXECUTOR_MODE == 'process' and api_config.MEMO_MAX_ENTRIES:
+    # Results memoized in pool processes are never seen by this one
+    raise ValueError("SKILLS_API_EXECUTOR_MODE=process needs the memo cache off (SKILLS_API_MEMO_MAX_ENTRIES=0)")
+
+# Executes fanned-out analyses (/api/compare-roles, /api/comprehensive-analysis)
+analysis_runner = TaskRunner(mode=api_config.EXECUTOR_MODE, workers=api_config.EXECUTOR_WORKERS)
+# /api/batch gets a pool of its own, so a large batch only queues behind other batches
+batch_runner = TaskRunner(mode=api_config.EXECUTOR_MODE, workers=api_config.BATCH_WORKERS)
+
+def _readiness_value(readiness):
+    """Numeric overall readiness of a gap analysis ('NN%' -> NN)"""
+    return int(readiness.replace('%', ''))
+
+def _gap_summary(analysis):
+    """The fields of a gap analysis that role listings repeat"""
+    return {
+        "readiness": analysis.get('overall_readiness', '0%'),
+        "readiness_level": analysis.get('readiness_level', 'Unknown'),
+        "critical_gaps_count": len(analysis.get('critical_gaps', [])),
+        "matching_skills_count": len(analysis.get('matching_skills', []))
+    }
+
+def cached_skill_gaps(current_skills, role, encoded=False):
+    """
+    analyze_skill_gaps() memoized on the skills as given and the role; with
+    ``encoded``, only its RawJSON fragment, which costs no copy
+    """
+    # Keyed on the exact list: spelling and order show up in the analysis
+    key = ('skill_gaps', tuple(current_skills), role)
+    compute = lambda: analyze_skill_gaps(current_skills, role)
+    if encoded:
+        return analysis_cache.get_or_compute_encoded(key, compute)
+    return analysis_cache.get_or_compute(key, compute)
+
+def cached_gap_summary(current_skills, role):
+    """``(_gap_summary, RawJSON fragment)`` of the memoized analyze_skill_gaps()"""
+    return analysis_cache.get_or_compute_summary(
+        ('skill_gaps', tuple(current_skills), role),
+        lambda: analyze_skill_gaps(current_skills, role),
+        _gap_summary
+    )
+
+def cached_skill_recommendations(current_skills, career_goal, experience_level):
+    """get_skill_recommendations() memoized on the skills as given, goal and level"""
+    return analysis_cache.get_or_compute(
+        ('recommendations', tuple(current_skills), career_goal, experience_level),
+        lambda: get_skill_recommendations(current_skills, career_goal, experience_level)
+    )
+
+def reload_datasets():
+    """Re-import the recommender and gap analyzer datasets and rebuild what derives from them"""
+    global get_skill_recommendations, get_fallback_recommendations
+    global SKILL_CATEGORIES, CAREER_PATHS, TRENDING_SKILLS
+    global analyze_skill_gaps, get_fallback_analysis, JOB_REQUIREMENTS
+    
+    recommender = importlib.reload(skill_recommender)
+    get_skill_recommendations = recommender.get_skill_recommendations
+    get_fallback_recommendations = recommender.get_fallback_recommendations
+    SKILL_CATEGORIES = recommender.SKILL_CATEGORIES
+    CAREER_PATHS = recommender.CAREER_PATHS
+    TRENDING_SKILLS = recommender.TRENDING_SKILLS
+    
+    gap_analyzer = importlib.reload(skill_gap_analyzer)
+    analyze_skill_gaps = gap_analyzer.analyze_skill_gaps
+    get_fallback_analysis = gap_analyzer.get_fallback_analysis
+    JOB_REQUIREMENTS = gap_analyzer.JOB_REQUIREMENTS
+    
+    _compile_catalogs()
+    role_readiness.set_targets(JOB_REQUIREMENTS, CAREER_PATHS)
+    autocomplete.set_catalog(TRENDING_SKILLS)
+    catalog_cache.invalidate()
+    analysis_cache.invalidate()
+
+# Per-route request metrics and per-stage handler timings, exported on /metrics
+metrics_registry = MetricsRegistry()
+REQUESTS = metrics_registry.counter(
+    'skills_api_requests_total', 'Requests handled', ('route', 'method', 'status'))
+REQUEST_ERRORS = metrics_registry.counter(
+    'skills_api_request_errors_total', 'Requests answered with a 4xx or 5xx status', ('route', 'method', 'status'))
+REQUEST_SECONDS = metrics_registry.histogram(
+    'skills_api_request_duration_seconds', 'Time until the response object was ready', ('route', 'method'))
+RESPONSE_BYTES = metrics_registry.histogram(
+    'skills_api_response_size_bytes', 'Response body size (unstreamed responses)', ('route',), SIZE_BUCKETS)
+STAGE_SECONDS = metrics_registry.histogram(
+    'skills_api_stage_duration_seconds', 'Time spent in each stage of a handler', ('handler', 'stage'))
+
+@metrics_registry.collector
+def collect_cache_metrics():
+    """Cache counters and table sizes, read at scrape time"""
+    analyses = analysis_cache.stats()
+    caches = {
+        'catalog_responses': (catalog_cache.hits, catalog_cache.misses, len(catalog_cache)),
+        'analyses': (analyses['hits'], analyses['misses'], analyses['entries'])
+    }
+    yield ('skills_api_cache_hits_total', 'counter', 'Lookups answered from a cache',
+           [({'cache': name}, hits) for name, (hits, _, _) in caches.items()])
+    yield ('skills_api_cache_misses_total', 'counter', 'Lookups that had to compute',
+           [({'cache': name}, misses) for name, (_, misses, _) in caches.items()])
+    yield ('skills_api_cache_entries', 'gauge', 'Entries currently cached',
+           [({'cache': name}, entries) for name, (_, _, entries) in caches.items()])
+    yield ('skills_api_cache_evictions_total', 'counter', 'Entries dropped to stay within limits',
+           [({'cache': 'analyses'}, analyses['evictions'])])
+    yield ('skills_api_users', 'gauge', 'Users in the store', [({}, len(user_store))])
+
+@metrics_registry.collector
+def collect_ingestion_metrics():
+    """Change log position and lag, read at scrape time"""
+    if change_log_ingester is None:
+        return
+    lag = change_log_ingester.lag()
+    yield ('skills_api_ingest_pending_bytes', 'gauge', 'Change log bytes not applied yet',
+           [({}, lag['pending_bytes'])])
+    if lag['lag_seconds'] is not None:
+        yield ('skills_api_ingest_lag_seconds', 'gauge', 'Age of the oldest change log event not applied yet',
+               [({}, lag['lag_seconds'])])
+    yield ('skills_api_ingest_events_total', 'counter', 'Change log events read',
+           [({'result': 'applied'}, lag['events_applied']), ({'result': 'skipped'}, lag['events_skipped'])])
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and observe its latency and size"""
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    status = str(response.status_code)
+    REQUESTS.inc(route, request.method, status)
+    if response.status_code >= 400:
+        REQUEST_ERRORS.inc(route, request.method, status)
+    started = g.get('request_started')
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method)
+    if not response.is_streamed and response.content_length is not None:
+        RESPONSE_BYTES.observe(response.content_length, route)
+    # Under serve.py, shares the numbers with the other workers
+    metrics_registry.maybe_flush()
+    return response
+
+# Optional capture of served requests, replayable with benchmarks/replay.py
+traffic_recorder = (
+    TrafficRecorder(api_config.TRAFFIC_LOG_PATH, api_config.TRAFFIC_SAMPLE_RATE)
+    if api_config.TRAFFIC_LOG_PATH else None
+)
+
+@app.after_request
+def record_traffic(response):
+    if traffic_recorder is not None and request.url_rule is not None:
+        # A body the response is still reading (see batch_analysis) must not be consumed here
+        body = None if g.get('streams_request_body') else request.get_json(silent=True)
+        traffic_recorder.record(
+            request.method,
+            request.full_path.rstrip('?'),
+            request.url_rule.rule,
+            body,
+            response.status_code
+        )
+    return response
+
+@app.after_request
+def compress_large_response(response):
+    """Compress large bodies for clients that accept it; runs before the size is observed"""
+    if api_config.COMPRESS_MIN_BYTES > 0:
+        compress_response(response, api_config.COMPRESS_MIN_BYTES)
+    return response
+
+@app.before_request
+def refresh_user_store():
+    """Pick up users that other server processes appended to the shared log, then new change log events"""
+    user_store.refresh()
+    if change_log_ingester is not None:
+        try:
+            with STAGE_SECONDS.time('refresh_user_store', 'ingest'):
+                change_log_ingester.poll_if_due()
+        except Exception as e:
+            # Serving carries on; the events are retried on the next poll
+            app.logger.exception("Change log ingestion failed: %s", e)
+
 # ============================================================================
 # HEALTH & STATUS ENDPOINTS
 # ============================================================================
@@ -38,10 +480,15 @@ def health_check():
         }
     })
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, stage and cache metrics in the Prometheus text format"""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/status', methods=['GET'])
 def api_status():
     """Detailed API status and capabilities"""
-    return jsonify({
+    return catalog_cache.respond('status', lambda: {
         "success": True,
         "api_name": "Unified Skills API",
         "version": "1.0.0",
@@ -56,14 +503,22 @@ def api_status():
             },
             "skill_gap_analysis": {
                 "description": "Analyze skill gaps for any role",
-                "endpoints": ["/api/analyze", "/api/roles", "/api/role/<name>", "/api/compare-roles", "/api/skills-overview"]
+                "endpoints": ["/api/analyze", "/api/roles", "/api/role/<name>", "/api/compare-roles", "/api/skills-overview", "/api/ready-users"]
             },
             "skill_swapper": {
                 "description": "Keyword-based user search and ranking for Skill Swapper platform",
-                "endpoints": ["/api/search-users", "/api/browse-users"]
+                "endpoints": ["/api/search-users", "/api/browse-users", "/api/swaps/<id>", "/api/autocomplete"]
+            },
+            "batch_analysis": {
+                "description": "Comprehensive analysis of JSON-lines profile streams",
+                "endpoints": ["/api/batch"]
+            },
+            "monitoring": {
+                "description": "Prometheus metrics aggregated across server workers",
+                "endpoints": ["/metrics"]
             }
         },
-        "total_endpoints": 17
+        "total_endpoints": 22
     })
 
 # ============================================================================
@@ -79,37 +534,54 @@ def get_matches():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'user_skills', 'desired_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         user_skills = data.get('user_skills', [])
         desired_skills = data.get('desired_skills', [])
         
         if not user_skills or not desired_skills:
             return jsonify({"error": "Both user_skills and desired_skills are required"}), 400
         
-        matches = find_skill_matches(user_skills, desired_skills)
-        
-        if matches is None:
-            matches = fallback_matching(user_skills, desired_skills)
-        
-        enhanced_matches = []
-        for match in matches:
-            user = next((u for u in USERS_DATABASE if u["id"] == match["userId"]), None)
-            if user:
-                enhanced_match = {
+        try:
+            # No limit by default: every match, as skill_matcher returns them
+            limit = parse_limit(data.get('limit'))
+            projection = request_projection(data, compact_drops=('matches.userSkills', 'matches.userSkillsWanted'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        with STAGE_SECONDS.time('get_matches', 'match'):
+            # Scored over the user store's columns, so added and ingested users match at once
+            matches, total_matches = match_engine.find_matches(user_skills, desired_skills, limit)
+        
+        with STAGE_SECONDS.time('get_matches', 'enrich'):
+            # O(1) id lookups instead of a scan of USERS_DATABASE per match
+            matched_users = [(match, user_store.get(match["userId"])) for match in matches]
+            enhanced_matches = []
+            for match, user in matched_users:
+                if user is None:
+                    # Deleted since it was scored
+                    total_matches -= 1
+                    continue
+                enhanced_matches.append(projection.build('matches', {
                     "userId": match["userId"],
                     "name": user["name"],
                     "matchScore": match["matchScore"],
                     "reasons": match["reasons"],
-                    "userSkills": user["skills"],
-                    "userSkillsWanted": user["skillsWanted"]
-                }
-                enhanced_matches.append(enhanced_match)
-        
-        return jsonify({
-            "success": True,
-            "service": "skill_matcher",
-            "matches": enhanced_matches,
-            "total_matches": len(enhanced_matches)
-        })
+                    "userSkills": lambda: user["skills"],
+                    "userSkillsWanted": lambda: user["skillsWanted"]
+                }))
+        
+        with STAGE_SECONDS.time('get_matches', 'serialize'):
+            return jsonify(projection.build('', {
+                "success": True,
+                "service": "skill_matcher",
+                "matches": enhanced_matches,
+                "total_matches": total_matches,
+                **resolution_fields(resolutions)
+            }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -117,22 +589,28 @@ def get_matches():
 @app.route('/api/users', methods=['GET'])
 def get_users():
     """Get all users in the database"""
+    if wants_ndjson():
+        # One user per line, read from the store as the response is written
+        response = ndjson_response(user.to_dict() for user in user_store)
+        response.headers['X-Total-Count'] = str(len(user_store))
+        return response
+    
     return jsonify({
         "success": True,
         "service": "skill_matcher",
-        "users": USERS_DATABASE,
-        "total_users": len(USERS_DATABASE)
+        "users": [user.to_dict() for user in user_store],
+        "total_users": len(user_store)
     })
 
 @app.route('/api/user/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     """Get a specific user by ID"""
-    user = next((u for u in USERS_DATABASE if u["id"] == user_id), None)
+    user = user_store.get(user_id)
     if user:
         return jsonify({
             "success": True,
             "service": "skill_matcher",
-            "user": user
+            "user": user.to_dict()
         })
     else:
         return jsonify({"error": "User not found"}), 404
@@ -151,20 +629,20 @@ def add_user():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
-        new_id = max(u["id"] for u in USERS_DATABASE) + 1 if USERS_DATABASE else 1
+        if not isinstance(data["name"], str) or not data["name"].strip():
+            return jsonify({"error": "name must be a non-empty string"}), 400
         
-        new_user = {
-            "id": new_id,
-            "name": data["name"],
-            "skills": data["skills"],
-            "skillsWanted": data["skillsWanted"]
-        }
+        for field in ['skills', 'skillsWanted']:
+            if not isinstance(data[field], list) or not all(isinstance(skill, str) for skill in data[field]):
+                return jsonify({"error": f"{field} must be a list of strings"}), 400
+        
+        new_user = user_store.add(data["name"], data["skills"], data["skillsWanted"])
         
         return jsonify({
             "success": True,
             "service": "skill_matcher",
-            "message": "User would be added (not actually saved in this demo)",
-            "user": new_user
+            "message": "User added",
+            "user": new_user.to_dict()
         })
         
     except Exception as e:
@@ -183,6 +661,11 @@ def get_recommendations():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         career_goal = data.get('career_goal')
         experience_level = data.get('experience_level', 'intermediate')
@@ -194,22 +677,28 @@ def get_recommendations():
         if experience_level not in valid_levels:
             return jsonify({"error": f"experience_level must be one of: {', '.join(valid_levels)}"}), 400
         
-        recommendations = get_skill_recommendations(
+        try:
+            projection = request_projection(data, compact_drops=('user_profile',))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        recommendations = cached_skill_recommendations(
             current_skills, 
             career_goal, 
             experience_level
         )
         
-        return jsonify({
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_recommender",
             "recommendations": recommendations,
-            "user_profile": {
+            "user_profile": lambda: {
                 "current_skills": current_skills,
                 "career_goal": career_goal,
                 "experience_level": experience_level
-            }
-        })
+            },
+            **resolution_fields(resolutions)
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -217,7 +706,7 @@ def get_recommendations():
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """Get all skill categories"""
-    return jsonify({
+    return catalog_cache.respond('categories', lambda: {
         "success": True,
         "service": "skill_recommender",
         "categories": SKILL_CATEGORIES
@@ -226,7 +715,7 @@ def get_categories():
 @app.route('/api/career-paths', methods=['GET'])
 def get_career_paths():
     """Get all career paths and their required skills"""
-    return jsonify({
+    return catalog_cache.respond('career-paths', lambda: {
         "success": True,
         "service": "skill_recommender",
         "career_paths": CAREER_PATHS
@@ -235,7 +724,7 @@ def get_career_paths():
 @app.route('/api/trending-skills', methods=['GET'])
 def get_trending_skills():
     """Get trending skills by category"""
-    return jsonify({
+    return catalog_cache.respond('trending-skills', lambda: {
         "success": True,
         "service": "skill_recommender",
         "trending_skills": TRENDING_SKILLS
@@ -247,7 +736,7 @@ def get_career_path(career_name):
     career_name = urllib.parse.unquote(career_name)
     
     if career_name in CAREER_PATHS:
-        return jsonify({
+        return catalog_cache.respond(('career-path', career_name), lambda: {
             "success": True,
             "service": "skill_recommender",
             "career_path": {
@@ -267,14 +756,23 @@ def analyze_skills():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         
         if not current_skills:
             return jsonify({"error": "current_skills is required"}), 400
         
+        current_ids = skill_vocabulary.ids(current_skills)
+        current_id_set = frozenset(current_ids)
+        
         skill_analysis = {}
         for category, skills in SKILL_CATEGORIES.items():
-            matching_skills = [skill for skill in current_skills if skill in skills]
+            category_ids = CATEGORY_SKILL_IDS[category]
+            matching_skills = [skill for skill, skill_id in zip(current_skills, current_ids) if skill_id in category_ids]
             if matching_skills:
                 skill_analysis[category] = {
                     "skills": matching_skills,
@@ -284,7 +782,8 @@ def analyze_skills():
         
         potential_careers = []
         for career, required_skills in CAREER_PATHS.items():
-            matching_required = [skill for skill in required_skills if skill in current_skills]
+            required_ids = CAREER_PATH_SKILL_IDS[career]
+            matching_required = [skill for skill, skill_id in zip(required_skills, required_ids) if skill_id in current_id_set]
             coverage = len(matching_required) / len(required_skills) if required_skills else 0
             
             if coverage > 0:
@@ -292,7 +791,7 @@ def analyze_skills():
                     "career": career,
                     "coverage_percentage": round(coverage * 100, 1),
                     "matching_skills": matching_required,
-                    "missing_skills": [skill for skill in required_skills if skill not in current_skills]
+                    "missing_skills": [skill for skill, skill_id in zip(required_skills, required_ids) if skill_id not in current_id_set]
                 })
         
         potential_careers.sort(key=lambda x: x['coverage_percentage'], reverse=True)
@@ -305,7 +804,8 @@ def analyze_skills():
                 "potential_careers": potential_careers[:5],
                 "total_skills": len(current_skills),
                 "categories_covered": len(skill_analysis)
-            }
+            },
+            **resolution_fields(resolutions)
         })
         
     except Exception as e:
@@ -320,6 +820,11 @@ def generate_learning_path():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         target_career = data.get('target_career')
         experience_level = data.get('experience_level', 'intermediate')
@@ -327,7 +832,12 @@ def generate_learning_path():
         if not current_skills:
             return jsonify({"error": "current_skills is required"}), 400
         
-        recommendations = get_skill_recommendations(
+        try:
+            projection = request_projection(data, compact_drops=('learning_path.recommendations',))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        recommendations = cached_skill_recommendations(
             current_skills, 
             target_career, 
             experience_level
@@ -337,7 +847,7 @@ def generate_learning_path():
         priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
         sorted_recs = sorted(recs, key=lambda x: priority_order.get(x.get('priority', 'Low'), 1), reverse=True)
         
-        learning_path = {
+        learning_path = projection.build('learning_path', {
             "phases": [
                 {
                     "phase": "Phase 1: Foundation",
@@ -357,13 +867,14 @@ def generate_learning_path():
             ],
             "total_estimated_time": "9-18 months",
             "recommendations": recommendations
-        }
+        })
         
-        return jsonify({
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_recommender",
-            "learning_path": learning_path
-        })
+            "learning_path": learning_path,
+            **resolution_fields(resolutions)
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -381,6 +892,11 @@ def analyze_gaps():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         target_role = data.get('target_role')
         
@@ -390,18 +906,24 @@ def analyze_gaps():
         if not target_role:
             return jsonify({"error": "target_role is required"}), 400
         
-        analysis = analyze_skill_gaps(current_skills, target_role)
+        try:
+            projection = request_projection(data, compact_drops=('user_profile',))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        return jsonify({
+        encoded_analysis = cached_skill_gaps(current_skills, target_role, encoded=True)
+        
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_gap_analyzer",
-            "analysis": analysis,
-            "user_profile": {
+            "analysis": encoded_analysis,
+            "user_profile": lambda: {
                 "current_skills": current_skills,
                 "target_role": target_role
             },
-            "role_in_database": target_role in JOB_REQUIREMENTS
-        })
+            "role_in_database": target_role in JOB_REQUIREMENTS,
+            **resolution_fields(resolutions)
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -409,7 +931,7 @@ def analyze_gaps():
 @app.route('/api/roles', methods=['GET'])
 def get_roles():
     """Get all available roles in the database"""
-    return jsonify({
+    return catalog_cache.respond('roles', lambda: {
         "success": True,
         "service": "skill_gap_analyzer",
         "roles": list(JOB_REQUIREMENTS.keys()),
@@ -422,7 +944,7 @@ def get_role_requirements(role_name):
     role_name = urllib.parse.unquote(role_name)
     
     if role_name in JOB_REQUIREMENTS:
-        return jsonify({
+        return catalog_cache.respond(('role', role_name), lambda: {
             "success": True,
             "service": "skill_gap_analyzer",
             "role": {
@@ -442,6 +964,11 @@ def compare_roles():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         roles_to_compare = data.get('roles', [])
         
@@ -451,93 +978,198 @@ def compare_roles():
         if not roles_to_compare:
             return jsonify({"error": "roles is required"}), 400
         
+        try:
+            projection = request_projection(data, compact_drops=('comparisons.analysis', 'user_profile'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # (readiness, comparison) for each analysed role
         comparisons = []
+        failed_roles = []
+        
+        # Per-role analyses are independent, so they fan out to the role runner
+        results = analysis_runner.map(
+            cached_gap_summary,
+            [(current_skills, role) for role in roles_to_compare],
+            timeout=api_config.ROLE_TIMEOUT
+        )
         
-        for role in roles_to_compare:
-            analysis = analyze_skill_gaps(current_skills, role)
+        for role, result in zip(roles_to_compare, results):
+            if result.status != 'ok':
+                failed_roles.append(projection.build('comparisons', {
+                    "role": role,
+                    "status": result.status,
+                    "error": result.error,
+                    "in_database": role in JOB_REQUIREMENTS
+                }))
+                continue
             
-            readiness = analysis.get('overall_readiness', '0%')
-            readiness_level = analysis.get('readiness_level', 'Unknown')
-            critical_gaps_count = len(analysis.get('critical_gaps', []))
-            matching_skills_count = len(analysis.get('matching_skills', []))
+            summary, encoded_analysis = result.value
             
-            comparisons.append({
+            comparisons.append((_readiness_value(summary["readiness"]), projection.build('comparisons', {
                 "role": role,
-                "readiness": readiness,
-                "readiness_level": readiness_level,
-                "critical_gaps_count": critical_gaps_count,
-                "matching_skills_count": matching_skills_count,
+                **summary,
                 "in_database": role in JOB_REQUIREMENTS,
-                "analysis": analysis
-            })
+                # Spliced into the body as cached, already-encoded JSON
+                "analysis": encoded_analysis
+            })))
         
-        comparisons.sort(key=lambda x: int(x['readiness'].replace('%', '')), reverse=True)
+        # Stable sort: equal readiness keeps request order, failures go last
+        comparisons.sort(key=lambda x: x[0], reverse=True)
         
-        return jsonify({
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_gap_analyzer",
-            "comparisons": comparisons,
-            "user_profile": {
+            "comparisons": [comparison for _, comparison in comparisons] + failed_roles,
+            "user_profile": lambda: {
                 "current_skills": current_skills,
                 "total_skills": len(current_skills)
-            }
-        })
+            },
+            **resolution_fields(resolutions)
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/skills-overview', methods=['POST'])
 def get_skills_overview():
-    """Get an overview of skills across different roles"""
+    """
+    Get an overview of skills across different roles.
+
+    ``best_matching_roles`` ranks roles by each gap analysis's
+    overall_readiness. ``role_coverage`` ranks them by the share of their
+    essential/preferred/nice_to_have weight (3/2/1) the skills cover, the
+    measure /api/ready-users ranks users by.
+    """
     try:
         data = request.get_json()
         
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         
         if not current_skills:
             return jsonify({"error": "current_skills is required"}), 400
         
-        role_analyses = {}
-        skill_demand = {}
-        
-        for role, requirements in JOB_REQUIREMENTS.items():
-            analysis = analyze_skill_gaps(current_skills, role)
-            role_analyses[role] = analysis
-            
-            for skill in current_skills:
-                if skill in requirements.get('essential', []):
-                    skill_demand[skill] = skill_demand.get(skill, 0) + 3
-                elif skill in requirements.get('preferred', []):
-                    skill_demand[skill] = skill_demand.get(skill, 0) + 2
-                elif skill in requirements.get('nice_to_have', []):
-                    skill_demand[skill] = skill_demand.get(skill, 0) + 1
-        
-        sorted_skills = sorted(skill_demand.items(), key=lambda x: x[1], reverse=True)
-        
-        best_matches = []
-        for role, analysis in role_analyses.items():
-            readiness = int(analysis.get('overall_readiness', '0%').replace('%', ''))
-            best_matches.append({
-                "role": role,
-                "readiness": f"{readiness}%",
-                "readiness_level": analysis.get('readiness_level', 'Unknown')
-            })
-        
-        best_matches.sort(key=lambda x: int(x['readiness'].replace('%', '')), reverse=True)
+        try:
+            projection = request_projection(data, compact_drops=('overview.role_analyses',))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        summaries = {}
+        
+        def role_summaries():
+            # One memoized analysis per role, shared by best_matching_roles and role_analyses
+            if not summaries:
+                with STAGE_SECONDS.time('get_skills_overview', 'analyze'):
+                    for role in JOB_REQUIREMENTS:
+                        summaries[role] = cached_gap_summary(current_skills, role)
+            return summaries
+        
+        def role_analyses():
+            # Spliced into the body as cached, already-encoded JSON
+            return {role: encoded for role, (_, encoded) in role_summaries().items()}
+        
+        def skill_demand():
+            with STAGE_SECONDS.time('get_skills_overview', 'aggregate'):
+                # Demand across every role comes from the precomputed weight matrix
+                return dict(role_matrix.skill_demand(current_skills, skill_vocabulary.ids(current_skills)))
+        
+        def best_matching_roles():
+            # Ranked by the analyses' own readiness, so they agree with role_analyses
+            ranked = [(role, summary) for role, (summary, _) in role_summaries().items()]
+            ranked.sort(key=lambda item: _readiness_value(item[1]["readiness"]), reverse=True)
+            return [
+                projection.build('overview.best_matching_roles', {
+                    "role": role,
+                    "readiness": f"{_readiness_value(summary['readiness'])}%",
+                    "readiness_level": summary["readiness_level"]
+                })
+                for role, summary in ranked[:5]
+            ]
+        
+        def role_coverage():
+            with STAGE_SECONDS.time('get_skills_overview', 'coverage'):
+                # Every role's weighted coverage in one pass over the weight matrix
+                coverage_by_role = role_matrix.coverage(skill_vocabulary.resolve(current_skills))
+                top_roles = heapq.nlargest(5, coverage_by_role, key=coverage_by_role.get)
+            return [
+                projection.build('overview.role_coverage', {
+                    "role": role,
+                    "weighted_coverage": f"{coverage_by_role[role]}%"
+                })
+                for role in top_roles
+            ]
         
-        return jsonify({
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_gap_analyzer",
-            "overview": {
+            "overview": lambda: projection.build('overview', {
                 "total_skills": len(current_skills),
-                "skill_demand": dict(sorted_skills),
-                "best_matching_roles": best_matches[:5],
+                "skill_demand": skill_demand,
+                "best_matching_roles": best_matching_roles,
+                "role_coverage": role_coverage,
                 "role_analyses": role_analyses
-            }
-        })
+            }),
+            **resolution_fields(resolutions)
+        }))
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/ready-users', methods=['GET'])
+def get_ready_users():
+    """Users closest to a role or career path, by weighted requirement coverage"""
+    try:
+        role = request.args.get('role')
+        career_path = request.args.get('career_path')
+        if (role is None) == (career_path is None):
+            return jsonify({"error": "Exactly one of role or career_path is required"}), 400
+        target_type, target = ('role', role) if role is not None else ('career_path', career_path)
+        
+        if not role_readiness.has_target(target_type, target):
+            return jsonify({"error": f"{target_type.replace('_', ' ').capitalize()} not found in database"}), 404
+        
+        try:
+            limit = parse_limit(request.args.get('limit')) or DEFAULT_READY_LIMIT
+            after = decode_cursor(request.args['cursor'], 'ready') if request.args.get('cursor') else None
+            projection = request_projection(compact_drops=('users.matching_skills',))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Read from the index's highest score buckets down
+        with STAGE_SECONDS.time('get_ready_users', 'rank'):
+            page, last_key = role_readiness.top(target_type, target, limit, after)
+        
+        total_weight = role_readiness.total_weight(target_type, target)
+        ready_users = []
+        for user_id, score in page:
+            user = user_store.get(user_id)
+            matching, missing = role_readiness.coverage(target_type, target, user_id)
+            ready_users.append(projection.build('users', {
+                "id": user_id,
+                "name": user["name"] if user is not None else None,
+                "readiness": round(score / total_weight * 100, 1) if total_weight else 0.0,
+                "weighted_score": score,
+                "matching_skills": matching,
+                "missing_critical_skills": missing
+            }))
+        
+        return jsonify(projection.build('', {
+            "success": True,
+            "service": "skill_gap_analyzer",
+            target_type: target,
+            "max_weighted_score": total_weight,
+            "users": ready_users,
+            "total_candidates": role_readiness.candidate_count(target_type, target),
+            "next_cursor": encode_cursor('ready', last_key) if last_key else None
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -561,67 +1193,115 @@ def search_users():
         if not search_keywords:
             return jsonify({"error": "keywords array is required"}), 400
         
+        try:
+            check_skill_lists(data, ('keywords',))
+            limit = parse_limit(data.get('limit'))
+            after = decode_cursor(data['cursor'], 'search') if data.get('cursor') else None
+            projection = request_projection(
+                data, compact_drops=('users.skills', 'users.skillsWanted', 'search_keywords')
+            )
+            match_mode = request_match_mode(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         # Convert keywords to lowercase for case-insensitive matching
         keywords_lower = [kw.lower() for kw in search_keywords]
         
+        # Fuzzy mode matches the skills each keyword resolves to instead of substrings
+        resolved_keywords = terms_of = None
+        if match_mode == 'fuzzy':
+            with STAGE_SECONDS.time('search_users', 'resolve'):
+                resolved_keywords, terms_of = resolve_keywords(keywords_lower)
+        
+        # Only users sharing an indexed skill term with a keyword are scored
+        with STAGE_SECONDS.time('search_users', 'search'):
+            hits = skill_index.search(keywords_lower, search_type, terms_of)
+        with STAGE_SECONDS.time('search_users', 'rank'):
+            page, last_key = select_page(
+                hits, lambda user_id: (-hits[user_id][1], user_store.position(user_id)), limit, after
+            )
+        
         ranked_users = []
         
-        for user in USERS_DATABASE:
-            score = 0
-            matched_skills = []
-            matched_wanted = []
-            
-            # Search in user's skills
-            if search_type in ['skills', 'both']:
-                for skill in user['skills']:
-                    skill_lower = skill.lower()
-                    for keyword in keywords_lower:
-                        if keyword in skill_lower or skill_lower in keyword:
-                            score += 1
-                            matched_skills.append(skill)
+        for user_id in page:
+            user, score, matched_skills, matched_wanted = hits[user_id]
             
-            # Search in user's wanted skills
-            if search_type in ['wanted', 'both']:
-                for wanted_skill in user['skillsWanted']:
-                    wanted_lower = wanted_skill.lower()
-                    for keyword in keywords_lower:
-                        if keyword in wanted_lower or wanted_lower in keyword:
-                            score += 0.5  # Lower weight for wanted skills
-                            matched_wanted.append(wanted_skill)
+            # Calculate relevance percentage
+            total_possible_matches = len(keywords_lower) * (len(user['skills']) + len(user['skillsWanted']))
+            relevance_percentage = min(100, (score / total_possible_matches) * 100)
             
-            if score > 0:
-                # Calculate relevance percentage
-                total_possible_matches = len(keywords_lower) * (len(user['skills']) + len(user['skillsWanted']))
-                relevance_percentage = min(100, (score / total_possible_matches) * 100)
-                
-                ranked_users.append({
-                    "id": user["id"],
-                    "name": user["name"],
-                    "skills": user["skills"],
-                    "skillsWanted": user["skillsWanted"],
-                    "match_score": score,
-                    "relevance_percentage": round(relevance_percentage, 1),
-                    "matched_skills": list(set(matched_skills)),
-                    "matched_wanted": list(set(matched_wanted)),
-                    "total_matches": len(set(matched_skills + matched_wanted))
-                })
-        
-        # Sort by match score (descending)
-        ranked_users.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        return jsonify({
+            ranked_users.append(projection.build('users', {
+                "id": user["id"],
+                "name": user["name"],
+                "skills": lambda: user["skills"],
+                "skillsWanted": lambda: user["skillsWanted"],
+                "match_score": score,
+                "relevance_percentage": round(relevance_percentage, 1),
+                "matched_skills": lambda: list(set(matched_skills)),
+                "matched_wanted": lambda: list(set(matched_wanted)),
+                "total_matches": len(set(matched_skills + matched_wanted))
+            }))
+        
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_swapper_search",
             "search_keywords": search_keywords,
             "search_type": search_type,
             "users": ranked_users,
-            "total_matches": len(ranked_users),
-            "total_users_searched": len(USERS_DATABASE)
-        })
+            "total_matches": len(hits),
+            "total_users_searched": len(user_store),
+            "next_cursor": encode_cursor('search', last_key) if last_key else None,
+            **resolution_fields(resolved_keywords, 'resolved_keywords')
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _browse_relevance(search):
+    """Relevance score of every user whose name, skills or wanted skills contain ``search``"""
+    # Skill containment comes from the index instead of lowering every skill
+    name_matches = user_store.users_with_name_containing(search)
+    users_with_skill = skill_index.users_containing(search, 'skills')
+    users_wanting_skill = skill_index.users_containing(search, 'skillsWanted')
+    
+    relevance_scores = {}
+    for user_id in name_matches | users_with_skill | users_wanting_skill:
+        relevance_score = 0
+        if user_id in name_matches:
+            relevance_score += 2
+        if user_id in users_with_skill:
+            relevance_score += 1
+        if user_id in users_wanting_skill:
+            relevance_score += 0.5
+        relevance_scores[user_id] = relevance_score
+    return relevance_scores
+
+def _iter_browse(search, ordering, relevance_scores, rank_key, after):
+    """Users passing the browse filter, lazily, in ``ordering``"""
+    if ordering == 'match_score':
+        ranked = sorted(relevance_scores, key=rank_key)
+        if after is not None:
+            ranked = [user_id for user_id in ranked if rank_key(user_id) > after]
+        return (user_store.get(user_id) for user_id in ranked)
+    
+    users = user_store.iter_sorted(ordering, after)
+    if search:
+        users = (user for user in users if user["id"] in relevance_scores)
+    return users
+
+def _browse_entry(projection, user, relevance_score=None):
+    fields = {
+        "id": user["id"],
+        "name": user["name"],
+        "skills": lambda: user["skills"],
+        "skillsWanted": lambda: user["skillsWanted"],
+        "skills_count": lambda: len(user["skills"]),
+        "wanted_count": lambda: len(user["skillsWanted"])
+    }
+    if relevance_score is not None:
+        fields["relevance_score"] = relevance_score
+    return projection.build('users', fields)
+
 @app.route('/api/browse-users', methods=['GET'])
 def browse_users():
     """Get all users with basic ranking information"""
@@ -630,60 +1310,142 @@ def browse_users():
         search = request.args.get('search', '').lower()
         sort_by = request.args.get('sort_by', 'name')  # 'name', 'skills_count', 'match_score'
         
-        users = []
-        
-        for user in USERS_DATABASE:
-            user_data = {
-                "id": user["id"],
-                "name": user["name"],
-                "skills": user["skills"],
-                "skillsWanted": user["skillsWanted"],
-                "skills_count": len(user["skills"]),
-                "wanted_count": len(user["skillsWanted"])
-            }
-            
-            # Apply search filter if provided
-            if search:
-                name_match = search in user["name"].lower()
-                skills_match = any(search in skill.lower() for skill in user["skills"])
-                wanted_match = any(search in skill.lower() for skill in user["skillsWanted"])
-                
-                if not (name_match or skills_match or wanted_match):
-                    continue
-                
-                # Calculate basic relevance score for filtered results
-                relevance_score = 0
-                if name_match:
-                    relevance_score += 2
-                if skills_match:
-                    relevance_score += 1
-                if wanted_match:
-                    relevance_score += 0.5
-                
-                user_data["relevance_score"] = relevance_score
-            
-            users.append(user_data)
-        
-        # Apply sorting
         if sort_by == 'skills_count':
-            users.sort(key=lambda x: x['skills_count'], reverse=True)
+            ordering = 'skills_count'
         elif sort_by == 'match_score' and search:
-            users.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+            ordering = 'match_score'
         else:
-            users.sort(key=lambda x: x['name'].lower())
+            ordering = 'name'
+        
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor, ordering) if cursor else None
+            projection = request_projection(compact_drops=('users.skills', 'users.skillsWanted'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        stream = wants_ndjson()
+        relevance_scores = _browse_relevance(search) if search else {}
+        total_users = len(relevance_scores) if search else len(user_store)
+        
+        if ordering == 'match_score':
+            rank_key = lambda user_id: (-relevance_scores[user_id], user_store.position(user_id))
+        else:
+            rank_key = lambda user_id: user_store.sort_key(ordering, user_id)
         
-        return jsonify({
+        if ordering == 'match_score' and not stream:
+            # Heap-select the page out of the scored ids
+            page, last_key = select_page(relevance_scores, rank_key, limit, after)
+            page_users = [user_store.get(user_id) for user_id in page]
+        else:
+            # Walk the maintained ordering; only users actually returned are touched
+            ordered = _iter_browse(search, ordering, relevance_scores, rank_key, after)
+            
+            if stream:
+                if limit is not None:
+                    ordered = itertools.islice(ordered, limit)
+                response = ndjson_response(
+                    _browse_entry(projection, user, relevance_scores.get(user["id"])) for user in ordered
+                )
+                response.headers['X-Total-Count'] = str(total_users)
+                return response
+            
+            if limit is None:
+                page_users, last_key = list(ordered), None
+            else:
+                page_users = list(itertools.islice(ordered, limit + 1))
+                last_key = None
+                if len(page_users) > limit:
+                    page_users = page_users[:limit]
+                    last_key = rank_key(page_users[-1]["id"])
+        
+        users = [_browse_entry(projection, user, relevance_scores.get(user["id"])) for user in page_users]
+        
+        return jsonify(projection.build('', {
             "success": True,
             "service": "skill_swapper_browse",
             "users": users,
-            "total_users": len(users),
+            "total_users": total_users,
             "search_applied": bool(search),
-            "sort_by": sort_by
+            "sort_by": sort_by,
+            "next_cursor": encode_cursor(ordering, last_key) if last_key else None
+        }))
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/swaps/<int:user_id>', methods=['GET'])
+def get_swaps(user_id):
+    """Reciprocal skill swaps and multi-party swap cycles through a user"""
+    try:
+        if user_store.get(user_id) is None:
+            return jsonify({"error": "User not found"}), 404
+        
+        try:
+            limit = parse_limit(request.args.get('limit')) or DEFAULT_SWAP_LIMIT
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            max_length = int(request.args.get('max_length', 3))
+        except ValueError:
+            return jsonify({"error": "max_length must be an integer"}), 400
+        if not 2 <= max_length <= MAX_CYCLE_LENGTH:
+            return jsonify({"error": f"max_length must be between 2 and {MAX_CYCLE_LENGTH}"}), 400
+        
+        with STAGE_SECONDS.time('get_swaps', 'pairs'):
+            pairs = swap_graph.reciprocal_pairs(user_id, limit)
+        with STAGE_SECONDS.time('get_swaps', 'cycles'):
+            cycles = swap_graph.swap_cycles(user_id, max_length, limit)
+        
+        return jsonify({
+            "success": True,
+            "service": "skill_swapper_swaps",
+            "user_id": user_id,
+            "max_length": max_length,
+            "reciprocal_pairs": [describe_cycle(cycle, skill_vocabulary, user_store) for cycle in pairs],
+            "swap_cycles": [describe_cycle(cycle, skill_vocabulary, user_store) for cycle in cycles]
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/autocomplete', methods=['GET'])
+def get_autocomplete():
+    """Typeahead completions for skill and user names, most popular first"""
+    try:
+        prefix = request.args.get('q', '')
+        completion_type = request.args.get('type', 'all')
+        if completion_type not in AUTOCOMPLETE_TYPES:
+            return jsonify({"error": f"type must be one of {', '.join(AUTOCOMPLETE_TYPES)}"}), 400
+        try:
+            limit = parse_limit(request.args.get('limit')) or MAX_COMPLETIONS
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if limit > MAX_COMPLETIONS:
+            return jsonify({"error": f"limit must be between 1 and {MAX_COMPLETIONS}"}), 400
+        
+        result = {
+            "success": True,
+            "service": "skill_swapper_autocomplete",
+            "query": prefix
+        }
+        if completion_type in ('skills', 'all'):
+            result["skills"] = [
+                {"name": name, "users": users, "trending": trending}
+                for name, users, trending in autocomplete.complete_skills(prefix, limit)
+            ]
+        if completion_type in ('users', 'all'):
+            members = (user_store.get(user_id) for user_id in autocomplete.complete_users(prefix, limit))
+            result["users"] = [
+                {"id": user["id"], "name": user["name"]}
+                for user in members if user is not None
+            ]
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # ============================================================================
 # UNIFIED ENDPOINTS
 # ============================================================================
@@ -697,6 +1459,11 @@ def comprehensive_analysis():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
+        try:
+            resolutions = resolve_request_skills(data, 'current_skills', 'desired_skills')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         current_skills = data.get('current_skills', [])
         target_role = data.get('target_role')
         career_goal = data.get('career_goal')
@@ -706,50 +1473,119 @@ def comprehensive_analysis():
         if not current_skills:
             return jsonify({"error": "current_skills is required"}), 400
         
-        # Run all three analyses
-        results = {}
+        # A request may shorten the configured deadline, never extend it
+        deadline = api_config.ANALYSIS_DEADLINE
+        if data.get('deadline_ms') is not None:
+            try:
+                requested_deadline = float(data['deadline_ms']) / 1000
+            except (TypeError, ValueError):
+                return jsonify({"error": "deadline_ms must be a number"}), 400
+            if requested_deadline <= 0:
+                return jsonify({"error": "deadline_ms must be positive"}), 400
+            deadline = min(deadline, requested_deadline)
+        
+        try:
+            projection = request_projection(data, compact_drops=('user_profile',))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Run all three analyses concurrently; ones left out by ``fields`` are not run
+        calls = {}
         
         # 1. Skill Gap Analysis
-        if target_role:
-            results['gap_analysis'] = analyze_skill_gaps(current_skills, target_role)
+        if target_role and projection.includes('comprehensive_analysis.gap_analysis'):
+            calls['gap_analysis'] = (cached_skill_gaps, (current_skills, target_role))
         
         # 2. Skill Recommendations
-        results['recommendations'] = get_skill_recommendations(
-            current_skills, career_goal, experience_level
-        )
+        if projection.includes('comprehensive_analysis.recommendations'):
+            calls['recommendations'] = (
+                cached_skill_recommendations, (current_skills, career_goal, experience_level)
+            )
         
         # 3. Skill Matching (if desired skills provided)
-        if desired_skills:
-            matches = find_skill_matches(current_skills, desired_skills)
-            if matches is None:
-                matches = fallback_matching(current_skills, desired_skills)
-            results['skill_matches'] = matches
+        if desired_skills and projection.includes('comprehensive_analysis.skill_matches'):
+            calls['skill_matches'] = (find_user_matches, (current_skills, desired_skills))
+        
+        completed = analysis_runner.as_completed(calls, timeout=deadline)
+        user_profile = {
+            "current_skills": current_skills,
+            "target_role": target_role,
+            "career_goal": career_goal,
+            "experience_level": experience_level,
+            "desired_skills": desired_skills
+        }
         
-        return jsonify({
+        if wants_ndjson():
+            # One line per service as soon as it finishes, then a summary line
+            def events():
+                partial = False
+                for service, result in completed:
+                    partial = partial or result.status != 'ok'
+                    event = {"service": service, **_service_status(result)}
+                    if result.status == 'ok':
+                        event["result"] = result.value
+                    yield event
+                yield {"done": True, "partial": partial, "user_profile": user_profile,
+                       **resolution_fields(resolutions)}
+            
+            return ndjson_response(events())
+        
+        results = {}
+        services = {}
+        for service, result in completed:
+            services[service] = _service_status(result)
+            if result.status == 'ok':
+                results[service] = result.value
+        
+        return jsonify(projection.build('', {
             "success": True,
             "service": "unified",
             "comprehensive_analysis": results,
-            "user_profile": {
-                "current_skills": current_skills,
-                "target_role": target_role,
-                "career_goal": career_goal,
-                "experience_level": experience_level,
-                "desired_skills": desired_skills
-            }
-        })
+            "services": services,
+            "partial": len(results) < len(calls),
+            "user_profile": user_profile,
+            **resolution_fields(resolutions)
+        }))
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/batch', methods=['POST'])
+def batch_analysis():
+    """Analyze a JSON-lines stream of profiles, streaming JSON-lines results"""
+    try:
+        chunk_size = int(request.args.get('chunk_size', api_config.BATCH_CHUNK_SIZE))
+    except ValueError:
+        return jsonify({"error": "chunk_size must be an integer"}), 400
+    
+    if not 1 <= chunk_size <= api_config.BATCH_CHUNK_SIZE:
+        return jsonify({"error": f"chunk_size must be between 1 and {api_config.BATCH_CHUNK_SIZE}"}), 400
+    
+    # The body is read line by line while results are written out
+    g.streams_request_body = True
+    records = run_batch(
+        request.stream, analyze_profile, batch_runner, chunk_size,
+        timeout=api_config.ANALYSIS_DEADLINE
+    )
+    return ndjson_response(records)
+
+def _service_status(result):
+    """Status and timing block for one service of a fanned-out request"""
+    status = {"status": result.status, "elapsed_ms": round(result.elapsed * 1000, 1)}
+    if result.error:
+        status["error"] = result.error
+    return status
+
 @app.route('/api/data-summary', methods=['GET'])
 def get_data_summary():
     """Get summary of all available data"""
-    return jsonify({
+    # The user count is the only part that changes without a dataset reload
+    return catalog_cache.respond('data-summary', lambda: {
         "success": True,
         "service": "unified",
         "data_summary": {
             "users": {
-                "count": len(USERS_DATABASE),
+                "count": len(user_store),
                 "description": "Users available for skill matching"
             },
             "skill_categories": {
@@ -768,8 +1604,65 @@ def get_data_summary():
                 "categories": list(TRENDING_SKILLS.keys())
             }
         }
+    }, version=len(user_store))
+
+# ============================================================================
+# ADMIN ENDPOINTS
+# ============================================================================
+
+def _is_admin_request():
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(api_config.ADMIN_TOKEN) and hmac.compare_digest(token, api_config.ADMIN_TOKEN)
+
+@app.route('/api/admin/cache-stats', methods=['GET'])
+def admin_cache_stats():
+    """Hit/miss/eviction counters of the response and analysis caches"""
+    if not _is_admin_request():
+        return jsonify({"error": "Not found"}), 404
+    
+    return jsonify({
+        "success": True,
+        "service": "unified",
+        "caches": {
+            "catalog_responses": {
+                "entries": len(catalog_cache),
+                "hits": catalog_cache.hits,
+                "misses": catalog_cache.misses
+            },
+            "analyses": analysis_cache.stats()
+        }
     })
 
+@app.route('/api/admin/ingestion', methods=['GET'])
+def admin_ingestion():
+    """Applied offset and lag of the Node backend change log"""
+    if not _is_admin_request():
+        return jsonify({"error": "Not found"}), 404
+    
+    return jsonify({
+        "success": True,
+        "service": "unified",
+        "enabled": change_log_ingester is not None,
+        "ingestion": change_log_ingester.lag() if change_log_ingester is not None else None
+    })
+
+@app.route('/api/admin/reload-datasets', methods=['POST'])
+def admin_reload_datasets():
+    """Reload the catalog datasets and drop cached catalog responses"""
+    if not _is_admin_request():
+        return jsonify({"error": "Not found"}), 404
+    
+    try:
+        reload_datasets()
+        return jsonify({
+            "success": True,
+            "service": "unified",
+            "message": "Datasets reloaded"
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
     # Run the unified Flask app
     print("Starting Unified Skills API...")
@@ -783,7 +1676,9 @@ if __name__ == '__main__':
     print("\nKey Endpoints:")
     print("  GET  /health - Health check")
     print("  GET  /api/status - Detailed API status")
+    print("  GET  /metrics - Prometheus metrics")
     print("  POST /api/comprehensive-analysis - All services combined")
+    print("  POST /api/batch - Comprehensive analysis of a JSON-lines stream of profiles")
     print("  GET  /api/data-summary - Summary of available data")
     print("\nSkill Matcher Endpoints:")
     print("  POST /api/matches - Find skill matches")
@@ -803,12 +1698,17 @@ if __name__ == '__main__':
     print("  GET  /api/role/<name> - Get role requirements")
     print("  POST /api/compare-roles - Compare roles")
     print("  POST /api/skills-overview - Get skills overview")
+    print("  GET  /api/ready-users?role=<name> - Users closest to a role or career path")
     print("\nSkill Swapper Endpoints:")
     print("  POST /api/search-users - Search users by keywords")
     print("  GET  /api/browse-users - Browse all users with filtering")
+    print("  GET  /api/swaps/<id> - Reciprocal swaps and swap cycles for a user")
+    print("  GET  /api/autocomplete?q=<prefix> - Skill and user name completions")
     print("\nExample Usage:")
     print("  curl -X POST http://localhost:5013/api/comprehensive-analysis \\")
     print("    -H 'Content-Type: application/json' \\")
     print("    -d '{\"current_skills\": [\"JavaScript\", \"React\"], \"target_role\": \"Full Stack Developer\", \"career_goal\": \"Full Stack Developer\", \"experience_level\": \"intermediate\"}'")
     
+    print("\nDevelopment server only; for production run: python serve.py")
+    
     app.run(debug=True, host='0.0.0.0', port=5013) 
\ No newline at end of file
@@ -0,0 +1,339 @@
+"""
+Persistent user store for the Unified Skills API.
+
+Users live in memory in a columnar UserTable keyed by id, with the sort
+orders browsing pages through. Reads return UserRow copies taken under the
+store's lock, so concurrent writes never show through them. Every write (a
+put or a delete) is appended to a JSON-lines log that is replayed on startup,
+so added users survive restarts. Derived structures
+(search index, match engine, ...) subscribe to the store and are updated in
+place on each write instead of being rebuilt.
+
+Several processes may share one log (see serve.py): writers take an exclusive
+file lock and catch up on records appended by others before allocating an id,
+and ``refresh()`` lets readers pick up those records between requests.
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; single process only
+    fcntl = None
+
+from user_table import UserTable
+
+ITER_CHUNK_SIZE = 256
+
+# Orderings maintained on every write: name -> sort key for (user, position)
+SORT_ORDERS = {
+    'position': lambda user, position: (position,),
+    'name': lambda user, position: (user["name"].lower(), position),
+    'skills_count': lambda user, position: (-len(user["skills"]), position),
+}
+
+
+class UserStore:
+    """In-memory user table backed by an append-only log"""
+
+    def __init__(self, seed_users=(), log_path=None):
+        self._lock = threading.RLock()
+        self._table = UserTable()
+        self._positions = {}
+        self._next_position = 0
+        # Sorted (sort key..., user id) entries for each of SORT_ORDERS
+        self._orders = {order: [] for order in SORT_ORDERS}
+        self._next_id = 1
+        # Ids of users in an external system (see change_log.py) -> store id
+        self._external_ids = {}
+        self._listeners = []
+        self._log_path = log_path
+        self._log_file = None
+        # Bytes of the log already applied; everything past it came from other processes
+        self._log_offset = 0
+
+        # Orderings are sorted once after the bulk load rather than per insert
+        self._loading = True
+        for user in seed_users:
+            self._put(user)
+        if log_path:
+            self._replay()
+        for entries in self._orders.values():
+            entries.sort()
+        self._loading = False
+
+    def __len__(self):
+        return len(self._table)
+
+    def __iter__(self):
+        """Users in insertion order, read lazily"""
+        return self.iter_sorted('position')
+
+    def __contains__(self, user_id):
+        return user_id in self._table
+
+    def __getstate__(self):
+        # Listeners and the open log handle belong to the running process
+        state = self.__dict__.copy()
+        for name in ('_lock', '_listeners', '_log_file'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._log_file = None
+
+    @property
+    def log_offset(self):
+        """Bytes of the log already applied to the store"""
+        return self._log_offset
+
+    def subscribe(self, listener):
+        """Register an object with ``add_user(user)`` and ``remove_user(user_id)``"""
+        self._listeners.append(listener)
+
+    def get(self, user_id):
+        """Row of a user, or None"""
+        with self._lock:
+            return self._table.get(user_id)
+
+    def position(self, user_id):
+        """Insertion rank of a user, stable across updates"""
+        return self._positions[user_id]
+
+    def sort_key(self, order, user_id):
+        with self._lock:
+            return SORT_ORDERS[order](self._table.get(user_id), self._positions[user_id])
+
+    def iter_sorted(self, order, after=None):
+        """Users in ``order``, starting after the sort key ``after``"""
+        entries = self._orders[order]
+        resume_after = None if after is None else tuple(after) + (float('inf'),)
+        while True:
+            # Read a chunk at a time and resume by key, so concurrent writes
+            # never make the walk skip or repeat a user
+            with self._lock:
+                start = 0 if resume_after is None else bisect.bisect_right(entries, resume_after)
+                chunk = entries[start:start + ITER_CHUNK_SIZE]
+                users = [self._table.get(entry[-1]) for entry in chunk]
+            if not chunk:
+                return
+            for user in users:
+                if user is not None:
+                    yield user
+            resume_after = chunk[-1]
+
+    def users_with_name_containing(self, text):
+        """Ids of users whose lowercase name contains ``text``"""
+        with self._lock:
+            entries = list(self._orders['name'])
+        return {entry[-1] for entry in entries if text in entry[0]}
+
+    def add(self, name, skills, skills_wanted):
+        """Persist a new user under the next free id and return it"""
+        with self._lock, self._log_locked():
+            # Ids handed out by other processes must be seen before picking ours
+            self._catch_up()
+            user = {
+                "id": self._next_id,
+                "name": name,
+                "skills": list(skills),
+                "skillsWanted": list(skills_wanted)
+            }
+            self._append({"op": "put", "user": user})
+            row = self._put(user)
+            self._notify(row)
+            return row
+
+    def apply_changes(self, changes):
+        """
+        Persist and apply a batch of changes keyed by external user id.
+
+        Each change is ``{"op": "put", "external_id", "name", "skills",
+        "skillsWanted"}`` or ``{"op": "delete", "external_id"}``. A put for a
+        known external id replaces that user under the same store id; a
+        delete of an unknown one is a no-op, so a batch may be applied twice.
+        The batch is logged with a single write. Returns the number of
+        changes that touched the store.
+        """
+        with self._lock, self._log_locked():
+            self._catch_up()
+            records = []
+            # External ids given a store id (or deleted) earlier in this batch
+            assigned = {}
+            next_id = self._next_id
+            for change in changes:
+                external_id = change["external_id"]
+                user_id = assigned.get(external_id, self._external_ids.get(external_id))
+                if change["op"] == "delete":
+                    if user_id is not None:
+                        records.append({"op": "delete", "id": user_id, "external_id": external_id})
+                        assigned[external_id] = None
+                    continue
+                if user_id is None:
+                    user_id = assigned[external_id] = next_id
+                    next_id += 1
+                user = {
+                    "id": user_id,
+                    "name": change["name"],
+                    "skills": list(change["skills"]),
+                    "skillsWanted": list(change["skillsWanted"])
+                }
+                records.append({"op": "put", "user": user, "external_id": external_id})
+            self._append(*records)
+            for record in records:
+                self._apply(record, notify=True)
+            return len(records)
+
+    def refresh(self):
+        """Apply records other processes appended to the log since the last read"""
+        if not self._log_path:
+            return 0
+        try:
+            size = os.stat(self._log_path).st_size
+        except FileNotFoundError:
+            return 0
+        if size <= self._log_offset:
+            return 0
+        with self._lock:
+            return self._catch_up()
+
+    def close(self):
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def _put(self, user):
+        """Store a user dict and index it; returns its row view"""
+        previous = self._table.get(user["id"])
+        if previous is not None:
+            self._unindex(previous)
+        else:
+            self._positions[user["id"]] = self._next_position
+            self._next_position += 1
+        row = self._table.append(user)
+        position = self._positions[user["id"]]
+        for order, sort_key in SORT_ORDERS.items():
+            entry = sort_key(user, position) + (user["id"],)
+            if self._loading:
+                self._orders[order].append(entry)
+            else:
+                bisect.insort(self._orders[order], entry)
+        self._next_id = max(self._next_id, user["id"] + 1)
+        return row
+
+    def _unindex(self, user):
+        position = self._positions[user["id"]]
+        for order, sort_key in SORT_ORDERS.items():
+            entries = self._orders[order]
+            entry = sort_key(user, position) + (user["id"],)
+            if self._loading:
+                entries.remove(entry)
+                continue
+            slot = bisect.bisect_left(entries, entry)
+            if slot < len(entries) and entries[slot] == entry:
+                del entries[slot]
+
+    def _delete(self, user_id):
+        """Unindex and drop a user; returns False if there was none"""
+        user = self._table.get(user_id)
+        if user is None:
+            return False
+        self._unindex(user)
+        self._table.remove(user_id)
+        del self._positions[user_id]
+        return True
+
+    def _notify(self, user):
+        for listener in self._listeners:
+            listener.add_user(user)
+
+    def _notify_removed(self, user_id):
+        for listener in self._listeners:
+            listener.remove_user(user_id)
+
+    def _apply(self, record, notify):
+        """Apply one log record; returns whether it was one the store knows"""
+        op = record.get("op")
+        external_id = record.get("external_id")
+        if op == "put":
+            row = self._put(record["user"])
+            if external_id is not None:
+                self._external_ids[external_id] = row.id
+            if notify:
+                self._notify(row)
+        elif op == "delete":
+            if external_id is not None:
+                self._external_ids.pop(external_id, None)
+            if self._delete(record["id"]) and notify:
+                self._notify_removed(record["id"])
+        else:
+            return False
+        return True
+
+    def _replay(self):
+        for record in self._read_new_records():
+            self._apply(record, notify=False)
+
+    def _catch_up(self):
+        applied = 0
+        for record in self._read_new_records():
+            applied += self._apply(record, notify=True)
+        return applied
+
+    def _read_new_records(self):
+        """Parse complete log lines past the applied offset and advance it"""
+        if not self._log_path or not os.path.exists(self._log_path):
+            return []
+        with open(self._log_path, 'rb') as log:
+            log.seek(self._log_offset)
+            data = log.read()
+        # A line without its newline is still being written (or was torn by a crash)
+        complete = data[:data.rfind(b"\n") + 1]
+        self._log_offset += len(complete)
+        records = []
+        for line in complete.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A torn line from an interrupted write
+                continue
+        return records
+
+    def _open_log(self):
+        if self._log_file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._log_path)), exist_ok=True)
+            self._log_file = open(self._log_path, 'ab')
+        return self._log_file
+
+    @contextlib.contextmanager
+    def _log_locked(self):
+        if not self._log_path or fcntl is None:
+            yield
+            return
+        log_file = self._open_log()
+        fcntl.flock(log_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(log_file.fileno(), fcntl.LOCK_UN)
+
+    def _append(self, *records):
+        if not self._log_path or not records:
+            return
+        log_file = self._open_log()
+        line = b"".join(json.dumps(record).encode('utf-8') + b"\n" for record in records)
+        if os.fstat(log_file.fileno()).st_size > self._log_offset:
+            # Terminate a torn tail so it cannot swallow this record
+            line = b"\n" + line
+        log_file.write(line)
+        log_file.flush()
+        os.fsync(log_file.fileno())
+        self._log_offset = log_file.tell()
@@ -0,0 +1,183 @@
+"""
+Columnar storage for the user table.
+
+Each user is one row across parallel columns: an array of ids, a list of
+interned names, and start/length/value arrays for the offered and wanted
+skills. The skill values are ids into a table of distinct skill spellings.
+A user costs a few machine words plus four bytes per skill instead of a dict
+and two lists of strings, and leaves the garbage collector almost nothing to
+traverse. UserRow is a slotted copy of one row's fields, taken when the row
+is handed out; a dict is only built, by ``to_dict()``, for rows that are
+serialized.
+
+Replacing a user writes a new row. Superseded and removed rows are reclaimed
+once they are as many as the live ones: their slots are reused by later rows,
+the skill values of the live rows are packed together, and spellings no live
+row uses are dropped. A UserRow already handed out is unaffected, so it can be
+read after the table's lock is released, whatever is written meanwhile. The
+table is not thread-safe itself; UserStore serializes access to it.
+"""
+
+import sys
+from array import array
+
+# Fewest superseded or removed rows worth reclaiming
+COMPACT_MIN_DEAD_ROWS = 1024
+
+
+class UserRow:
+    """Read-only copy of one row, also readable by JSON field name"""
+
+    __slots__ = ('id', 'name', '_skills', '_skills_wanted')
+
+    def __init__(self, user_id, name, skills, skills_wanted):
+        self.id = user_id
+        self.name = name
+        self._skills = skills
+        self._skills_wanted = skills_wanted
+
+    def __repr__(self):
+        return f"UserRow({self.to_dict()!r})"
+
+    @property
+    def skills(self):
+        return list(self._skills)
+
+    @property
+    def skills_wanted(self):
+        return list(self._skills_wanted)
+
+    def __getitem__(self, field):
+        if field == 'id':
+            return self.id
+        if field == 'name':
+            return self.name
+        if field == 'skills':
+            return self.skills
+        if field == 'skillsWanted':
+            return self.skills_wanted
+        raise KeyError(field)
+
+    def to_dict(self):
+        """The user as the API's JSON object"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "skills": self.skills,
+            "skillsWanted": self.skills_wanted
+        }
+
+
+class UserTable:
+    """Users stored column-wise, addressed by user id"""
+
+    def __init__(self):
+        self._ids = array('q')
+        self._names = []
+        # (starts, lengths, values): row r's skills are values[starts[r]:starts[r] + lengths[r]]
+        self._offered_columns = (array('Q'), array('I'), array('I'))
+        self._wanted_columns = (array('Q'), array('I'), array('I'))
+        # Distinct skill spellings, as entered
+        self._spellings = []
+        self._spelling_ids = {}
+        # user id -> row of its current version
+        self._row_of = {}
+        # Superseded or removed rows, and reclaimed rows free for reuse
+        self._dead_rows = []
+        self._free_rows = []
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, user_id):
+        return user_id in self._row_of
+
+    def get(self, user_id):
+        """Copy of the user's current row, or None"""
+        row = self._row_of.get(user_id)
+        return None if row is None else self._row(row)
+
+    def append(self, user):
+        """Store a user dict as a new row, superseding any row with its id"""
+        if len(self._dead_rows) >= max(COMPACT_MIN_DEAD_ROWS, len(self._row_of)):
+            self.compact()
+
+        name = sys.intern(user["name"])
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._ids[row] = user["id"]
+            self._names[row] = name
+        else:
+            row = len(self._ids)
+            self._ids.append(user["id"])
+            self._names.append(name)
+            for starts, lengths, _ in (self._offered_columns, self._wanted_columns):
+                starts.append(0)
+                lengths.append(0)
+        self._write_skills(self._offered_columns, row, user["skills"])
+        self._write_skills(self._wanted_columns, row, user["skillsWanted"])
+
+        previous = self._row_of.get(user["id"])
+        if previous is not None:
+            self._dead_rows.append(previous)
+        self._row_of[user["id"]] = row
+        return self._row(row)
+
+    def remove(self, user_id):
+        """Forget a user; its row is reclaimed by a later compaction"""
+        row = self._row_of.pop(user_id, None)
+        if row is not None:
+            self._dead_rows.append(row)
+
+    def compact(self):
+        """Reclaim the dead rows, pack the live skill values and drop unused spellings"""
+        for row in self._dead_rows:
+            self._names[row] = None
+        self._free_rows.extend(self._dead_rows)
+        self._dead_rows = []
+
+        # Old spelling id -> new one, in order of first use by a live row
+        renumbered = {}
+        for columns in (self._offered_columns, self._wanted_columns):
+            starts, lengths, values = columns
+            packed = array('I')
+            for row in self._row_of.values():
+                start = starts[row]
+                starts[row] = len(packed)
+                packed.extend(
+                    renumbered.setdefault(spelling_id, len(renumbered))
+                    for spelling_id in values[start:start + lengths[row]]
+                )
+            values[:] = packed
+
+        spellings = [None] * len(renumbered)
+        for old_id, new_id in renumbered.items():
+            spellings[new_id] = self._spellings[old_id]
+        self._spellings = spellings
+        self._spelling_ids = {spelling: spelling_id for spelling_id, spelling in enumerate(spellings)}
+
+    def _write_skills(self, columns, row, skills):
+        starts, lengths, values = columns
+        starts[row] = len(values)
+        lengths[row] = len(skills)
+        for skill in skills:
+            spelling_id = self._spelling_ids.get(skill)
+            if spelling_id is None:
+                spelling_id = len(self._spellings)
+                self._spellings.append(sys.intern(skill))
+                self._spelling_ids[skill] = spelling_id
+            values.append(spelling_id)
+
+    def _row(self, row):
+        return UserRow(
+            self._ids[row],
+            self._names[row],
+            self._skills(self._offered_columns, row),
+            self._skills(self._wanted_columns, row)
+        )
+
+    def _skills(self, columns, row):
+        starts, lengths, values = columns
+        start = starts[row]
+        spellings = self._spellings
+        return tuple(spellings[spelling_id] for spelling_id in values[start:start + lengths[row]])